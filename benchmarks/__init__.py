@@ -0,0 +1,65 @@
+"""
+Бенчмарки производительности API.
+
+Запуск: python -m benchmarks.<модуль> [параметры].
+Каждый бенчмарк работает во временной тестовой базе данных, которая удаляется по завершении.
+"""
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+
+def setup():
+    """Инициализация Django для запуска бенчмарка вне manage.py."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+    import django
+
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    """Создаёт временную тестовую базу данных и удаляет её после выхода из блока."""
+    from django.conf import settings
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    settings.DEBUG = False
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def measure(func, repeat=20, warmup=2):
+    """Возвращает список длительностей вызова func в миллисекундах."""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def percentile(samples, value):
+    """Перцентиль value (0-100) по списку замеров."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(value / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summary(samples):
+    """Краткая сводка по замерам: медиана, p99 и минимум в миллисекундах."""
+    return {
+        "p50": round(statistics.median(samples), 3),
+        "p99": round(percentile(samples, 99), 3),
+        "min": round(min(samples), 3),
+    }
@@ -0,0 +1,70 @@
+"""
+Сравнение прежней проверки запрещённых слов вложенным циклом со скомпилированным индексом.
+
+    python -m benchmarks.blocked_words --review-words 2000
+
+Длинный отзыв проверяется против списков разного размера; список дополняется
+синтетическими словами, которые не совпадают со словами отзыва.
+"""
+import argparse
+import json
+import random
+
+from benchmarks import measure, summary
+
+BASE_WORDS = ["Полиция", "Обман", "Наркотики", "Казино", "Оружие", "Криптовалюта", "Радар", "Крипта", "Бесплатно"]
+ALPHABET = "абвгдежзийклмнопрстуфхцчшщыэюя"
+REVIEW_WORDS = [
+    "отличный", "продавец", "товар", "соответствует", "описанию", "доставка", "быстрая", "рекомендую",
+    "всем", "спасибо", "качество", "хорошее", "цена", "приемлемая", "упаковка", "целая",
+]
+
+
+def legacy_find(text, words):
+    for word in text.lower().split():
+        for blocked_word in words:
+            if word.lower() in blocked_word.lower():
+                return word
+    return None
+
+
+def blocklist(size, rng):
+    words = list(BASE_WORDS)
+    while len(words) < size:
+        words.append("".join(rng.choice(ALPHABET) for _ in range(rng.randint(8, 14))))
+    return words
+
+
+def run(review_words, sizes, repeat):
+    from main.blocklist import CompiledBlocklist
+
+    rng = random.Random(0)
+    review = " ".join(rng.choice(REVIEW_WORDS) for _ in range(review_words))
+    results = {}
+    for size in sizes:
+        words = blocklist(size, rng)
+        compiled = CompiledBlocklist(words)
+
+        def compiled_find():
+            return next((word for word in review.lower().split() if compiled.contains(word)), None)
+
+        assert compiled_find() == legacy_find(review, words)
+        results[size] = {
+            "legacy": summary(measure(lambda: legacy_find(review, words), repeat, warmup=1)),
+            "compiled": summary(measure(compiled_find, repeat)),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--review-words", type=int, default=2000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[9, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.review_words, args.sizes, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Создание пакета объявлений: по одному через POST /ads/new/ против POST /ads/bulk/.
+
+    python -m benchmarks.bulk --ads 1000
+"""
+import argparse
+import json
+import time
+
+from benchmarks import setup, test_database
+
+
+def timed(func):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - started) * 1000
+    return {"ms": round(elapsed, 3), "queries": len(queries)}
+
+
+def run(ads):
+    from rest_framework.test import APIClient
+
+    from benchmarks.seed import seed_users
+    from main.models import Advertisement
+
+    body = [{"title": f"Объявление {number}", "description": "Описание", "price": number} for number in range(ads)]
+    with test_database():
+        client = APIClient()
+        client.force_authenticate(user=seed_users(1)[0])
+
+        def one_by_one():
+            for item in body:
+                client.post("/ads/new/", item, format="json")
+
+        def bulk():
+            response = client.post("/ads/bulk/", body, format="json")
+            assert response.status_code == 201, response.content
+
+        def bulk_update():
+            response = client.patch("/ads/bulk/", [{"id": pk, "price": 1} for pk in created], format="json")
+            assert response.status_code == 200, response.content
+
+        def bulk_delete():
+            response = client.post("/ads/bulk/delete/", {"ids": created}, format="json")
+            assert response.status_code == 204, response.content
+
+        results = {"single": timed(one_by_one), "bulk_create": timed(bulk)}
+        created = list(Advertisement.objects.order_by("-id").values_list("pk", flat=True)[:ads])
+        results["bulk_update"] = timed(bulk_update)
+        results["bulk_delete"] = timed(bulk_delete)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ads", type=int, default=1000)
+    args = parser.parse_args()
+
+    setup()
+    print(json.dumps(run(args.ads), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Сравнение синхронного (WSGI, gunicorn gthread) и асинхронного (ASGI, uvicorn) развёртывания
+на ленте объявлений, карточке объявления и списке отзывов.
+
+    python -m benchmarks.concurrency --clients 1000 --duration 20 --workers 4 --threads 8
+
+Каждый клиент держит одно keep-alive соединение и отправляет запросы друг за другом.
+--slow-send задаёт паузу (в мс) посередине отправки запроса: так ведут себя медленные
+мобильные клиенты, которые в синхронном развёртывании занимают поток на всё время передачи.
+Сервер запускается отдельным процессом на временной базе SQLite, кэш ответов выключен.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks import percentile
+
+ROOT = Path(__file__).resolve().parent.parent
+REQUEST_TIMEOUT = 30
+
+
+def prepare_database(path, users, ads, reviews):
+    """Создаёт базу SQLite в файле path и возвращает пути запросов и JWT-токен."""
+    os.environ["SQLITE_NAME"] = path
+    os.environ["CACHE_ENABLED"] = "False"
+
+    from benchmarks import setup
+
+    setup()
+    from django.core.management import call_command
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from benchmarks.seed import seed_ads, seed_reviews, seed_users
+
+    call_command("migrate", verbosity=0)
+    authors = seed_users(users)
+    seeded_ads = seed_ads(ads, authors)
+    seed_reviews(reviews, seeded_ads, authors)
+    paths = [
+        "/ads/?page=1",
+        "/ads/?pagination=cursor&ordering=price",
+        f"/ads/{seeded_ads[1].pk}/",
+        f"/ads/{seeded_ads[0].pk}/reviews/",
+    ]
+    return paths, str(RefreshToken.for_user(authors[0]).access_token)
+
+
+def server_command(deployment, port, workers, threads):
+    if deployment == "sync":
+        return [
+            sys.executable, "-m", "gunicorn", "config.wsgi:application", "--bind", f"127.0.0.1:{port}",
+            "--workers", str(workers), "--threads", str(threads), "--worker-connections", "2000",
+            "--log-level", "warning",
+        ]
+    return [
+        sys.executable, "-m", "uvicorn", "config.asgi:application", "--port", str(port),
+        "--workers", str(workers), "--no-access-log", "--log-level", "warning",
+    ]
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(("127.0.0.1", port)) == 0:
+                return
+        time.sleep(0.2)
+    raise RuntimeError(f"Сервер не запустился на порту {port}")
+
+
+async def read_response(reader):
+    status = int((await reader.readline()).split()[1])
+    length, keep_alive = 0, True
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+        elif name.lower() == "connection" and value.strip().lower() == "close":
+            keep_alive = False
+    await reader.readexactly(length)
+    return status, keep_alive
+
+
+async def client(port, requests, deadline, slow_send, latencies, errors):
+    """Одно keep-alive соединение, запросы по кругу до истечения deadline."""
+    connection = None
+    number = 0
+    while time.perf_counter() < deadline:
+        request = requests[number % len(requests)]
+        number += 1
+        started = time.perf_counter()
+        try:
+            if connection is None:
+                connection = await asyncio.open_connection("127.0.0.1", port)
+            reader, writer = connection
+            if slow_send:
+                writer.write(request[:16])
+                await writer.drain()
+                await asyncio.sleep(slow_send / 1000)
+                writer.write(request[16:])
+            else:
+                writer.write(request)
+            await writer.drain()
+            status, keep_alive = await asyncio.wait_for(read_response(reader), REQUEST_TIMEOUT)
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError, IndexError):
+            errors.append("connection")
+            connection = None
+            await asyncio.sleep(0.05)
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+        if status != 200:
+            errors.append(status)
+        if not keep_alive:
+            connection[1].close()
+            connection = None
+    if connection is not None:
+        connection[1].close()
+
+
+async def load(port, paths, token, clients, duration, slow_send):
+    requests = [
+        (f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nAuthorization: Bearer {token}\r\n"
+         "Connection: keep-alive\r\n\r\n").encode()
+        for path in paths
+    ]
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*(
+        client(port, requests[number % len(requests):] + requests, deadline, slow_send, latencies, errors)
+        for number in range(clients)
+    ))
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / duration, 1),
+        "p50": round(percentile(latencies, 50), 3) if latencies else None,
+        "p99": round(percentile(latencies, 99), 3) if latencies else None,
+        "errors": len(errors),
+    }
+
+
+def run_deployment(deployment, args, paths, token, database):
+    port = args.port
+    env = {**os.environ, "SQLITE_NAME": database, "CACHE_ENABLED": "False", "PYTHONPATH": str(ROOT)}
+    env.pop("ASYNC_VIEWS", None)
+    server = subprocess.Popen(server_command(deployment, port, args.workers, args.threads), cwd=ROOT, env=env)
+    try:
+        wait_for_port(port)
+        # Прогрев: первые запросы каждого процесса импортируют модули и открывают соединения с БД.
+        asyncio.run(load(port, paths, token, args.workers * 4, 2, 0))
+        return asyncio.run(load(port, paths, token, args.clients, args.duration, args.slow_send))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8, help="Потоков на процесс в синхронном развёртывании.")
+    parser.add_argument("--slow-send", type=float, default=0, help="Пауза посередине отправки запроса, мс.")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--ads", type=int, default=10000)
+    parser.add_argument("--reviews", type=int, default=50000)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--deployments", nargs="+", choices=("sync", "async"), default=["sync", "async"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = os.path.join(directory, "bench.sqlite3")
+        paths, token = prepare_database(database, args.users, args.ads, args.reviews)
+        results = {
+            deployment: run_deployment(deployment, args, paths, token, database) for deployment in args.deployments
+        }
+    print(json.dumps({"config": vars(args), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
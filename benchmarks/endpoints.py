@@ -0,0 +1,221 @@
+"""
+Задержка и число SQL-запросов для каждого маршрута main/urls.py и users/urls.py.
+
+    python -m benchmarks.endpoints --users 100 --ads 10000 --reviews 50000 --output bench_endpoints.json
+
+Для каждого маршрута считаются p50/p99 задержки и максимальное число запросов.
+Превышение бюджета из benchmarks/query_budgets.json завершает запуск с кодом 1,
+--update-budgets перезаписывает бюджеты по результатам текущего запуска.
+Запросы выполняются с настоящим JWT-заголовком, как у клиентов API.
+"""
+import argparse
+import json
+import sys
+import time
+from itertools import count
+from pathlib import Path
+
+from benchmarks import setup, summary, test_database
+
+BUDGETS_FILE = Path(__file__).with_name("query_budgets.json")
+
+
+class Scenario:
+    """
+    Сценарий обращения к маршруту.
+
+    prepare() вызывается перед каждым замером вне замера и возвращает аргументы
+    для reverse() и тело запроса. clear_cache сбрасывает кэш перед замером
+    (например, чтобы не срабатывало ограничение частоты запросов).
+    """
+
+    def __init__(self, method, prepare=None, auth="user", repeat=None, clear_cache=False):
+        self.method = method
+        self.prepare = prepare or (lambda: ({}, None))
+        self.auth = auth
+        self.repeat = repeat
+        self.clear_cache = clear_cache
+
+
+def build_scenarios(data):
+    from django_rest_passwordreset.models import ResetPasswordToken
+
+    from main.models import Advertisement, Review
+
+    user, ads, reviews = data["user"], data["ads"], data["reviews"]
+    sequence = count()
+
+    def own_ad():
+        return Advertisement.objects.create(author=user, title="Объявление", description="Описание", price=1)
+
+    def own_review():
+        return Review.objects.create(author=user, content="Отзыв", ads=ads[0])
+
+    ad_body = {"title": "Объявление", "description": "Описание", "price": 100}
+    return {
+        "main:ads-list": Scenario("get", lambda: ({}, {"page": 1})),
+        "main:ads-search": Scenario("get", lambda: ({}, {"q": "объявление"})),
+        "main:ads-detail": Scenario("get", lambda: ({"pk": ads[1].pk}, None)),
+        "main:ads-review-list": Scenario("get", lambda: ({"pk": ads[0].pk}, None)),
+        "main:ads-create": Scenario("post", lambda: ({}, ad_body)),
+        "main:ads-update": Scenario("patch", lambda: ({"pk": own_ad().pk}, {"price": 200})),
+        "main:ads-delete": Scenario("delete", lambda: ({"pk": own_ad().pk}, None)),
+        "main:ads-bulk": Scenario("post", lambda: ({}, [ad_body] * 100)),
+        "main:ads-bulk-delete": Scenario("post", lambda: ({}, {"ids": [own_ad().pk for _ in range(10)]})),
+        "main:review-detail": Scenario("get", lambda: ({"pk": reviews[0].pk}, None)),
+        "main:review-create": Scenario("post", lambda: ({"pk": ads[0].pk}, {"content": "Отзыв"})),
+        "main:review-update": Scenario("patch", lambda: ({"pk": own_review().pk}, {"content": "Новый отзыв"})),
+        "main:review-delete": Scenario("delete", lambda: ({"pk": own_review().pk}, None)),
+        "main:ads-export": Scenario("get", lambda: ({}, {"reviews": 1}), auth="admin", repeat=5),
+        "main:cache-stats": Scenario("get", auth="admin"),
+        "main:db-pool-stats": Scenario("get", auth="admin"),
+        "users:token_obtain_pair": Scenario(
+            "post", lambda: ({}, {"email": user.email, "password": data["password"]}), auth=None, repeat=5,
+            clear_cache=True,
+        ),
+        "users:token_refresh": Scenario("post", lambda: ({}, {"refresh": data["refresh"]}), auth=None),
+        "users:register": Scenario(
+            "post",
+            lambda: ({}, {"email": f"new{next(sequence)}@bench.ru", "password": "benchpassword", "first_name": "new"}),
+            auth=None,
+            repeat=5,
+            clear_cache=True,
+        ),
+        "users:password-reset": Scenario(
+            "post", lambda: ({}, {"email": user.email}), auth=None, clear_cache=True
+        ),
+        "users:password-reset-confirm": Scenario(
+            "post",
+            lambda: ({}, {
+                "new_password": data["password"],
+                "token": ResetPasswordToken.objects.create(user=user).key,
+                "uid": user.pk,
+            }),
+            auth=None,
+            repeat=5,
+        ),
+    }
+
+
+def route_names():
+    """Имена всех маршрутов приложений main и users."""
+    from main import urls as main_urls
+    from users import urls as users_urls
+
+    return [
+        f"{module.app_name}:{pattern.name}"
+        for module in (main_urls, users_urls)
+        for pattern in module.urlpatterns
+    ]
+
+
+def seed(users, ads, reviews):
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from benchmarks.seed import seed_ads, seed_reviews, seed_users
+    from users.models import User
+
+    authors = seed_users(users)
+    seeded_ads = seed_ads(ads, authors)
+    admin = User.objects.create(email="admin@bench.ru", first_name="admin", user_role="Администратор")
+    refresh = RefreshToken.for_user(authors[0])
+    return {
+        "user": authors[0],
+        "password": "benchpassword",
+        "ads": seeded_ads,
+        "reviews": seed_reviews(reviews, seeded_ads, authors),
+        "refresh": str(refresh),
+        "tokens": {"user": str(refresh.access_token), "admin": str(RefreshToken.for_user(admin).access_token)},
+    }
+
+
+def run_scenario(client, name, scenario, tokens, repeat):
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+
+    samples, queries = [], []
+    for _ in range(scenario.repeat or repeat):
+        if scenario.clear_cache:
+            cache.clear()
+        kwargs, body = scenario.prepare()
+        url = reverse(name, kwargs=kwargs)
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {tokens[scenario.auth]}"} if scenario.auth else {}
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = getattr(client, scenario.method)(url, body, format="json", **headers)
+            if response.streaming:
+                b"".join(response.streaming_content)
+            samples.append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{name}: {response.status_code} {response.content[:200]!r}")
+        queries.append(len(captured))
+    return {"method": scenario.method.upper(), **summary(samples), "queries": max(queries)}
+
+
+def run(users, ads, reviews, repeat):
+    from django.test import override_settings
+    from rest_framework.test import APIClient
+
+    from config.celery import app
+
+    app.conf.task_always_eager = True
+    results = {}
+    locmem = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    with override_settings(CACHE_ENABLED=False, CACHES=locmem), test_database():
+        data = seed(users, ads, reviews)
+        scenarios = build_scenarios(data)
+        missing = sorted(set(route_names()) - set(scenarios))
+        if missing:
+            raise RuntimeError(f"Нет сценария для маршрутов: {', '.join(missing)}")
+        client = APIClient()
+        for name in route_names():
+            results[name] = run_scenario(client, name, scenarios[name], data["tokens"], repeat)
+    return results
+
+
+def check_budgets(results, budgets):
+    """Сравнивает число запросов с бюджетом и возвращает список превышений."""
+    failures = []
+    for name, result in results.items():
+        budget = budgets.get(name)
+        result["budget"] = budget
+        if budget is not None and result["queries"] > budget:
+            failures.append(f"{name}: {result['queries']} запросов при бюджете {budget}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--ads", type=int, default=10000)
+    parser.add_argument("--reviews", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--output", default="bench_endpoints.json")
+    parser.add_argument("--update-budgets", action="store_true")
+    args = parser.parse_args()
+
+    setup()
+    results = run(args.users, args.ads, args.reviews, args.repeat)
+    budgets = json.loads(BUDGETS_FILE.read_text()) if BUDGETS_FILE.exists() else {}
+    if args.update_budgets:
+        budgets = {name: result["queries"] for name, result in results.items()}
+        BUDGETS_FILE.write_text(json.dumps(budgets, indent=2, ensure_ascii=False) + "\n")
+    failures = check_budgets(results, budgets)
+
+    report = {
+        "config": {"users": args.users, "ads": args.ads, "reviews": args.reviews, "repeat": args.repeat},
+        "routes": results,
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n")
+    for name, result in results.items():
+        print(f"{name:32} {result['method']:6} p50={result['p50']:9.3f}ms p99={result['p99']:9.3f}ms "
+              f"queries={result['queries']} budget={result['budget']}")
+    if failures:
+        print("\n".join(["Превышен бюджет запросов:", *failures]), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Время до первого байта, пропускная способность и пиковая память потоковой выгрузки объявлений.
+
+    python -m benchmarks.export --ads 10000 100000 1000000 --reviews-per-ad 2
+
+Пиковая память (tracemalloc) должна оставаться примерно одинаковой при росте таблицы.
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+from benchmarks import setup, test_database
+
+
+def consume(output_format, include_reviews):
+    """Полная выгрузка; возвращает время до первого куска и общий объём в байтах."""
+    from main.export import export_ads
+
+    started = time.perf_counter()
+    chunks = export_ads(output_format, include_reviews)
+    size = len(next(chunks).encode())
+    first_byte = time.perf_counter() - started
+    for chunk in chunks:
+        size += len(chunk.encode())
+    return first_byte, size
+
+
+def measure_export(output_format, include_reviews):
+    started = time.perf_counter()
+    first_byte, size = consume(output_format, include_reviews)
+    elapsed = time.perf_counter() - started
+
+    # Память замеряется отдельным проходом: tracemalloc заметно замедляет выполнение.
+    tracemalloc.start()
+    consume(output_format, include_reviews)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "first_byte_ms": round(first_byte * 1000, 3),
+        "total_s": round(elapsed, 3),
+        "mb_per_s": round(size / elapsed / 2 ** 20, 2),
+        "peak_memory_mb": round(peak / 2 ** 20, 2),
+    }
+
+
+def run(sizes, reviews_per_ad):
+    from benchmarks.seed import seed_ads, seed_reviews, seed_users
+
+    results = {}
+    with test_database():
+        authors = seed_users(100)
+        seeded = 0
+        for ads in sorted(sizes):
+            new_ads = seed_ads(ads - seeded, authors)
+            seed_reviews((ads - seeded) * reviews_per_ad, new_ads, authors)
+            seeded = ads
+            for output_format in ("ndjson", "csv"):
+                for include_reviews in (False, True):
+                    key = f"{ads}:{output_format}{':reviews' if include_reviews else ''}"
+                    results[key] = measure_export(output_format, include_reviews)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ads", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--reviews-per-ad", type=int, default=2)
+    args = parser.parse_args()
+
+    setup()
+    print(json.dumps(run(args.ads, args.reviews_per_ad), indent=2))
+
+
+if __name__ == "__main__":
+    main()
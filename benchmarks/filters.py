@@ -0,0 +1,120 @@
+"""
+Проверка индексов для фильтров и сортировок ленты объявлений (GET /ads/).
+
+    python -m benchmarks.filters --ads 1000000
+
+Для каждого сочетания фильтров (price_min/price_max, author, created_after) и сортировки
+запросы страницы пропускаются через EXPLAIN. Ошибкой считается полный проход по таблице
+(Seq Scan в Postgres, SCAN в SQLite — в том числе обход индекса, по которому нельзя проверить
+фильтры), и запуск завершается с кодом 1. Обход индекса сортировки, в котором есть все
+отфильтрованные столбцы, допустим: при широком диапазоне created_after это лучший план
+для сортировки по цене, а строки читаются только для подходящих записей. Без фильтров обход
+индекса сортировки и COUNT(*) по всей таблице неизбежны, поэтому для них ошибкой считается
+только SCAN без индекса.
+"""
+import argparse
+import itertools
+import json
+import re
+import sys
+
+from benchmarks import measure, setup, summary, test_database
+
+ORDERINGS = ("-created_at", "created_at", "price", "-price")
+# Столбцы таблицы, по которым отбирает каждый фильтр.
+FILTER_COLUMNS = {"price": {"price"}, "author": {"author_id"}, "created_after": {"created_at"}}
+SCAN_INDEX_RE = re.compile(r"^SCAN main_advertisement USING (?:COVERING )?INDEX (\w+)")
+
+
+def index_columns(cursor, name):
+    cursor.execute(f"PRAGMA index_info({name})")
+    return {row[2] for row in cursor.fetchall()}
+
+
+def explain(sql, columns=frozenset()):
+    """План запроса и признак полного прохода по таблице объявлений (columns — отфильтрованные столбцы)."""
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(f"EXPLAIN {sql}")
+            plan = [row[0] for row in cursor.fetchall()]
+            full_scan = any("Seq Scan on main_advertisement" in line for line in plan)
+        else:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+            plan = [row[-1] for row in cursor.fetchall()]
+            full_scan = False
+            for line in plan:
+                if not line.strip().startswith("SCAN main_advertisement"):
+                    continue
+                index = SCAN_INDEX_RE.match(line.strip())
+                full_scan = full_scan or index is None or not columns <= index_columns(cursor, index.group(1))
+    return plan, full_scan
+
+
+def combinations(filters):
+    for size in range(len(filters) + 1):
+        for names in itertools.combinations(filters, size):
+            for ordering in ORDERINGS:
+                params = {"ordering": ordering, "page_size": 10}
+                for name in names:
+                    params.update(filters[name])
+                yield "+".join(names) or "none", ordering, params
+
+
+def run(ads, repeat):
+    from django.db import connection
+    from django.test import override_settings
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework.test import APIClient
+
+    from benchmarks.seed import seed_ads, seed_users
+    from main.models import Advertisement
+
+    results, failures = {}, []
+    with override_settings(CACHE_ENABLED=False), test_database():
+        authors = seed_users(100)
+        seed_ads(ads, authors)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        created = Advertisement.objects.order_by("-created_at").values_list("created_at", flat=True)[ads // 10]
+        filters = {
+            "price": {"price_min": 1000, "price_max": 2000},
+            "author": {"author": authors[7].pk},
+            "created_after": {"created_after": created.isoformat()},
+        }
+        client = APIClient()
+        for names, ordering, params in combinations(filters):
+            for mode in ("page", "cursor"):
+                request_params = {**params, "pagination": "cursor"} if mode == "cursor" else params
+                with CaptureQueriesContext(connection) as captured:
+                    response = client.get("/ads/", request_params)
+                assert response.status_code == 200, response.content
+                columns = set().union(*(FILTER_COLUMNS[name] for name in names.split("+") if name != "none"))
+                plans = [explain(query["sql"], columns) for query in captured if "main_advertisement" in query["sql"]]
+                key = f"{mode}:{names}:{ordering}"
+                results[key] = {
+                    **summary(measure(lambda: client.get("/ads/", request_params), repeat)),
+                    "plans": [plan for plan, _ in plans],
+                }
+                if any(full_scan for _, full_scan in plans):
+                    failures.append(key)
+    return results, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ads", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    setup()
+    results, failures = run(args.ads, args.repeat)
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if failures:
+        print("Полный проход по таблице: " + ", ".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Скорость кодирования и разбора JSON: рендерер и парсер DRF на стандартном json против config.renderers (orjson).
+
+    python -m benchmarks.json_rendering --ads 1000 --bulk 1000
+
+Замеряются:
+- ads-page — страница объявлений в том виде, в каком её отдаёт API (даты уже строки);
+- ads-rows — строки values() с датами-объектами datetime (кодирование дат рендерером);
+- bulk-render / bulk-parse — тело массового создания объявлений (POST /ads/bulk/).
+Для каждого случая выводится медиана в миллисекундах и пропускная способность в МБ/с.
+"""
+import argparse
+import io
+import json
+
+from benchmarks import measure, setup, summary, test_database
+
+
+def throughput(samples, size):
+    result = summary(samples)
+    result["mb_per_second"] = round(size / 1024 / 1024 / (result["p50"] / 1000), 1)
+    return result
+
+
+def run(ads, bulk, repeat):
+    from rest_framework import parsers, renderers
+
+    from benchmarks.seed import seed_ads, seed_users
+    from config.renderers import JSONParser, JSONRenderer
+    from main.models import Advertisement
+    from main.serializers import AdvertisementValuesSerializer
+
+    with test_database():
+        seed_ads(ads, seed_users(10))
+        queryset = Advertisement.objects.order_by("-created_at", "-id")
+        values_serializer = AdvertisementValuesSerializer()
+        rows = list(values_serializer.values(queryset))
+        page = {"count": ads, "next": None, "previous": None, "results": values_serializer.to_representation(rows)}
+
+    body = [
+        {"title": f"Объявление {number}", "description": "Описание объявления", "price": number}
+        for number in range(bulk)
+    ]
+    payloads = {"ads-page": page, "ads-rows": rows, "bulk-render": body}
+    implementations = {
+        "drf": (renderers.JSONRenderer(), parsers.JSONParser()),
+        "orjson": (JSONRenderer(), JSONParser()),
+    }
+
+    results = {}
+    for name, payload in payloads.items():
+        expected = implementations["drf"][0].render(payload)
+        for implementation, (renderer, _) in implementations.items():
+            assert renderer.render(payload) == expected, f"{name}: вывод {implementation} отличается"
+            results[f"{name}:{implementation}"] = throughput(
+                measure(lambda: renderer.render(payload), repeat), len(expected)
+            )
+
+    encoded = json.dumps(body, ensure_ascii=False).encode()
+    for implementation, (_, parser) in implementations.items():
+        results[f"bulk-parse:{implementation}"] = throughput(
+            measure(lambda: parser.parse(io.BytesIO(encoded)), repeat), len(encoded)
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ads", type=int, default=1000)
+    parser.add_argument("--bulk", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    setup()
+    print(json.dumps(run(args.ads, args.bulk, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Сравнение постраничной и курсорной пагинации ленты объявлений.
+
+    python -m benchmarks.pagination --ads 100000 --page-size 10
+
+Для курсорного режима курсор нужной страницы строится заранее, вне замера,
+поэтому замеряется только стоимость выдачи самой страницы.
+"""
+import argparse
+import json
+
+from benchmarks import measure, setup, summary, test_database
+
+PAGES = (1, 10, 100, 1000, 10000)
+
+
+def cursor_for_page(page, page_size):
+    """Курсор, указывающий на начало страницы page в порядке выдачи ленты."""
+    from rest_framework.pagination import Cursor
+
+    from main.models import Advertisement
+    from main.paginators import AdsCursorPaginator
+
+    paginator = AdsCursorPaginator()
+    paginator.base_url = "/ads/"
+    if page == 1:
+        return None
+    position = (
+        Advertisement.objects.order_by(*AdsCursorPaginator.ordering)
+        .values_list("created_at", flat=True)[(page - 1) * page_size - 1]
+    )
+    url = paginator.encode_cursor(Cursor(offset=0, reverse=False, position=str(position)))
+    return url.split("cursor=", 1)[1]
+
+
+def run(ads, page_size, repeat):
+    from django.test import override_settings
+    from rest_framework.test import APIClient
+
+    from benchmarks.seed import seed_ads, seed_users
+
+    results = {}
+    # Кэш ответов ленты выдал бы все страницы за одно и то же время (см. main.cache).
+    with override_settings(CACHE_ENABLED=False), test_database():
+        authors = seed_users(10)
+        seed_ads(ads, authors)
+        client = APIClient()
+        for page in PAGES:
+            if (page - 1) * page_size >= ads:
+                break
+            results[f"page_number:{page}"] = summary(
+                measure(lambda: client.get("/ads/", {"page": page, "page_size": page_size}), repeat)
+            )
+            params = {"pagination": "cursor", "page_size": page_size}
+            cursor = cursor_for_page(page, page_size)
+            if cursor:
+                params["cursor"] = cursor
+            results[f"cursor:{page}"] = summary(measure(lambda: client.get("/ads/", params), repeat))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ads", type=int, default=100000)
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    setup()
+    print(json.dumps(run(args.ads, args.page_size, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
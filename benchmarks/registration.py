@@ -0,0 +1,140 @@
+"""
+Пропускная способность регистрации при всплеске запросов.
+
+    python -m benchmarks.registration --requests 200 --concurrency 50 --hashing-workers 0 1 2
+
+Для каждого значения --hashing-workers (PASSWORD_HASHING_WORKERS, 0 — хеширование в потоке
+запроса) запускается gunicorn с боевыми настройками (config.server, режим wsgi) на временной
+базе SQLite, и на него отправляется --requests регистраций не более чем по --concurrency
+одновременно. Каждый запрос приходит как бы от своего клиента (свой X-Forwarded-For),
+поэтому ограничение частоты на IP не срабатывает.
+Заодно замеряется задержка лёгкого запроса (GET /ads/) во время всплеска.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import percentile
+from benchmarks.concurrency import ROOT, REQUEST_TIMEOUT, read_response, wait_for_port
+
+
+def prepare_database(path):
+    os.environ["SQLITE_NAME"] = path
+    os.environ["CACHE_ENABLED"] = "False"
+
+    from benchmarks import setup
+
+    setup()
+    from django.core.management import call_command
+
+    call_command("migrate", verbosity=0)
+
+
+def registration_request(number, run):
+    body = json.dumps(
+        {"email": f"burst{run}-{number}@bench.ru", "password": "benchpassword", "first_name": "burst"}
+    ).encode()
+    address = f"10.{number >> 16 & 255}.{number >> 8 & 255}.{number & 255}"
+    return (
+        f"POST /users/register/ HTTP/1.1\r\nHost: 127.0.0.1\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\nX-Forwarded-For: {address}\r\nConnection: close\r\n\r\n"
+    ).encode() + body
+
+
+async def send(port, request):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(request)
+        await writer.drain()
+        status, _ = await asyncio.wait_for(read_response(reader), REQUEST_TIMEOUT)
+        return status
+    finally:
+        writer.close()
+
+
+async def burst(port, requests, concurrency, run):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, statuses = [], {}
+    probes = []
+    done = asyncio.Event()
+
+    async def register(number):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                status = await send(port, registration_request(number, run))
+            except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+                status = "connection"
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    async def probe():
+        request = b"GET /ads/ HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: close\r\n\r\n"
+        while not done.is_set():
+            started = time.perf_counter()
+            try:
+                await send(port, request)
+            except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+                pass
+            probes.append((time.perf_counter() - started) * 1000)
+            await asyncio.sleep(0.05)
+
+    probing = asyncio.ensure_future(probe())
+    started = time.perf_counter()
+    await asyncio.gather(*(register(number) for number in range(requests)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await probing
+    return {
+        "registrations_per_second": round(statuses.get(201, 0) / elapsed, 2),
+        "p50": round(percentile(latencies, 50), 1),
+        "p99": round(percentile(latencies, 99), 1),
+        "probe_p50": round(percentile(probes, 50), 1) if probes else None,
+        "probe_p99": round(percentile(probes, 99), 1) if probes else None,
+        "statuses": {str(status): count for status, count in statuses.items()},
+    }
+
+
+def run_server(args, database, hashing_workers, run):
+    env = {
+        **os.environ, "SQLITE_NAME": database, "CACHE_ENABLED": "False", "PYTHONPATH": str(ROOT),
+        "WEB_MODE": "wsgi", "WEB_PORT": str(args.port), "WEB_WORKERS": str(args.workers),
+        "WEB_THREADS": str(args.threads), "PASSWORD_HASHING_WORKERS": str(hashing_workers), "DEBUG": "False",
+    }
+    command = [sys.executable, "-m", "gunicorn", "-c", "python:config.server", "--log-level", "warning"]
+    server = subprocess.Popen(command, cwd=ROOT, env=env)
+    try:
+        wait_for_port(args.port)
+        return asyncio.run(burst(args.port, args.requests, args.concurrency, run))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--hashing-workers", type=int, nargs="+", default=[0, os.cpu_count() or 1])
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = os.path.join(directory, "bench.sqlite3")
+        prepare_database(database)
+        results = {
+            str(workers): run_server(args, database, workers, run)
+            for run, workers in enumerate(args.hashing_workers)
+        }
+    print(json.dumps({"config": vars(args), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
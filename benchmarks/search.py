@@ -0,0 +1,79 @@
+"""
+Задержка полнотекстового поиска объявлений (GET /ads/search/?q=).
+
+    python -m benchmarks.search --ads 1000000
+
+Объявления заполняются случайными словами из словаря с неравномерными частотами,
+поэтому запросы различаются по избирательности: от редких слов до слов,
+встречающихся в большинстве объявлений.
+"""
+import argparse
+import json
+import random
+
+from benchmarks import measure, setup, summary, test_database
+
+VOCABULARY = [
+    "велосипед", "диван", "телефон", "ноутбук", "коляска", "шкаф", "холодильник", "куртка", "гитара", "палатка",
+    "самокат", "монитор", "кресло", "стол", "лыжи", "сноуборд", "камера", "часы", "наушники", "пылесос",
+]
+FILLER = ["продам", "новый", "состояние", "хорошее", "срочно", "торг", "доставка", "самовывоз"]
+QUERIES = ["пылесос", "велосипед", "продам", "велосипед новый", "отсутствующееслово"]
+
+
+def seed(count):
+    from benchmarks.seed import BATCH_SIZE, seed_users
+    from main.models import Advertisement
+
+    rng = random.Random(0)
+    authors = seed_users(10)
+    weights = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+    batch = []
+    for number in range(count):
+        item = rng.choices(VOCABULARY, weights)[0]
+        batch.append(Advertisement(
+            title=f"{item} {rng.choice(FILLER)}",
+            description=" ".join(rng.choices(FILLER + VOCABULARY, k=8)),
+            price=100 + number % 10000,
+            author=authors[number % len(authors)],
+        ))
+        if len(batch) == BATCH_SIZE:
+            Advertisement.objects.bulk_create(batch)
+            batch = []
+    Advertisement.objects.bulk_create(batch)
+
+
+def run(ads, page_size, repeat):
+    from rest_framework.test import APIClient
+
+    results = {}
+    with test_database():
+        seed(ads)
+        client = APIClient()
+        for query in QUERIES:
+            params = {"q": query, "page_size": page_size}
+            results[f"{query}:first"] = summary(measure(lambda: client.get("/ads/search/", params), repeat))
+            response = client.get("/ads/search/", params).json()
+            for _ in range(9):
+                if not response["next"]:
+                    break
+                response = client.get(response["next"]).json()
+            if response["next"]:
+                next_url = response["next"]
+                results[f"{query}:page11"] = summary(measure(lambda: client.get(next_url), repeat))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ads", type=int, default=1000000)
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    setup()
+    print(json.dumps(run(args.ads, args.page_size, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Наполнение тестовой базы данными для бенчмарков."""
+from django.contrib.auth.hashers import make_password
+
+BATCH_SIZE = 5000
+
+
+def seed_users(count, password="benchpassword"):
+    """Создаёт count активных пользователей с одним и тем же паролем."""
+    from users.models import User
+
+    hashed = make_password(password)
+    users = [
+        User(email=f"bench{number}@bench.ru", first_name=f"bench{number}", password=hashed, is_active=True)
+        for number in range(count)
+    ]
+    return User.objects.bulk_create(users, batch_size=BATCH_SIZE)
+
+
+def seed_ads(count, authors):
+    """Создаёт count объявлений, распределённых по авторам."""
+    from main.models import Advertisement
+
+    ads = [
+        Advertisement(
+            title=f"Объявление {number}",
+            description=f"Описание объявления номер {number}",
+            price=100 + number % 10000,
+            author=authors[number % len(authors)],
+        )
+        for number in range(count)
+    ]
+    return Advertisement.objects.bulk_create(ads, batch_size=BATCH_SIZE)
+
+
+def seed_reviews(count, ads, authors):
+    """Создаёт count отзывов, распределённых по объявлениям и авторам."""
+    from main.models import Review
+
+    reviews = [
+        Review(
+            content=f"Отзыв номер {number}",
+            ads=ads[number % len(ads)],
+            author=authors[number % len(authors)],
+        )
+        for number in range(count)
+    ]
+    return Review.objects.bulk_create(reviews, batch_size=BATCH_SIZE)
@@ -0,0 +1,62 @@
+"""
+Сравнение сериализации страницы списка через ModelSerializer и через values() (ValuesSerializer).
+
+    python -m benchmarks.serialization --ads 2000 --reviews 2000
+
+Для каждого размера страницы замеряется чтение страницы из БД вместе с сериализацией:
+"serializer" — экземпляры моделей и поля DRF, как раньше, "values" — быстрый путь списков.
+Перед замером проверяется, что оба пути дают одинаковый JSON.
+"""
+import argparse
+import json
+
+from benchmarks import measure, setup, summary, test_database
+
+PAGE_SIZES = (10, 100, 1000)
+
+
+def run(ads, reviews, repeat):
+    from main.models import Advertisement, Review
+    from main.serializers import AdvertisementValuesSerializer, ReviewValuesSerializer
+
+    from benchmarks.seed import seed_ads, seed_reviews, seed_users
+
+    results = {}
+    with test_database():
+        authors = seed_users(10)
+        seeded_ads = seed_ads(ads, authors)
+        seed_reviews(reviews, seeded_ads[:1], authors)
+        cases = {
+            "ads": (AdvertisementValuesSerializer(), Advertisement.objects.order_by("-created_at", "-id")),
+            "reviews": (
+                ReviewValuesSerializer(),
+                Review.objects.filter(ads=seeded_ads[0]).select_related("author").order_by("-created_at", "-id"),
+            ),
+        }
+        for name, (values_serializer, queryset) in cases.items():
+            for page_size in PAGE_SIZES:
+                def current():
+                    return values_serializer.serializer_class(list(queryset[:page_size]), many=True).data
+
+                def fast():
+                    return values_serializer.to_representation(values_serializer.values(queryset)[:page_size])
+
+                assert json.dumps(fast()) == json.dumps(current()), f"{name}: ответы различаются"
+                results[f"{name}:serializer:{page_size}"] = summary(measure(current, repeat))
+                results[f"{name}:values:{page_size}"] = summary(measure(fast, repeat))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ads", type=int, default=2000)
+    parser.add_argument("--reviews", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    setup()
+    print(json.dumps(run(args.ads, args.reviews, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Сжатие ответов: Brotli, если установлен модуль brotli и клиент его принимает, иначе gzip.
+
+Сжимаются ответы не короче COMPRESSION_MIN_SIZE байт (и потоковые — выгрузка объявлений)
+без собственного Content-Encoding, если сжатый вариант получился короче исходного.
+Для HTML (страницы с CSRF-токеном) всегда используется gzip: Django добавляет в него случайные
+байты против атаки BREACH, у Brotli такой защиты нет.
+Статика не сжимается на лету: при collectstatic рядом с файлами пишутся готовые .gz и .br
+(config.storage), и их отдаёт nginx.
+"""
+import gzip
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence, compress_string
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+GZIP = "gzip"
+BROTLI = "br"
+
+
+def accepted_encodings(header):
+    """ Кодировки из заголовка Accept-Encoding, кроме отключённых через q=0. """
+    encodings = set()
+    for part in header.split(","):
+        coding, _, params = part.partition(";")
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        encodings.add(coding.strip().lower())
+    return encodings
+
+
+def compress_file_content(content, encoding):
+    """ Сжатие с максимальной степенью для заранее сжатой статики (без метки времени, воспроизводимо). """
+    if encoding == BROTLI:
+        return brotli.compress(content, quality=11)
+    return gzip.compress(content, compresslevel=9, mtime=0)
+
+
+def brotli_sequence(sequence, quality):
+    compressor = brotli.Compressor(quality=quality)
+    for item in sequence:
+        # flush() отдаёт клиенту всё сжатое на данный момент, не дожидаясь конца потока.
+        data = compressor.process(item) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def abrotli_sequence(sequence, quality):
+    compressor = brotli.Compressor(quality=quality)
+    async for item in sequence:
+        data = compressor.process(item) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware:
+    """
+    Сжатие ответов Brotli или gzip по Accept-Encoding клиента (замена django.middleware.gzip).
+
+    Работает и под WSGI, и под ASGI без перехода в поток.
+    """
+    sync_capable = True
+    async_capable = True
+    max_random_bytes = 100
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def get_encoding(self, request, response):
+        encodings = accepted_encodings(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        html = response.get("Content-Type", "").startswith("text/html")
+        if brotli is not None and BROTLI in encodings and not html:
+            return BROTLI
+        if GZIP in encodings:
+            return GZIP
+        return None
+
+    def compress(self, content, encoding):
+        if encoding == BROTLI:
+            return brotli.compress(content, quality=settings.COMPRESSION_BROTLI_QUALITY)
+        return compress_string(content, max_random_bytes=self.max_random_bytes)
+
+    def compress_stream(self, response, encoding):
+        content = response.streaming_content
+        if encoding == BROTLI:
+            if response.is_async:
+                return abrotli_sequence(content, settings.COMPRESSION_BROTLI_QUALITY)
+            return brotli_sequence(content, settings.COMPRESSION_BROTLI_QUALITY)
+        if response.is_async:
+            async def gzip_wrapper():
+                async for chunk in content:
+                    yield compress_string(chunk, max_random_bytes=self.max_random_bytes)
+
+            return gzip_wrapper()
+        return compress_sequence(content, max_random_bytes=self.max_random_bytes)
+
+    def process_response(self, request, response):
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+        if response.has_header("Content-Encoding"):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = self.get_encoding(request, response)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = self.compress_stream(response, encoding)
+            # Размер сжатого потока заранее неизвестен.
+            del response.headers["Content-Length"]
+        else:
+            compressed = self.compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # Сильный ETag после сжатия становится слабым (RFC 9110, 8.8.1), как в GZipMiddleware.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
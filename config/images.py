@@ -0,0 +1,148 @@
+"""
+Уменьшенные копии изображений: аватаров пользователей и фотографий объявлений.
+
+Для каждого загруженного изображения строятся варианты шириной IMAGE_VARIANT_WIDTHS
+в форматах WebP и JPEG. Они создаются задачей Celery сразу после загрузки
+(main.tasks.generate_image_variants), так что запрос на загрузку их не ждёт. Если задача
+не выполнилась, недостающий вариант создаётся при первом обращении (image_variant_view).
+Варианты хранятся на диске в MEDIA_ROOT по пути variants/<имя оригинала>/<ширина>.<формат>,
+и после создания их, как обычные файлы, отдаёт nginx.
+
+В ответах API вместо оригинала отдаётся ссылка на наименьший вариант, ширина которого
+не меньше запрошенной (?image_width=, по умолчанию IMAGE_DEFAULT_WIDTH). Формат задаётся
+параметром ?image_format= (webp или jpg, по умолчанию webp).
+"""
+import io
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404
+from PIL import Image, ImageOps, UnidentifiedImageError
+from rest_framework import serializers
+
+VARIANTS_DIR = "variants"
+# Расширение варианта -> формат Pillow и тип содержимого.
+FORMATS = {"webp": ("WEBP", "image/webp"), "jpg": ("JPEG", "image/jpeg")}
+DEFAULT_EXTENSION = "webp"
+
+
+def variant_name(name, width, extension):
+    return f"{VARIANTS_DIR}/{name}/{width}.{extension}"
+
+
+def choose_width(requested):
+    """ Наименьшая ширина варианта не меньше requested; самая большая, если таких нет. """
+    widths = sorted(settings.IMAGE_VARIANT_WIDTHS)
+    return next((width for width in widths if width >= requested), widths[-1])
+
+
+def open_image(name):
+    """ Декодированный оригинал, повёрнутый по метке EXIF Orientation. """
+    with default_storage.open(name) as file, Image.open(file) as image:
+        # Для JPEG декодер сразу уменьшает изображение в 2, 4 или 8 раз, если оно больше самого крупного варианта.
+        image.draft("RGB", (max(settings.IMAGE_VARIANT_WIDTHS),) * 2)
+        return ImageOps.exif_transpose(image)
+
+
+def render_variant(image, width, extension):
+    """ Вариант шириной не больше width (без увеличения) с сохранением пропорций; возвращает байты файла. """
+    image_format, _ = FORMATS[extension]
+    variant = image.copy()
+    variant.thumbnail((width, variant.height), Image.Resampling.LANCZOS)
+    if variant.mode in ("RGBA", "LA", "PA") or "transparency" in variant.info:
+        variant = variant.convert("RGBA")
+        if image_format == "JPEG":
+            # В JPEG нет прозрачности: накладываем изображение на белый фон.
+            background = Image.new("RGB", variant.size, "white")
+            background.paste(variant, mask=variant.getchannel("A"))
+            variant = background
+    elif variant.mode != "RGB":
+        variant = variant.convert("RGB")
+    output = io.BytesIO()
+    if image_format == "JPEG":
+        variant.save(output, image_format, quality=settings.IMAGE_VARIANT_QUALITY, optimize=True, progressive=True)
+    else:
+        variant.save(output, image_format, quality=settings.IMAGE_VARIANT_QUALITY, method=4)
+    return output.getvalue()
+
+
+def save_variant(name, content):
+    """ Атомарная запись: параллельный запрос не увидит недописанный файл, а гонка не создаст дубликат. """
+    path = default_storage.path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(content)
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def generate_variants(name, variants=None):
+    """
+    Создаёт недостающие варианты изображения name, по умолчанию — все (ширины × форматы).
+    Оригинал декодируется один раз на все варианты. Возвращает имена созданных файлов.
+    """
+    if variants is None:
+        variants = [(width, extension) for width in settings.IMAGE_VARIANT_WIDTHS for extension in FORMATS]
+    missing = [
+        (width, extension) for width, extension in variants
+        if not default_storage.exists(variant_name(name, width, extension))
+    ]
+    if not missing:
+        return []
+    image = open_image(name)
+    created = []
+    for width, extension in missing:
+        save_variant(variant_name(name, width, extension), render_variant(image, width, extension))
+        created.append(variant_name(name, width, extension))
+    return created
+
+
+def image_variant_view(request, name, width, extension):
+    """ Отдаёт вариант изображения, создавая его при первом обращении; дальше файл отдаёт nginx. """
+    width = int(width)
+    if width not in settings.IMAGE_VARIANT_WIDTHS or extension not in FORMATS or name.startswith(VARIANTS_DIR + "/"):
+        raise Http404
+    try:
+        generate_variants(name, [(width, extension)])
+        file = default_storage.open(variant_name(name, width, extension))
+    except (FileNotFoundError, IsADirectoryError, SuspiciousFileOperation, UnidentifiedImageError,
+            Image.DecompressionBombError):
+        raise Http404
+    response = FileResponse(file, content_type=FORMATS[extension][1])
+    # Имя варианта определяется именем оригинала, а новый оригинал всегда сохраняется под новым именем.
+    response["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
+
+
+class ImageVariantField(serializers.ImageField):
+    """ ImageField, отдающий вместо оригинала ссылку на вариант подходящей ширины (см. описание модуля). """
+
+    def get_converter(self, request):
+        """ Функция имя файла -> ссылка; параметры запроса разбираются один раз (для страниц списков). """
+        params = request.query_params if request is not None else {}
+        try:
+            width = choose_width(int(params.get("image_width", settings.IMAGE_DEFAULT_WIDTH)))
+        except ValueError:
+            width = choose_width(settings.IMAGE_DEFAULT_WIDTH)
+        extension = params.get("image_format", DEFAULT_EXTENSION)
+        if extension not in FORMATS:
+            extension = DEFAULT_EXTENSION
+
+        def convert(name):
+            if not name:
+                return None
+            url = default_storage.url(variant_name(name, width, extension))
+            return request.build_absolute_uri(url) if request is not None else url
+
+        return convert
+
+    def to_representation(self, value):
+        return self.get_converter(self.context.get("request"))(getattr(value, "name", value))
@@ -0,0 +1,94 @@
+"""
+PostgreSQL с пулом соединений: ENGINE = "config.postgresql".
+
+Соединение берётся из пула при первом запросе к БД и возвращается в него, когда Django
+закрывает соединение (в конце HTTP-запроса или задачи Celery при CONN_MAX_AGE = 0).
+Параметры пула задаются ключом POOL в настройках базы данных:
+MAX_SIZE, TIMEOUT, MAX_IDLE, MAX_LIFETIME (см. config.postgresql.pool.ConnectionPool).
+При CONN_HEALTH_CHECKS соединение, простоявшее в пуле больше секунды, проверяется перед выдачей.
+"""
+import threading
+
+from django.db.backends.postgresql import base
+from psycopg2 import extensions
+
+from config.postgresql.pool import ConnectionPool, PoolTimeout
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _reset(conn):
+    if conn.closed:
+        return False
+    status = conn.info.transaction_status
+    if status in (extensions.TRANSACTION_STATUS_INTRANS, extensions.TRANSACTION_STATUS_INERROR):
+        conn.rollback()
+        return True
+    return status == extensions.TRANSACTION_STATUS_IDLE
+
+
+def _check(conn):
+    if conn.closed:
+        return False
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT 1")
+    return True
+
+
+def pool_stats():
+    """ Статистика пулов соединений текущего процесса. """
+    with _pools_lock:
+        pools = list(_pools.items())
+    return [{"alias": alias, "database": database, **pool.stats()} for (alias, database, _), pool in pools]
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    pool = None
+
+    def get_pool(self, conn_params):
+        # Пул привязан к параметрам подключения: тестовая база, например, получает свой пул.
+        key = (self.alias, conn_params.get("dbname"), repr(sorted(conn_params.items())))
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                options = self.settings_dict.get("POOL", {})
+                pool = _pools[key] = ConnectionPool(
+                    max_size=options.get("MAX_SIZE", 10),
+                    timeout=options.get("TIMEOUT", 10),
+                    max_idle=options.get("MAX_IDLE", 300),
+                    max_lifetime=options.get("MAX_LIFETIME", 1800),
+                    check=_check if self.settings_dict["CONN_HEALTH_CHECKS"] else None,
+                    reset=_reset,
+                )
+        return pool
+
+    def _connect(self, conn_params):
+        return super().get_new_connection(conn_params)
+
+    def get_new_connection(self, conn_params):
+        pool = self.get_pool(conn_params)
+        try:
+            connection = pool.get(lambda: self._connect(conn_params))
+        except PoolTimeout as error:
+            raise base.Database.OperationalError(str(error)) from error
+        # Родительский метод выставляет уровень изоляции только новым соединениям; настройки
+        # к этому моменту уже проверены им при открытии первого соединения пула.
+        self.isolation_level = base.IsolationLevel(
+            self.settings_dict["OPTIONS"].get("isolation_level", base.IsolationLevel.READ_COMMITTED)
+        )
+        self.pool = pool
+        return connection
+
+    def fill_pool(self, count):
+        """ Заранее открывает count соединений пула (не больше MAX_SIZE). """
+        conn_params = self.get_connection_params()
+        self.get_pool(conn_params).fill(count, lambda: self._connect(conn_params))
+
+    def _close(self):
+        with self.wrap_database_errors:
+            if self.in_atomic_block:
+                # Закрытое внутри транзакции соединение остаётся у обёртки до её конца, в пул его не вернуть.
+                self.pool.discard(self.connection)
+            else:
+                self.pool.put(self.connection)
@@ -0,0 +1,211 @@
+import os
+import threading
+import time
+import weakref
+from collections import Counter, deque
+
+
+class PoolTimeout(Exception):
+    """ Все соединения пула заняты дольше допустимого. """
+
+
+# Соединения, унаследованные дочерним процессом после fork: закрывать их нельзя
+# (закрытие оборвёт соединение родителя), поэтому ссылки просто сохраняются.
+_inherited = []
+_pools = weakref.WeakSet()
+
+
+class ConnectionPool:
+    """
+    Ограниченный пул соединений с БД, общий для всех потоков процесса.
+
+    Новые соединения открывает функция connect, переданная в get() и fill().
+    check(conn) — проверка соединения, простоявшего дольше check_after секунд,
+    перед выдачей; reset(conn) — приведение
+    соединения в исходное состояние при возврате в пул, False — соединение нужно закрыть.
+    Простаивающие дольше max_idle и прожившие дольше max_lifetime секунд соединения закрываются.
+    """
+
+    def __init__(self, max_size=10, timeout=10, max_idle=300, max_lifetime=1800, check=None, reset=None,
+                 check_after=1):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.check = check
+        self.reset = reset
+        self.check_after = check_after
+        self._init_state()
+        _pools.add(self)
+
+    def _init_state(self):
+        self._lock = threading.Condition()
+        self._idle = deque()  # (соединение, время открытия, время возврата в пул)
+        self._opened = {}  # id(соединения) -> время открытия
+        self._opening = 0
+        self._waiting = 0
+        self.counters = Counter()
+
+    def _size(self):
+        return len(self._opened) + self._opening
+
+    def _expired(self, now):
+        """ Снимает с учёта простоявшие и отжившие свободные соединения; закрывать их вызывающему. """
+        expired = []
+        kept = deque()
+        for item in self._idle:
+            conn, opened, returned = item
+            if now - returned >= self.max_idle or now - opened >= self.max_lifetime:
+                del self._opened[id(conn)]
+                expired.append(conn)
+            else:
+                kept.append(item)
+        self._idle = kept
+        self.counters["closed"] += len(expired)
+        return expired
+
+    @staticmethod
+    def _close(connections):
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def get(self, connect):
+        """ Выдаёт свободное соединение или открывает новое, если пул не заполнен. """
+        deadline = time.monotonic() + self.timeout
+        while True:
+            with self._lock:
+                while True:
+                    now = time.monotonic()
+                    expired = self._expired(now)
+                    if self._idle:
+                        # Последнее возвращённое соединение: остальные дольше простаивают и раньше закрываются.
+                        conn, opened, returned = self._idle.pop()
+                        break
+                    if self._size() < self.max_size:
+                        conn = None
+                        self._opening += 1
+                        break
+                    if now >= deadline:
+                        self.counters["timeouts"] += 1
+                        raise PoolTimeout(f"Нет свободных соединений в пуле из {self.max_size} за {self.timeout} с")
+                    self._waiting += 1
+                    try:
+                        self._lock.wait(deadline - now)
+                    finally:
+                        self._waiting -= 1
+            self._close(expired)
+
+            if conn is None:
+                return self._open(connect)
+            if self.check is None or now - returned < self.check_after or self._healthy(conn):
+                self.counters["reused"] += 1
+                return conn
+            self.counters["failed_checks"] += 1
+            self.discard(conn)
+
+    def _healthy(self, conn):
+        try:
+            return self.check(conn)
+        except Exception:
+            return False
+
+    def _open(self, connect):
+        try:
+            conn = connect()
+        except BaseException:
+            with self._lock:
+                self._opening -= 1
+                self._lock.notify()
+            raise
+        with self._lock:
+            self._opening -= 1
+            self._opened[id(conn)] = time.monotonic()
+            self.counters["opened"] += 1
+        return conn
+
+    def put(self, conn):
+        """ Возвращает соединение в пул. """
+        with self._lock:
+            opened = self._opened.get(id(conn))
+        if opened is None:
+            # Соединение открыто не этим пулом, например до fork.
+            _inherited.append(conn)
+            return
+        now = time.monotonic()
+        reusable = now - opened < self.max_lifetime
+        if reusable and self.reset is not None:
+            try:
+                reusable = self.reset(conn)
+            except Exception:
+                reusable = False
+        if not reusable:
+            self.discard(conn)
+            return
+        with self._lock:
+            self._idle.append((conn, opened, now))
+            self._lock.notify()
+
+    def discard(self, conn):
+        """ Закрывает соединение и освобождает его место в пуле. """
+        with self._lock:
+            if self._opened.pop(id(conn), None) is not None:
+                self.counters["closed"] += 1
+            self._lock.notify()
+        self._close([conn])
+
+    def fill(self, count, connect):
+        """ Заранее открывает соединения, пока в пуле не станет count (но не больше max_size). """
+        count = min(count, self.max_size)
+        while True:
+            with self._lock:
+                if self._size() >= count:
+                    return
+                self._opening += 1
+            self.put(self._open(connect))
+
+    def close_idle(self):
+        """ Закрывает все свободные соединения. """
+        with self._lock:
+            idle = [conn for conn, _, _ in self._idle]
+            self._idle.clear()
+            for conn in idle:
+                del self._opened[id(conn)]
+            self.counters["closed"] += len(idle)
+        self._close(idle)
+
+    def _after_fork(self):
+        _inherited.extend(conn for conn, _, _ in self._idle)
+        self._init_state()
+
+    def stats(self):
+        with self._lock:
+            expired = self._expired(time.monotonic())
+            idle = len(self._idle)
+            stats = {
+                "max_size": self.max_size,
+                "size": self._size(),
+                "in_use": len(self._opened) - idle,
+                "idle": idle,
+                "waiting": self._waiting,
+                **{name: self.counters[name] for name in ("opened", "reused", "closed", "failed_checks", "timeouts")},
+            }
+        self._close(expired)
+        return stats
+
+
+def _before_fork():
+    # Свободные соединения закрываются в родителе, чтобы дочерний процесс их не унаследовал.
+    for pool in list(_pools):
+        pool.close_idle()
+
+
+def _after_fork_in_child():
+    for pool in list(_pools):
+        pool._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(before=_before_fork, after_in_child=_after_fork_in_child)
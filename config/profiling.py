@@ -0,0 +1,141 @@
+"""
+Профилирование запросов: общее время, число и время SQL-запросов, время сериализаторов
+и размер ответа по каждому представлению.
+
+Результаты отдаются клиенту в заголовке Server-Timing и накапливаются в метриках (/metrics).
+Подробный разбор (SQL и сериализаторы) выполняется для доли запросов PROFILING_SAMPLE_RATE;
+число, время и размер ответов учитываются для всех запросов.
+"""
+import functools
+import random
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework.serializers import BaseSerializer
+
+from config.metrics import COUNT_BUCKETS, SIZE_BUCKETS, Counter, Histogram, register
+
+_profile = ContextVar("profile", default=None)
+
+REQUESTS = register(Counter("http_requests_total", "Число запросов.", ("view", "method", "status")))
+DURATION = register(Histogram("http_request_duration_seconds", "Время обработки запроса.", ("view",)))
+RESPONSE_SIZE = register(
+    Histogram("http_response_size_bytes", "Размер тела ответа.", ("view",), buckets=SIZE_BUCKETS)
+)
+SAMPLED = register(Counter("http_requests_profiled_total", "Число запросов с подробным профилем.", ("view",)))
+DB_QUERIES = register(
+    Histogram("http_request_db_queries", "Число SQL-запросов на запрос.", ("view",), buckets=COUNT_BUCKETS)
+)
+DB_DURATION = register(Histogram("http_request_db_duration_seconds", "Время SQL-запросов на запрос.", ("view",)))
+SERIALIZER_DURATION = register(
+    Histogram("http_request_serializer_duration_seconds", "Время сериализаторов на запрос.", ("view",))
+)
+
+
+class Profile:
+    __slots__ = ("queries", "db", "serializer", "serializing")
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.serializer = 0.0
+        self.serializing = False
+
+
+def _execute_wrapper(execute, sql, params, many, context):
+    profile = _profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.queries += 1
+        profile.db += time.perf_counter() - started
+
+
+def _install_execute_wrapper(sender, connection, **kwargs):
+    if _execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute_wrapper)
+
+
+def profiled(func):
+    """ Учитывает время вызова func как время сериализаторов (вложенные вызовы не суммируются). """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profile = _profile.get()
+        if profile is None or profile.serializing:
+            return func(*args, **kwargs)
+        profile.serializing = True
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.serializer += time.perf_counter() - started
+            profile.serializing = False
+
+    wrapper.profiled = True
+    return wrapper
+
+
+def instrument():
+    """ Подключает учёт SQL-запросов и сериализаторов; без активного профиля он ничего не делает. """
+    connection_created.connect(_install_execute_wrapper, dispatch_uid="profiling")
+    for connection in connections.all(initialized_only=True):
+        _install_execute_wrapper(None, connection)
+    if not getattr(BaseSerializer.data.fget, "profiled", False):
+        BaseSerializer.data = property(profiled(BaseSerializer.data.fget))
+
+
+class ProfilingMiddleware:
+    """ Замеры запроса для Server-Timing и /metrics; работает и под WSGI, и под ASGI без смены потока. """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        instrument()
+
+    def start(self):
+        profile = Profile() if self.sample_rate >= 1 or random.random() < self.sample_rate else None
+        return profile, _profile.set(profile), time.perf_counter()
+
+    def finish(self, request, response, profile, token, started):
+        total = time.perf_counter() - started
+        _profile.reset(token)
+        match = request.resolver_match
+        view = match.view_name if match is not None else "unmatched"
+
+        REQUESTS.inc((view, request.method, str(response.status_code)))
+        DURATION.observe(total, (view,))
+        if not response.streaming:
+            RESPONSE_SIZE.observe(len(response.content), (view,))
+        if profile is None:
+            return response
+
+        SAMPLED.inc((view,))
+        DB_QUERIES.observe(profile.queries, (view,))
+        DB_DURATION.observe(profile.db, (view,))
+        SERIALIZER_DURATION.observe(profile.serializer, (view,))
+        response["Server-Timing"] = (
+            f'db;dur={profile.db * 1000:.2f};desc="{profile.queries} queries", '
+            f"serializer;dur={profile.serializer * 1000:.2f}, total;dur={total * 1000:.2f}"
+        )
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = self.start()
+        return self.finish(request, self.get_response(request), *state)
+
+    async def __acall__(self, request):
+        state = self.start()
+        return self.finish(request, await self.get_response(request), *state)
@@ -0,0 +1,137 @@
+"""
+Чтение с реплик базы данных.
+
+ReplicaMiddleware выбирает для безопасного запроса (GET, HEAD, OPTIONS) одну из реплик
+DATABASE_REPLICAS, и ReplicaRouter направляет на неё все чтения этого запроса. Записи,
+чтения внутри транзакций и всё, что выполняется вне запросов (задачи Celery, команды), идут
+в основную базу. После записи клиент на REPLICA_PIN_SECONDS секунд закрепляется за основной
+базой (по заголовку Authorization, отметка хранится в кэше), чтобы не увидеть устаревших данных.
+Общий кэш ответов после записи заполняется из основной базы (main.cache.CachedResponseMixin).
+"""
+import hashlib
+import logging
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_state = ContextVar("replica_state", default=None)
+
+
+class RequestState:
+    __slots__ = ("replica", "wrote")
+
+    def __init__(self, replica):
+        self.replica = replica
+        self.wrote = False
+
+
+class ReplicaRouter:
+    """ Чтения безопасных запросов — на реплику, выбранную ReplicaMiddleware, остальное — в основную базу. """
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or state.replica is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            # После записи запрос читает свои же данные из основной базы.
+            state.wrote = True
+            state.replica = None
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и основная база; прочее решает Django (связи в пределах одной базы).
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+def read_from_primary():
+    """ Оставшиеся чтения текущего запроса идут в основную базу. """
+    state = _state.get()
+    if state is not None:
+        state.replica = None
+
+
+def pin_key(request):
+    authorization = request.headers.get("Authorization")
+    if not authorization:
+        return None
+    return f"replicas:pin:{hashlib.md5(authorization.encode()).hexdigest()}"
+
+
+def _cache_error(error):
+    logger.warning("Кэш недоступен: %s", error)
+
+
+class ReplicaMiddleware:
+    """ Выбор реплики для запроса и закрепление клиента за основной базой после записи. """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        key = pin_key(request)
+        pinned = request.method not in SAFE_METHODS
+        if not pinned and key is not None:
+            try:
+                pinned = cache.get(key) is not None
+            except (RedisError, OSError) as error:
+                # Не зная, писал ли клиент, безопаснее читать из основной базы.
+                _cache_error(error)
+                pinned = True
+        state = RequestState(None if pinned else random.choice(settings.DATABASE_REPLICAS))
+        token = _state.set(state)
+        try:
+            return self.get_response(request)
+        finally:
+            _state.reset(token)
+            if state.wrote and key is not None:
+                try:
+                    cache.set(key, 1, settings.REPLICA_PIN_SECONDS)
+                except (RedisError, OSError) as error:
+                    _cache_error(error)
+
+    async def __acall__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+        key = pin_key(request)
+        pinned = request.method not in SAFE_METHODS
+        if not pinned and key is not None:
+            try:
+                pinned = await cache.aget(key) is not None
+            except (RedisError, OSError) as error:
+                _cache_error(error)
+                pinned = True
+        state = RequestState(None if pinned else random.choice(settings.DATABASE_REPLICAS))
+        token = _state.set(state)
+        try:
+            return await self.get_response(request)
+        finally:
+            _state.reset(token)
+            if state.wrote and key is not None:
+                try:
+                    await cache.aset(key, 1, settings.REPLICA_PIN_SECONDS)
+                except (RedisError, OSError) as error:
+                    _cache_error(error)
@@ -0,0 +1,70 @@
+"""
+Настройки gunicorn для боевого запуска вместо manage.py runserver.
+
+    gunicorn -c python:config.server
+
+Мастер-процесс заранее загружает приложение (preload_app) и порождает рабочие процессы;
+каждый процесс прогревается (config.warmup) до того, как начнёт принимать запросы.
+Мягкий перезапуск рабочих процессов без потери запросов: kill -HUP <pid мастера>.
+Приложение загружено в мастере, поэтому для выкладки нового кода нужен новый мастер:
+kill -USR2 <pid мастера>, затем kill -QUIT старому мастеру.
+
+Переменные окружения:
+    WEB_MODE              asgi (uvicorn, асинхронные представления) или wsgi (gthread); по умолчанию asgi
+    WEB_PORT              порт, по умолчанию 8000
+    WEB_WORKERS           число рабочих процессов, по умолчанию 2 * CPU + 1
+    WEB_THREADS           потоков на процесс в режиме wsgi, по умолчанию 4 (о режиме asgi — ниже)
+    WEB_KEEPALIVE         через сколько секунд закрывать простаивающее keep-alive соединение, по умолчанию 5
+    WEB_TIMEOUT           перезапуск зависшего процесса через столько секунд, по умолчанию 30
+    WEB_GRACEFUL_TIMEOUT  сколько секунд процесс дорабатывает текущие запросы при перезапуске, по умолчанию 30
+    WEB_MAX_REQUESTS      перезапуск процесса после стольких запросов (0 — не перезапускать)
+
+В режиме asgi число потоков для синхронного кода не ограничено: ASGIHandler Django выполняет
+синхронные представления (и синхронные части асинхронных) через sync_to_async(thread_sensitive=True)
+в отдельном потоке на каждый запрос. WEB_THREADS там задаёт только ASGI_THREADS — пул asgiref для
+sync_to_async(thread_sensitive=False) — и число соединений, которые прогрев открывает в пуле
+config.postgresql. Соединения без пула прогрев открывает только в главном потоке: потоки запросов
+в этом режиме каждый раз новые. Нагрузку в режиме asgi ограничивают WEB_WORKERS и пулы соединений.
+"""
+import multiprocessing
+import os
+
+mode = os.getenv("WEB_MODE", "asgi")
+if mode not in ("asgi", "wsgi"):
+    raise ValueError(f"WEB_MODE должен быть asgi или wsgi, а не {mode!r}")
+
+bind = f"0.0.0.0:{os.getenv('WEB_PORT', '8000')}"
+workers = int(os.getenv("WEB_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv("WEB_THREADS", 4))
+keepalive = int(os.getenv("WEB_KEEPALIVE", 5))
+timeout = int(os.getenv("WEB_TIMEOUT", 30))
+graceful_timeout = int(os.getenv("WEB_GRACEFUL_TIMEOUT", 30))
+max_requests = int(os.getenv("WEB_MAX_REQUESTS", 0))
+max_requests_jitter = max_requests // 10
+preload_app = True
+worker_connections = 1000
+errorlog = "-"
+
+if mode == "asgi":
+    wsgi_app = "config.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+    # Пул потоков asgiref для sync_to_async(thread_sensitive=False); читается при импорте asgiref,
+    # то есть до загрузки приложения.
+    os.environ.setdefault("ASGI_THREADS", str(threads))
+else:
+    wsgi_app = "config.wsgi:application"
+    worker_class = "gthread"
+
+
+def pre_fork(server, worker):
+    # Соединения, открытые мастером при загрузке приложения, нельзя делить между процессами.
+    from django.db import connections
+
+    connections.close_all()
+
+
+def post_worker_init(worker):
+    from config.warmup import warm_up
+
+    elapsed = warm_up(getattr(worker, "tpool", None), threads)
+    worker.log.info("Рабочий процесс %s прогрет за %.3f с", worker.pid, elapsed)
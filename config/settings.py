@@ -28,7 +28,7 @@ load_dotenv(dotenv_path=BASE_DIR / ".env")
 SECRET_KEY = os.getenv("SECRET_KEY")
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.getenv("DEBUG", "True") == "True"
 
 ALLOWED_HOSTS = ["*"]
 
@@ -55,6 +55,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "config.profiling.ProfilingMiddleware",
+    "config.compression.CompressionMiddleware",
+    "config.replicas.ReplicaMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -66,6 +69,9 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = "config.urls"
 
+# Асинхронные представления ленты, карточки объявления и списка отзывов (включается в config/asgi.py).
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS") == "True"
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
@@ -89,15 +95,46 @@ WSGI_APPLICATION = "config.wsgi.application"
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql_psycopg2",
+        "ENGINE": "config.postgresql",  # PostgreSQL с пулом соединений
         "NAME": os.getenv("POSTGRES_DB"),
         "USER": os.getenv("POSTGRES_USER"),
         "PASSWORD": os.getenv("POSTGRES_PASSWORD"),  # Пароль для этого пользователя
         "HOST": os.getenv("POSTGRES_HOST"),  # Адрес, на котором развернут сервер БД
         "PORT": 5432,  # Порт, на котором работает сервер БД
+        # Соединение возвращается в пул процесса в конце каждого запроса и задачи Celery.
+        "CONN_MAX_AGE": 0,
+        "CONN_HEALTH_CHECKS": True,
+        "POOL": {
+            "MAX_SIZE": int(os.getenv("DB_POOL_SIZE", 10)),  # соединений на процесс
+            "TIMEOUT": float(os.getenv("DB_POOL_TIMEOUT", 10)),  # ожидание свободного соединения, сек.
+            "MAX_IDLE": int(os.getenv("DB_POOL_MAX_IDLE", 300)),  # закрывать простаивающие дольше, сек.
+            "MAX_LIFETIME": int(os.getenv("DB_POOL_MAX_LIFETIME", 1800)),  # пересоздавать старше, сек.
+        },
     }
 }
 
+# Реплики основной базы для чтения (config.replicas), адреса через запятую.
+DATABASE_REPLICAS = []
+for number, host in enumerate(filter(None, os.getenv("POSTGRES_REPLICA_HOSTS", "").split(","))):
+    DATABASES[f"replica_{number}"] = {**DATABASES["default"], "HOST": host.strip(), "TEST": {"MIRROR": "default"}}
+    DATABASE_REPLICAS.append(f"replica_{number}")
+
+DATABASE_ROUTERS = ["config.replicas.ReplicaRouter"]
+# Сколько секунд после записи клиент читает из основной базы.
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", 5))
+
+# Потоков для хеширования паролей на процесс (users.passwords), 0 — хешировать в потоке запроса.
+# По умолчанию ядра делятся между рабочими процессами (WEB_WORKERS, как в config.server).
+WEB_WORKERS = int(os.getenv("WEB_WORKERS") or (os.cpu_count() or 1) * 2 + 1)
+PASSWORD_HASHING_WORKERS = int(os.getenv("PASSWORD_HASHING_WORKERS") or max(1, (os.cpu_count() or 1) // WEB_WORKERS))
+
+# Письма для сброса пароля копятся PASSWORD_RESET_BATCH_DELAY секунд и отправляются
+# пакетами не более PASSWORD_RESET_BATCH_SIZE писем через одно SMTP-соединение.
+PASSWORD_RESET_BATCH_DELAY = int(os.getenv("PASSWORD_RESET_BATCH_DELAY", 10))
+PASSWORD_RESET_BATCH_SIZE = int(os.getenv("PASSWORD_RESET_BATCH_SIZE", 100))
+# Как часто (сек.) Celery Beat ищет письма, оставшиеся в очереди (users.tasks.sweep_password_reset_emails).
+PASSWORD_RESET_SWEEP_INTERVAL = int(os.getenv("PASSWORD_RESET_SWEEP_INTERVAL", 300))
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -134,6 +171,17 @@ STATIC_URL = "static/"
 STATIC_ROOT = os.path.join(BASE_DIR, "static")
 STATICFILES_DIRS = (BASE_DIR / "main/static",)
 
+# collectstatic пишет файлы с хешем в имени и их сжатые копии .gz/.br для nginx (config.storage).
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "config.storage.CompressedManifestStaticFilesStorage"},
+}
+
+# Ответы короче этого размера (байт) не сжимаются (config.compression); то же для сжатых копий статики.
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+# Степень сжатия Brotli для ответов API (0-11): выше 5 заметно дороже по процессору при небольшом выигрыше.
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4))
+
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
@@ -145,6 +193,12 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Уменьшенные копии изображений (config.images): ширины вариантов (px), ширина по умолчанию
+# в ответах API и качество сжатия WebP/JPEG (1-100).
+IMAGE_VARIANT_WIDTHS = (160, 320, 640, 1280)
+IMAGE_DEFAULT_WIDTH = int(os.getenv("IMAGE_DEFAULT_WIDTH", 320))
+IMAGE_VARIANT_QUALITY = int(os.getenv("IMAGE_VARIANT_QUALITY", 80))
+
 AUTH_USER_MODEL = "users.User"
 LOGIN_REDIRECT_URL = "/"
 LOGOUT_REDIRECT_URL = "/"
@@ -170,16 +224,49 @@ if CACHE_ENABLED:
         }
     }
 
+# Время жизни закэшированных ответов API (сек.), записи также сбрасываются при изменении данных.
+RESPONSE_CACHE_TIMEOUT = int(os.getenv("RESPONSE_CACHE_TIMEOUT", 60 * 5))
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
     ),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    # JSON через orjson, если он установлен (config.renderers), с тем же выводом, что и у DRF.
+    "DEFAULT_RENDERER_CLASSES": (
+        "config.renderers.JSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "config.renderers.JSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
+    # Бюджеты корзин жетонов (users.throttling): по IP и, с суффиксом -email, по email из запроса.
+    "DEFAULT_THROTTLE_RATES": {
+        "login": "20/min",
+        "login-email": "5/min",
+        "register": "10/hour",
+        "register-email": "3/hour",
+        "password-reset": "10/hour",
+        "password-reset-email": "3/hour",
+        "password-reset-confirm": "20/hour",
+    },
+    # Число прокси перед приложением (nginx): IP клиента берётся из X-Forwarded-For с учётом него.
+    "NUM_PROXIES": int(os.getenv("NUM_PROXIES", 1)),
 }
 
+# Доля запросов с подробным профилем (SQL и сериализаторы) в Server-Timing и /metrics, от 0 до 1.
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", 1))
+# Токен для доступа к /metrics (заголовок Authorization: Bearer); без него метрики недоступны.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+# Время хранения пользователя в кэше JWT-аутентификации (сек.).
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv("AUTH_USER_CACHE_TIMEOUT", 60))
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
@@ -200,19 +287,34 @@ CELERY_TIMEZONE = 'UTC'
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
+CELERY_BEAT_SCHEDULE = {
+    "password-reset-sweep": {
+        "task": "users.tasks.sweep_password_reset_emails",
+        "schedule": PASSWORD_RESET_SWEEP_INTERVAL,
+    },
+}
 
 USER_ROLES = (
     (0, "Пользователь"),
     (1, "Администратор")
 )
 
+# Список запрещённых слов (одно слово на строку), изменения подхватываются без перезапуска.
+BLOCKED_WORDS_FILE = os.getenv("BLOCKED_WORDS_FILE", BASE_DIR / "main" / "blocked_words.txt")
+
 if 'test':
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
-            'NAME': BASE_DIR / 'db.sqlite3',
-        }
+            'NAME': os.getenv("SQLITE_NAME", BASE_DIR / 'db.sqlite3'),
+        },
+        # Второй файл SQLite вместо реплики: используется, если задан SQLITE_REPLICA_NAME, и в тестах.
+        'replica': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv("SQLITE_REPLICA_NAME", BASE_DIR / 'db_replica.sqlite3'),
+        },
     }
+    DATABASE_REPLICAS = ['replica'] if os.getenv("SQLITE_REPLICA_NAME") else []
 
 DJANGO_REST_PASSWORD_RESET_TOKEN_CONFIG = {
     "CLASS": "django_rest_passwordreset.tokens.RandomNumberTokenGenerator",
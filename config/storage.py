@@ -0,0 +1,69 @@
+"""
+Хранилище статики с заранее сжатыми копиями файлов.
+
+collectstatic сохраняет файлы под именами с хешем содержимого (ManifestStaticFilesStorage),
+поэтому nginx отдаёт их с Cache-Control: immutable на год, и рядом с каждым текстовым файлом
+(и под исходным, и под хешированным именем) пишет .gz и, если установлен brotli, .br.
+nginx отдаёт готовую сжатую копию (gzip_static) вместо сжатия на каждый запрос.
+"""
+import hashlib
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+from config.compression import BROTLI, GZIP, brotli, compress_file_content
+
+EXTENSIONS = {GZIP: ".gz", BROTLI: ".br"}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """ ManifestStaticFilesStorage, который после collectstatic пишет сжатые копии файлов. """
+    compressible_extensions = (
+        ".css", ".js", ".mjs", ".map", ".json", ".svg", ".txt", ".html", ".xml", ".ico", ".ttf", ".otf", ".eot",
+    )
+    # Без манифеста (collectstatic ещё не запускался) ссылки строятся по хешу файлов из STATIC_ROOT.
+    manifest_strict = False
+
+    def get_encodings(self):
+        return (GZIP, BROTLI) if brotli is not None else (GZIP,)
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        # Исходные имена и окончательные хешированные (промежуточные варианты CSS не нужны).
+        hashed_names = set(self.hashed_files.values())
+        # Копия под хешированным именем обычно совпадает с исходным файлом: сжимаем содержимое один раз.
+        cache = {}
+        for name in sorted(set(paths) | hashed_names):
+            if name.endswith(self.compressible_extensions):
+                for encoding in self.get_encodings():
+                    compressed_name = self.compress(name, encoding, cache, name in hashed_names)
+                    if compressed_name is not None:
+                        yield name, compressed_name, True
+
+    def compress(self, name, encoding, cache, hashed=False):
+        """
+        Пишет сжатую копию файла; None, если она не нужна (файл мал или почти не сжимается) или уже есть.
+        cache — сжатое содержимое по хешу исходного в пределах одного запуска collectstatic.
+        """
+        compressed_name = name + EXTENSIONS[encoding]
+        if self.exists(compressed_name):
+            # Содержимое файла с хешем в имени не меняется, хотя collectstatic и перезаписывает часть из них.
+            if hashed or self.get_modified_time(compressed_name) >= self.get_modified_time(name):
+                return None
+            self.delete(compressed_name)
+        with self.open(name) as original:
+            content = original.read()
+        if len(content) < settings.COMPRESSION_MIN_SIZE:
+            return None
+        key = (encoding, hashlib.md5(content).digest())
+        if key not in cache:
+            cache[key] = compress_file_content(content, encoding)
+        compressed = cache[key]
+        # Копия, почти не отличающаяся по размеру, не стоит лишнего файла.
+        if len(compressed) > len(content) * 0.95:
+            return None
+        self._save(compressed_name, ContentFile(compressed))
+        return compressed_name
@@ -1,9 +1,14 @@
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 
+from config.images import VARIANTS_DIR, image_variant_view
+from config.metrics import metrics_view
+
 schema_view = get_schema_view(
     openapi.Info(
         title="Snippets API",
@@ -19,6 +24,13 @@ schema_view = get_schema_view(
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("metrics", metrics_view, name="metrics"),
+    # Сюда nginx передаёт запросы вариантов изображений, которых ещё нет на диске.
+    re_path(
+        rf"^{settings.MEDIA_URL.lstrip('/')}{VARIANTS_DIR}/(?P<name>.+)/(?P<width>[0-9]+)\.(?P<extension>webp|jpg)$",
+        image_variant_view,
+        name="image-variant",
+    ),
     path("", include("main.urls", namespace="")),
     path("users/", include("users.urls", namespace="users")),
     path(
@@ -36,3 +48,6 @@ urlpatterns = [
         ),
         name='schema-redoc'),
 ]
+
+# В разработке оригиналы загруженных файлов отдаёт Django, в production — nginx.
+urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
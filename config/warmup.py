@@ -0,0 +1,72 @@
+"""
+Прогрев рабочего процесса перед приёмом запросов.
+
+Первый запрос к холодному процессу платит за импорт представлений и сериализаторов,
+компиляцию URL-шаблонов и подключение к базе данных. warm_up() делает это заранее.
+"""
+import threading
+import time
+from concurrent.futures import wait
+from importlib import import_module
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.urls import get_resolver
+from rest_framework import serializers
+
+SERIALIZER_MODULES = ("main.serializers", "users.serializers")
+BARRIER_TIMEOUT = 10
+
+
+def load_urlconf():
+    """Импортирует все представления и строит таблицы разрешения и обратного разрешения URL."""
+    return get_resolver().reverse_dict
+
+
+def load_serializers():
+    """Импортирует сериализаторы и строит их поля (заодно прогревает кэши _meta моделей)."""
+    for name in SERIALIZER_MODULES:
+        module = import_module(name)
+        for value in vars(module).values():
+            if isinstance(value, type) and issubclass(value, serializers.Serializer) and value.__module__ == name:
+                value().fields
+
+
+def _used_connections():
+    return [connections[alias] for alias in (DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS)]
+
+
+def open_connections(count=1):
+    """Открывает соединения с БД; в пуле соединений (config.postgresql) — сразу count штук."""
+    for connection in _used_connections():
+        if hasattr(connection, "fill_pool"):
+            connection.fill_pool(count)
+        else:
+            connection.ensure_connection()
+
+
+def _open_thread_connections(barrier):
+    # Барьер не даёт одному потоку пула забрать несколько заданий: соединения
+    # с базой данных привязаны к потоку, и открыть их нужно в каждом.
+    try:
+        barrier.wait()
+    except threading.BrokenBarrierError:
+        pass
+    open_connections()
+
+
+def warm_up(executor=None, threads=1):
+    """
+    Прогревает процесс; executor — пул потоков, обрабатывающих запросы, если он есть.
+
+    Возвращает длительность прогрева в секундах.
+    """
+    started = time.perf_counter()
+    load_urlconf()
+    load_serializers()
+    open_connections(threads)
+    # Соединения пула общие для всех потоков, открывать их в каждом потоке не нужно.
+    if executor is not None and threads > 1 and not all(hasattr(c, "fill_pool") for c in _used_connections()):
+        barrier = threading.Barrier(threads, timeout=BARRIER_TIMEOUT)
+        wait([executor.submit(_open_thread_connections, barrier) for _ in range(threads)])
+    return time.perf_counter() - started
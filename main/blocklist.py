@@ -0,0 +1,104 @@
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+NGRAM_SIZE = 3
+
+
+class CompiledBlocklist:
+    """
+    Скомпилированный индекс запрещённых слов.
+
+    Слово текста считается запрещённым, если оно является подстрокой запрещённого слова
+    (без учёта регистра). Все подстроки длиной до NGRAM_SIZE хранятся в множестве, для более
+    длинных слов кандидаты выбираются по индексу n-грамм, поэтому проверка не зависит
+    от длины списка линейно.
+    """
+
+    def __init__(self, words):
+        # strip() убирает и \r строк файла с окончаниями CRLF.
+        self.words = tuple(word.strip().lower() for word in words if word.strip())
+        self.max_length = max((len(word) for word in self.words), default=0)
+        self.short_substrings = set()
+        self.ngrams = {}
+        for index, word in enumerate(self.words):
+            for start in range(len(word)):
+                for length in range(1, min(NGRAM_SIZE, len(word) - start) + 1):
+                    self.short_substrings.add(word[start:start + length])
+                if start + NGRAM_SIZE <= len(word):
+                    postings = self.ngrams.setdefault(word[start:start + NGRAM_SIZE], [])
+                    if not postings or postings[-1] != index:
+                        postings.append(index)
+
+    def contains(self, word):
+        """Проверяет, является ли слово (в нижнем регистре) подстрокой запрещённого слова."""
+        if len(word) > self.max_length:
+            return False
+        if len(word) <= NGRAM_SIZE:
+            return word in self.short_substrings
+        candidates = None
+        for start in range(len(word) - NGRAM_SIZE + 1):
+            postings = self.ngrams.get(word[start:start + NGRAM_SIZE])
+            if postings is None:
+                return False
+            if candidates is None or len(postings) < len(candidates):
+                candidates = postings
+        return any(word in self.words[index] for index in candidates)
+
+
+class BlockedWordsMatcher:
+    """
+    Общий для валидаторов поиск запрещённых слов.
+
+    Список читается из файла settings.BLOCKED_WORDS_FILE (одно слово на строку) и компилируется
+    один раз; при изменении файла индекс пересобирается без перезапуска процесса. Если файл
+    недоступен, используется последний загруженный список.
+    """
+    reload_interval = 1.0
+
+    def __init__(self, path=None):
+        self._path = path
+        self._lock = threading.Lock()
+        self._compiled = None
+        self._mtime = None
+        self._checked_at = 0.0
+
+    @property
+    def path(self):
+        return self._path or settings.BLOCKED_WORDS_FILE
+
+    @property
+    def compiled(self):
+        now = time.monotonic()
+        if self._compiled is None or now - self._checked_at >= self.reload_interval:
+            self._checked_at = now
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+                if mtime != self._mtime:
+                    with self._lock:
+                        if mtime != self._mtime:
+                            with open(self.path, encoding="utf-8") as file:
+                                self._compiled = CompiledBlocklist(file.read().splitlines())
+                            self._mtime = mtime
+            except OSError as error:
+                # Файл могут заменять в этот момент: проверяем прежним списком, а до первой загрузки — пустым.
+                logger.warning("Список запрещённых слов недоступен: %s", error)
+                if self._compiled is None:
+                    self._compiled = CompiledBlocklist(())
+        return self._compiled
+
+    def find(self, text):
+        """Возвращает первое запрещённое слово текста или None."""
+        compiled = self.compiled
+        for word in text.lower().split():
+            if compiled.contains(word):
+                return word
+        return None
+
+
+blocked_words_matcher = BlockedWordsMatcher()
@@ -0,0 +1,232 @@
+import hashlib
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from redis.exceptions import RedisError
+from rest_framework.response import Response
+
+from config.replicas import read_from_primary
+
+logger = logging.getLogger(__name__)
+_local = threading.local()
+
+ADS_LIST = "ads-list"
+ADS_DETAIL = "ads-detail"
+CACHE_NAMES = (ADS_LIST, ADS_DETAIL)
+
+
+def _call(method, *args, default=None, **kwargs):
+    """Вызов кэша, не роняющий запрос при недоступности Redis."""
+    try:
+        return method(*args, **kwargs)
+    except (RedisError, OSError) as error:
+        logger.warning("Кэш недоступен: %s", error)
+        return default
+
+
+async def _acall(method, *args, default=None, **kwargs):
+    """Асинхронный вариант _call для асинхронных представлений."""
+    try:
+        return await method(*args, **kwargs)
+    except (RedisError, OSError) as error:
+        logger.warning("Кэш недоступен: %s", error)
+        return default
+
+
+def _version_key(name, pk=None):
+    return f"{name}:version" if pk is None else f"{name}:{pk}:version"
+
+
+def _initial_version():
+    """
+    Начальное поколение — текущее время в наносекундах.
+
+    Если Redis вытеснит ключ поколения, новое начальное значение окажется больше любого
+    прежнего, и записи старых поколений не станут снова действительными.
+    """
+    return time.time_ns()
+
+
+def get_version(name, pk=None):
+    """Текущее поколение записей кэша; смена поколения делает старые записи недоступными."""
+    return _call(cache.get_or_set, _version_key(name, pk), _initial_version, None, default=0)
+
+
+async def aget_version(name, pk=None):
+    return await _acall(cache.aget_or_set, _version_key(name, pk), _initial_version, None, default=0)
+
+
+def _recent_key(name, pk=None):
+    return f"{_version_key(name, pk)}:recent"
+
+
+def bump_version(name, pk=None):
+    key = _version_key(name, pk)
+    if settings.DATABASE_REPLICAS:
+        # Отметка ставится до смены поколения: кто увидел новое поколение, увидит и её.
+        _call(cache.set, _recent_key(name, pk), 1, settings.REPLICA_PIN_SECONDS)
+    try:
+        _call(cache.incr, key)
+    except ValueError:
+        _call(cache.set, key, _initial_version(), None)
+
+
+def record(name, outcome):
+    """Увеличивает счётчик попаданий (hits) или промахов (misses) кэша."""
+    key = f"{name}:stats:{outcome}"
+    try:
+        _call(cache.incr, key)
+    except ValueError:
+        _call(cache.add, key, 1, None)
+
+
+async def arecord(name, outcome):
+    key = f"{name}:stats:{outcome}"
+    try:
+        await _acall(cache.aincr, key)
+    except ValueError:
+        await _acall(cache.aadd, key, 1, None)
+
+
+def get_stats():
+    """Счётчики попаданий и промахов по каждому кэшу."""
+    keys = [f"{name}:stats:{outcome}" for name in CACHE_NAMES for outcome in ("hits", "misses")]
+    values = _call(cache.get_many, keys, default={})
+    stats = {}
+    for name in CACHE_NAMES:
+        hits = values.get(f"{name}:stats:hits", 0)
+        misses = values.get(f"{name}:stats:misses", 0)
+        total = hits + misses
+        stats[name] = {"hits": hits, "misses": misses, "hit_ratio": round(hits / total, 4) if total else None}
+    return stats
+
+
+def invalidate_ads(*pks):
+    """Сбрасывает кэш ленты и карточек объявлений pks после фиксации транзакции."""
+    batch = getattr(_local, "batch", None)
+    if batch is not None:
+        batch.update(pks)
+        return
+
+    def invalidate():
+        bump_version(ADS_LIST)
+        for pk in pks:
+            bump_version(ADS_DETAIL, pk)
+
+    transaction.on_commit(invalidate)
+
+
+@contextmanager
+def batch_invalidation():
+    """Объединяет сброс кэша для массовых операций в один вызов invalidate_ads."""
+    _local.batch = set()
+    try:
+        yield
+        pks = _local.batch
+    finally:
+        _local.batch = None
+    invalidate_ads(*pks)
+
+
+class CachedResponseMixin:
+    """
+    Кэширование ответов GET в Redis.
+
+    Ключ включает поколение кэша, хост, параметры запроса и, при cache_vary_on_user,
+    пользователя. Проверка прав выполняется до обращения к кэшу.
+    Промах в течение REPLICA_PIN_SECONDS после смены поколения читается из основной базы:
+    реплика могла ещё не получить запись, а её устаревший ответ попал бы в кэш нового поколения
+    и достался бы всем клиентам, включая автора записи.
+
+    Рядом с ответом хранятся его валидаторы условных запросов (get_response_validators,
+    см. main.conditional), поэтому повторная проверка клиентом с If-None-Match тоже обходится
+    без БД. Чтобы get_stored_validators заменял заглушку ConditionalGetMixin, примесь
+    указывается в базовых классах раньше неё.
+    """
+    cache_name = None
+    cache_vary_on_user = False
+
+    def get_cache_pk(self):
+        """ Объект, поколение кэша которого используется; None — общее поколение cache_name. """
+        return None
+
+    def get_cache_version(self):
+        return get_version(self.cache_name, self.get_cache_pk())
+
+    async def aget_cache_version(self):
+        return await aget_version(self.cache_name, self.get_cache_pk())
+
+    def get_cache_key(self, request, version=None):
+        parts = [request.get_host(), request.path, sorted(request.query_params.lists())]
+        if self.cache_vary_on_user:
+            parts.append(request.user.pk)
+        digest = hashlib.md5(repr(parts).encode()).hexdigest()
+        if version is None:
+            version = self.get_cache_version()
+        return f"{self.cache_name}:{version}:{digest}"
+
+    @staticmethod
+    def _validators_key(request, key):
+        # ETag зависит от формата ответа, а сами данные — нет.
+        return f"{key}:validators:{request.accepted_renderer.format}"
+
+    def get_stored_validators(self, request):
+        if not settings.CACHE_ENABLED:
+            return None
+        return _call(cache.get, self._validators_key(request, self.get_cache_key(request)))
+
+    async def aget_stored_validators(self, request):
+        if not settings.CACHE_ENABLED:
+            return None
+        key = self.get_cache_key(request, await self.aget_cache_version())
+        return await _acall(cache.aget, self._validators_key(request, key))
+
+    def _cache_entries(self, request, key, data):
+        entries = {key: data}
+        get_response_validators = getattr(self, "get_response_validators", None)
+        if get_response_validators is not None:
+            entries[self._validators_key(request, key)] = get_response_validators(request, data)
+        return entries
+
+    def cached_response(self, request, handler, *args, **kwargs):
+        if not settings.CACHE_ENABLED:
+            return handler(request, *args, **kwargs)
+
+        key = self.get_cache_key(request)
+        data = _call(cache.get, key)
+        if data is not None:
+            record(self.cache_name, "hits")
+            return Response(data)
+
+        record(self.cache_name, "misses")
+        if settings.DATABASE_REPLICAS and _call(cache.get, _recent_key(self.cache_name, self.get_cache_pk())):
+            read_from_primary()
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            _call(cache.set_many, self._cache_entries(request, key, response.data), settings.RESPONSE_CACHE_TIMEOUT)
+        return response
+
+    async def acached_response(self, request, handler, *args, **kwargs):
+        """Асинхронный вариант cached_response: handler — корутина."""
+        if not settings.CACHE_ENABLED:
+            return await handler(request, *args, **kwargs)
+
+        key = self.get_cache_key(request, await self.aget_cache_version())
+        data = await _acall(cache.aget, key)
+        if data is not None:
+            await arecord(self.cache_name, "hits")
+            return Response(data)
+
+        await arecord(self.cache_name, "misses")
+        if settings.DATABASE_REPLICAS and await _acall(cache.aget, _recent_key(self.cache_name, self.get_cache_pk())):
+            read_from_primary()
+        response = await handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            entries = self._cache_entries(request, key, response.data)
+            await _acall(cache.aset_many, entries, settings.RESPONSE_CACHE_TIMEOUT)
+        return response
@@ -0,0 +1,169 @@
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date
+
+
+def response_row(item, conditional_fields):
+    """ Строка состояния (id, updated_at, *conditional_fields) по объекту из данных ответа. """
+    return (item["id"], parse_datetime(item["updated_at"]), *(item[field] for field in conditional_fields.values()))
+
+
+class ConditionalGetMixin:
+    """
+    Условные GET-запросы: ETag и Last-Modified по id и updated_at отдаваемых объектов.
+
+    Валидаторы считаются по данным ответа, поэтому обычный запрос не делает лишних обращений к БД.
+    Если клиент прислал If-None-Match или If-Modified-Since, сначала проверяются валидаторы,
+    сохранённые вместе с ответом в кэше (get_stored_validators, см. main.cache), а если их нет —
+    выполняется дешёвый запрос id и updated_at тех же объектов; при совпадении отдаётся 304 без тела.
+    """
+    # Для списков Last-Modified только информирует клиента: удаление объекта со страницы
+    # может не увеличить максимальный updated_at, поэтому 304 выдаётся лишь по ETag,
+    # а запрос с одним If-Modified-Since обрабатывается как обычный, без проверки в БД.
+    validate_last_modified = True
+    # Данные связанных объектов в ответе, которые меняются без изменения updated_at: {поле ORM: поле ответа}.
+    conditional_fields = {}
+
+    def get_conditional_state(self):
+        """ Строки (id, updated_at, *conditional_fields) и прочие данные ответа из БД; None, если объекта нет. """
+        raise NotImplementedError
+
+    def get_response_state(self, data):
+        """ То же самое, но из данных готового ответа. """
+        raise NotImplementedError
+
+    def get_stored_validators(self, request):
+        """ Валидаторы, сохранённые вместе с готовым ответом; None — их нет. """
+        return None
+
+    async def aget_stored_validators(self, request):
+        return None
+
+    def get_validators(self, request, rows, extra):
+        timestamps = [row[1].timestamp() for row in rows]
+        parts = [request.path, sorted(request.query_params.lists()), request.accepted_renderer.format,
+                 extra, [row[0] for row in rows], timestamps, [tuple(row[2:]) for row in rows]]
+        etag = f'W/"{hashlib.md5(repr(parts).encode()).hexdigest()}"'
+        return etag, int(max(timestamps)) if timestamps else None
+
+    @staticmethod
+    def set_validators(response, etag, last_modified):
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def get_response_validators(self, request, data):
+        """ Валидаторы (ETag, Last-Modified) по данным ответа. """
+        return self.get_validators(request, *self.get_response_state(data))
+
+    def is_conditional(self, request):
+        """ Может ли запрос получить 304: If-Modified-Since проверяется, только если validate_last_modified. """
+        return "HTTP_IF_NONE_MATCH" in request.META or (
+            self.validate_last_modified and "HTTP_IF_MODIFIED_SINCE" in request.META
+        )
+
+    def not_modified_response(self, request, etag, last_modified):
+        """ Ответ 304, если валидаторы клиента совпадают с текущими, иначе None. """
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=last_modified if self.validate_last_modified else None
+        )
+        if not_modified is not None:
+            self.set_validators(not_modified, etag, last_modified)
+        return not_modified
+
+    def conditional_response(self, request, handler, *args, **kwargs):
+        if self.is_conditional(request):
+            validators = self.get_stored_validators(request)
+            if validators is None:
+                state = self.get_conditional_state()
+                validators = self.get_validators(request, *state) if state is not None else None
+            if validators is not None:
+                not_modified = self.not_modified_response(request, *validators)
+                if not_modified is not None:
+                    return not_modified
+
+        response = handler(request, *args, **kwargs)
+        return self.finalize_conditional(request, response)
+
+    async def aget_conditional_state(self):
+        return await sync_to_async(self.get_conditional_state)()
+
+    async def aconditional_response(self, request, handler, *args, **kwargs):
+        """ Асинхронный вариант conditional_response: handler — корутина. """
+        if self.is_conditional(request):
+            validators = await self.aget_stored_validators(request)
+            if validators is None:
+                state = await self.aget_conditional_state()
+                validators = self.get_validators(request, *state) if state is not None else None
+            if validators is not None:
+                not_modified = self.not_modified_response(request, *validators)
+                if not_modified is not None:
+                    return not_modified
+
+        response = await handler(request, *args, **kwargs)
+        return self.finalize_conditional(request, response)
+
+    def finalize_conditional(self, request, response):
+        if response.status_code == 200:
+            self.set_validators(response, *self.get_response_validators(request, response.data))
+        return response
+
+
+class ConditionalRetrieveMixin(ConditionalGetMixin):
+    """ Условные запросы для отдельного объекта: проверка по первичному ключу. """
+
+    def get_conditional_queryset(self):
+        queryset = self.get_queryset().filter(pk=self.kwargs["pk"])
+        return queryset.values_list("pk", "updated_at", *self.conditional_fields)
+
+    def get_conditional_state(self):
+        row = self.get_conditional_queryset().first()
+        return ([row], None) if row is not None else None
+
+    async def aget_conditional_state(self):
+        row = await self.get_conditional_queryset().afirst()
+        return ([row], None) if row is not None else None
+
+    def get_response_state(self, data):
+        return [response_row(data, self.conditional_fields)], None
+
+
+class ConditionalListMixin(ConditionalGetMixin):
+    """
+    Условные запросы для списка: проверяется текущая страница.
+
+    Страница выбирается тем же пагинатором из строк values() с id, updated_at, conditional_fields и полями
+    сортировки (по ним курсорный пагинатор строит ссылки), без экземпляров моделей
+    и сериализации; в ETag входят также count и ссылки next/previous.
+    """
+    validate_last_modified = False
+
+    def get_conditional_queryset(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        paginator_ordering = getattr(self.paginator, "ordering", None) or ()
+        if isinstance(paginator_ordering, str):
+            paginator_ordering = (paginator_ordering,)
+        ordering = [*queryset.query.order_by, *paginator_ordering]
+        fields = [
+            "id", "updated_at", *self.conditional_fields,
+            *(field.lstrip("-") for field in ordering if isinstance(field, str)),
+        ]
+        return queryset.values(*dict.fromkeys(fields))
+
+    def get_conditional_state(self):
+        page = self.paginate_queryset(self.get_conditional_queryset())
+        data = self.get_paginated_response([]).data
+        rows = [(row["id"], row["updated_at"], *(row[field] for field in self.conditional_fields)) for row in page]
+        return rows, self._page_extra(data)
+
+    def get_response_state(self, data):
+        rows = [response_row(item, self.conditional_fields) for item in data["results"]]
+        return rows, self._page_extra(data)
+
+    @staticmethod
+    def _page_extra(data):
+        return sorted((key, value) for key, value in data.items() if key != "results")
@@ -0,0 +1,42 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.db.models import Case, Count, F, Max, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import Exact
+from django.utils import timezone
+
+# Подставляется вместо NULL при сравнении дат последнего отзыва.
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def rebuild_review_counters(advertisement_model, review_model, batch_size=1000):
+    """
+    Пересчитывает review_count и last_review_at объявлений по таблице отзывов.
+
+    Объявления обрабатываются диапазонами id по batch_size штук, по одному UPDATE на диапазон.
+    У объявлений, счётчики которых изменились, обновляется и updated_at: по нему строятся
+    ETag и Last-Modified (main.conditional).
+    Генерирует кортежи (последний обработанный id, число обновлённых объявлений).
+    """
+    reviews = review_model.objects.filter(ads=OuterRef("pk")).order_by().values("ads")
+    review_count = Subquery(reviews.annotate(total=Count("pk")).values("total"))
+    last_review_at = Subquery(reviews.annotate(latest=Max("created_at")).values("latest"))
+    unchanged = Q(
+        Exact(F("review_count"), Coalesce(review_count, Value(0))),
+        Exact(Coalesce(F("last_review_at"), Value(EPOCH)), Coalesce(last_review_at, Value(EPOCH))),
+    )
+
+    last_pk = 0
+    while True:
+        pks = list(
+            advertisement_model.objects.filter(pk__gt=last_pk).order_by("pk").values_list("pk", flat=True)[:batch_size]
+        )
+        if not pks:
+            break
+        updated = advertisement_model.objects.filter(pk__gt=last_pk, pk__lte=pks[-1]).update(
+            # updated_at стоит первым: MySQL вычисляет SET по порядку, уже с новыми значениями столбцов.
+            updated_at=Case(When(unchanged, then=F("updated_at")), default=Value(timezone.now())),
+            review_count=Coalesce(review_count, Value(0)), last_review_at=last_review_at,
+        )
+        last_pk = pks[-1]
+        yield last_pk, updated
@@ -0,0 +1,112 @@
+import csv
+from collections import defaultdict
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+
+from main.models import Advertisement, Review
+
+NDJSON = "ndjson"
+CSV = "csv"
+FORMATS = (NDJSON, CSV)
+CONTENT_TYPES = {NDJSON: "application/x-ndjson", CSV: "text/csv; charset=utf-8"}
+
+ADS_FIELDS = (
+    "id", "title", "description", "price", "author_id", "created_at", "updated_at", "review_count", "last_review_at"
+)
+REVIEW_FIELDS = ("id", "author_id", "content", "created_at", "updated_at")
+
+# Строки копятся в буфер и отдаются кусками примерно такого размера,
+# чтобы не писать в сокет по одной строке.
+BUFFER_SIZE = 64 * 1024
+
+
+class _Echo:
+    """ Псевдофайл для csv.writer: возвращает строку вместо записи. """
+
+    def write(self, value):
+        return value
+
+
+def _chunks(include_reviews, chunk_size):
+    """
+    Порции строк объявлений в порядке id вместе с их отзывами.
+
+    Объявления читаются через iterator(chunk_size); отзывы — одним запросом на порцию.
+    Строки — кортежи значений без создания экземпляров моделей.
+    """
+    ads = Advertisement.objects.order_by("id").values_list(*ADS_FIELDS).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(ads, chunk_size))
+        if not chunk:
+            return
+        reviews = defaultdict(list)
+        if include_reviews:
+            queryset = Review.objects.filter(ads_id__in=[row[0] for row in chunk]).order_by("ads_id", "id")
+            for ads_id, *review in queryset.values_list("ads_id", *REVIEW_FIELDS):
+                reviews[ads_id].append(review)
+        yield chunk, reviews
+
+
+def ndjson_rows(include_reviews=False, chunk_size=2000):
+    encode = DjangoJSONEncoder(ensure_ascii=False).encode
+    for chunk, reviews in _chunks(include_reviews, chunk_size):
+        for values in chunk:
+            row = dict(zip(ADS_FIELDS, values))
+            if include_reviews:
+                row["reviews"] = [dict(zip(REVIEW_FIELDS, review)) for review in reviews[values[0]]]
+            yield encode(row) + "\n"
+
+
+def csv_rows(include_reviews=False, chunk_size=2000):
+    """ Одна строка на объявление; с отзывами — одна строка на отзыв, поля объявления повторяются. """
+    writer = csv.writer(_Echo())
+    header = list(ADS_FIELDS)
+    if include_reviews:
+        header += [f"review_{field}" for field in REVIEW_FIELDS]
+    yield writer.writerow(header)
+    empty_review = (None,) * len(REVIEW_FIELDS)
+    for chunk, reviews in _chunks(include_reviews, chunk_size):
+        if not include_reviews:
+            yield "".join(map(writer.writerow, chunk))
+            continue
+        for values in chunk:
+            for review in reviews[values[0]] or [empty_review]:
+                yield writer.writerow((*values, *review))
+
+
+def export_ads(output_format=NDJSON, include_reviews=False, chunk_size=2000):
+    """
+    Генератор выгрузки всех объявлений в формате NDJSON или CSV.
+
+    Расход памяти ограничен одной порцией и не зависит от размера таблицы.
+    Первая строка отдаётся сразу, дальше строки склеиваются в куски по BUFFER_SIZE.
+    """
+    rows = ndjson_rows if output_format == NDJSON else csv_rows
+    buffer, size, flush_at = [], 0, 0
+    for row in rows(include_reviews, chunk_size):
+        buffer.append(row)
+        size += len(row)
+        if size >= flush_at:
+            yield "".join(buffer)
+            buffer, size, flush_at = [], 0, BUFFER_SIZE
+    if buffer:
+        yield "".join(buffer)
+
+
+async def aexport_ads(output_format=NDJSON, include_reviews=False, chunk_size=2000):
+    """
+    Асинхронный вариант export_ads для ASGI.
+
+    Синхронный итератор Django под ASGI сначала целиком собирает в список, то есть держит
+    в памяти всю таблицу; здесь каждый кусок строится в потоке запроса (thread_sensitive),
+    где открыт курсор, и сразу отдаётся клиенту.
+    """
+    chunks = export_ads(output_format, include_reviews, chunk_size)
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    try:
+        while (chunk := await next_chunk(chunks, None)) is not None:
+            yield chunk
+    finally:
+        await sync_to_async(chunks.close, thread_sensitive=True)()
@@ -0,0 +1,26 @@
+from django_filters import rest_framework as filters
+from rest_framework.filters import OrderingFilter
+
+from main.models import Advertisement
+
+
+class AdvertisementFilter(filters.FilterSet):
+    """ Фильтры ленты объявлений. Каждое сочетание с сортировкой покрыто индексом модели Advertisement. """
+    price_min = filters.NumberFilter(field_name="price", lookup_expr="gte")
+    price_max = filters.NumberFilter(field_name="price", lookup_expr="lte")
+    author = filters.NumberFilter(field_name="author_id")
+    created_after = filters.IsoDateTimeFilter(field_name="created_at", lookup_expr="gte")
+
+    class Meta:
+        model = Advertisement
+        fields = ("price_min", "price_max", "author", "created_after")
+
+
+class AdsOrderingFilter(OrderingFilter):
+    """ Сортировка с добавлением id, чтобы порядок был однозначным при равных значениях. """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = list(super().get_ordering(request, queryset, view) or [])
+        if ordering and ordering[-1].lstrip("-") != "id":
+            ordering.append("-id" if ordering[0].startswith("-") else "id")
+        return ordering
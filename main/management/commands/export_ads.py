@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from main.export import FORMATS, NDJSON, export_ads
+
+
+class Command(BaseCommand):
+    help = "Выгружает все объявления (при необходимости с отзывами) в формате NDJSON или CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=FORMATS, default=NDJSON, dest="output_format")
+        parser.add_argument("--reviews", action="store_true", help="Добавить отзывы к объявлениям.")
+        parser.add_argument("--output", help="Файл для выгрузки; по умолчанию стандартный вывод.")
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Количество объявлений в одной порции.")
+
+    def handle(self, *args, **options):
+        chunks = export_ads(options["output_format"], options["reviews"], options["chunk_size"])
+        if not options["output"]:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            return
+        with open(options["output"], "w", encoding="utf-8", newline="") as file:
+            file.writelines(chunks)
+        self.stderr.write(self.style.SUCCESS(f"Выгрузка сохранена в {options['output']}."))
@@ -0,0 +1,72 @@
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.importer import CSV, FORMATS, JSONL, import_ads, read_records
+
+
+class Command(BaseCommand):
+    help = "Загружает объявления из файла CSV или JSONL с проверкой запрещённых слов."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Файл с объявлениями: колонки title, description, price, author_id.")
+        parser.add_argument("--format", choices=FORMATS, dest="input_format",
+                            help="Формат файла; по умолчанию определяется по расширению.")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Количество записей в одной транзакции.")
+        parser.add_argument("--checkpoint", help="Файл контрольной точки; по умолчанию <path>.checkpoint.")
+        parser.add_argument("--resume", action="store_true", help="Продолжить с контрольной точки.")
+        parser.add_argument("--errors", help="Файл JSONL для отклонённых записей.")
+        parser.add_argument("--author", type=int, help="id автора для записей без author_id.")
+        parser.add_argument("--no-copy", action="store_true", help="Не использовать COPY на Postgres.")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if not os.path.exists(path):
+            raise CommandError(f"Файл {path} не найден.")
+        input_format = options["input_format"] or (JSONL if path.endswith((".jsonl", ".ndjson")) else CSV)
+        checkpoint_path = options["checkpoint"] or f"{path}.checkpoint"
+        checkpoint = {"position": 0, "imported": 0, "rejected": 0}
+        if options["resume"] and os.path.exists(checkpoint_path):
+            with open(checkpoint_path, encoding="utf-8") as file:
+                checkpoint = json.load(file)
+            self.stdout.write(f"Продолжение с записи {checkpoint['position'] + 1}.")
+
+        errors_file = open(options["errors"], "a", encoding="utf-8") if options["errors"] else None
+        started = time.perf_counter()
+        start = checkpoint["position"]
+        try:
+            batches = import_ads(
+                read_records(path, input_format),
+                batch_size=options["batch_size"],
+                start=start,
+                default_author=options["author"],
+                use_copy=not options["no_copy"],
+            )
+            for position, imported, errors in batches:
+                checkpoint["position"] = position
+                checkpoint["imported"] += imported
+                checkpoint["rejected"] += len(errors)
+                self.save_checkpoint(checkpoint_path, checkpoint)
+                if errors_file:
+                    for number, detail in errors:
+                        errors_file.write(json.dumps({"record": number, "errors": detail}, ensure_ascii=False) + "\n")
+                rate = (position - start) / (time.perf_counter() - started)
+                self.stdout.write(
+                    f"Обработано записей: {position}, загружено: {checkpoint['imported']}, "
+                    f"отклонено: {checkpoint['rejected']} ({rate:.0f} записей/с)"
+                )
+        finally:
+            if errors_file:
+                errors_file.close()
+        self.stdout.write(self.style.SUCCESS(
+            f"Загружено объявлений: {checkpoint['imported']}, отклонено записей: {checkpoint['rejected']}."
+        ))
+
+    @staticmethod
+    def save_checkpoint(path, checkpoint):
+        """ Контрольная точка пишется после фиксации пакета через временный файл, чтобы не остаться битой. """
+        with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+            json.dump(checkpoint, file)
+        os.replace(f"{path}.tmp", path)
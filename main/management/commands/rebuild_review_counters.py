@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from main.counters import rebuild_review_counters
+from main.models import Advertisement, Review
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает количество отзывов и дату последнего отзыва у объявлений."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Количество объявлений в одном UPDATE.")
+
+    def handle(self, *args, **options):
+        total = 0
+        for last_pk, updated in rebuild_review_counters(Advertisement, Review, options["batch_size"]):
+            total += updated
+            self.stdout.write(f"Обработано объявлений: {total} (до id {last_pk})")
+        self.stdout.write(self.style.SUCCESS(f"Счётчики отзывов пересчитаны для {total} объявлений."))
@@ -0,0 +1,19 @@
+# Generated by Django 4.2 on 2026-10-18 10:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0004_alter_review_ads"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="advertisement",
+            index=models.Index(
+                fields=["created_at", "id"], name="ads_created_at_id_idx"
+            ),
+        ),
+    ]
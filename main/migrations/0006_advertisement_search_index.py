@@ -0,0 +1,74 @@
+from django.db import migrations
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE main_advertisement ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('russian', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('russian', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX ads_search_vector_idx ON main_advertisement USING gin (search_vector)",
+]
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS ads_search_vector_idx",
+    "ALTER TABLE main_advertisement DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE main_advertisement_fts USING fts5(
+        title, description, content='main_advertisement', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER main_advertisement_fts_insert AFTER INSERT ON main_advertisement BEGIN
+        INSERT INTO main_advertisement_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER main_advertisement_fts_delete AFTER DELETE ON main_advertisement BEGIN
+        INSERT INTO main_advertisement_fts(main_advertisement_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER main_advertisement_fts_update AFTER UPDATE OF title, description ON main_advertisement BEGIN
+        INSERT INTO main_advertisement_fts(main_advertisement_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO main_advertisement_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    "INSERT INTO main_advertisement_fts(main_advertisement_fts) VALUES ('rebuild')",
+]
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS main_advertisement_fts_update",
+    "DROP TRIGGER IF EXISTS main_advertisement_fts_delete",
+    "DROP TRIGGER IF EXISTS main_advertisement_fts_insert",
+    "DROP TABLE IF EXISTS main_advertisement_fts",
+]
+
+
+def run_statements(statements):
+    def operation(apps, schema_editor):
+        vendor_statements = statements.get(schema_editor.connection.vendor, [])
+        for statement in vendor_statements:
+            schema_editor.execute(statement)
+
+    return operation
+
+
+class Migration(migrations.Migration):
+    """ Полнотекстовый индекс объявлений: tsvector + GIN в Postgres, FTS5 в SQLite. """
+
+    dependencies = [
+        ("main", "0005_advertisement_created_at_id_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_statements({"postgresql": POSTGRES_FORWARD, "sqlite": SQLITE_FORWARD}),
+            run_statements({"postgresql": POSTGRES_BACKWARD, "sqlite": SQLITE_BACKWARD}),
+        ),
+    ]
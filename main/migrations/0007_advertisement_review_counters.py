@@ -0,0 +1,49 @@
+# Generated by Django 4.2 on 2026-10-18 10:52
+
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_review_counters(apps, schema_editor):
+    """ Заполнение счётчиков по таблице отзывов диапазонами id по 1000 объявлений. """
+    Advertisement = apps.get_model("main", "Advertisement")
+    Review = apps.get_model("main", "Review")
+    reviews = Review.objects.filter(ads=OuterRef("pk")).order_by().values("ads")
+    review_count = Subquery(reviews.annotate(total=Count("pk")).values("total"))
+    last_review_at = Subquery(reviews.annotate(latest=Max("created_at")).values("latest"))
+
+    last_pk = 0
+    while True:
+        pks = list(Advertisement.objects.filter(pk__gt=last_pk).order_by("pk").values_list("pk", flat=True)[:1000])
+        if not pks:
+            break
+        Advertisement.objects.filter(pk__gt=last_pk, pk__lte=pks[-1]).update(
+            review_count=Coalesce(review_count, Value(0)), last_review_at=last_review_at
+        )
+        last_pk = pks[-1]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0006_advertisement_search_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="advertisement",
+            name="last_review_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="Дата последнего отзыва"
+            ),
+        ),
+        migrations.AddField(
+            model_name="advertisement",
+            name="review_count",
+            field=models.PositiveIntegerField(
+                default=0, verbose_name="Количество отзывов"
+            ),
+        ),
+        migrations.RunPython(fill_review_counters, migrations.RunPython.noop),
+    ]
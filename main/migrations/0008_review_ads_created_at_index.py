@@ -0,0 +1,19 @@
+# Generated by Django 4.2 on 2026-10-18 10:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0007_advertisement_review_counters"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["ads", "created_at"], name="review_ads_created_at_idx"
+            ),
+        ),
+    ]
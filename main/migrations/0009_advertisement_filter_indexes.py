@@ -0,0 +1,30 @@
+# Generated by Django 4.2 on 2026-10-18 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0008_review_ads_created_at_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="advertisement",
+            index=models.Index(
+                fields=["author", "created_at", "id"],
+                name="ads_author_created_at_id_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="advertisement",
+            index=models.Index(fields=["price", "id"], name="ads_price_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="advertisement",
+            index=models.Index(
+                fields=["author", "price", "id"], name="ads_author_price_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2 on 2026-10-18 11:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0009_advertisement_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="advertisement",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, verbose_name="Дата изменения"),
+        ),
+        migrations.AddField(
+            model_name="review",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, verbose_name="Дата изменения"),
+        ),
+        migrations.RunSQL(
+            [
+                "UPDATE main_advertisement SET updated_at = created_at",
+                "UPDATE main_review SET updated_at = created_at",
+            ],
+            migrations.RunSQL.noop,
+        ),
+    ]
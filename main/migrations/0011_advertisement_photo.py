@@ -0,0 +1,20 @@
+# Generated by Django 4.2 on 2026-10-18 12:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0010_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="advertisement",
+            name="photo",
+            field=models.ImageField(
+                blank=True, null=True, upload_to="ads/", verbose_name="Фотография"
+            ),
+        ),
+    ]
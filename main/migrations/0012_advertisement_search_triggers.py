@@ -0,0 +1,51 @@
+from django.db import migrations
+
+# Триггеры FTS5 удаляются вместе с таблицей объявлений, а SQLite пересоздаёт её при добавлении
+# полей (0007, 0010). Индекс восстанавливается и перестраивается по текущему содержимому.
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS main_advertisement_fts USING fts5(
+        title, description, content='main_advertisement', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS main_advertisement_fts_insert AFTER INSERT ON main_advertisement BEGIN
+        INSERT INTO main_advertisement_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS main_advertisement_fts_delete AFTER DELETE ON main_advertisement BEGIN
+        INSERT INTO main_advertisement_fts(main_advertisement_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS main_advertisement_fts_update
+    AFTER UPDATE OF title, description ON main_advertisement BEGIN
+        INSERT INTO main_advertisement_fts(main_advertisement_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO main_advertisement_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    "INSERT INTO main_advertisement_fts(main_advertisement_fts) VALUES ('rebuild')",
+]
+
+
+def restore_sqlite_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        for statement in SQLITE_FORWARD:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+    """ Восстановление триггеров полнотекстового индекса SQLite после пересоздания таблицы объявлений. """
+
+    dependencies = [
+        ("main", "0011_advertisement_photo"),
+    ]
+
+    operations = [
+        migrations.RunPython(restore_sqlite_triggers, migrations.RunPython.noop),
+    ]
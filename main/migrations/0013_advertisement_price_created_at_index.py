@@ -0,0 +1,23 @@
+# Generated by Django 4.2 on 2026-10-18 13:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0012_advertisement_search_triggers"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="advertisement",
+            name="ads_price_id_idx",
+        ),
+        migrations.AddIndex(
+            model_name="advertisement",
+            index=models.Index(
+                fields=["price", "id", "created_at"], name="ads_price_id_created_at_idx"
+            ),
+        ),
+    ]
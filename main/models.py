@@ -10,12 +10,30 @@ class Advertisement(models.Model):
     price = models.PositiveIntegerField(verbose_name="Цена")
     author = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="Автор", null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата изменения")
+    review_count = models.PositiveIntegerField(default=0, verbose_name="Количество отзывов")
+    last_review_at = models.DateTimeField(null=True, blank=True, verbose_name="Дата последнего отзыва")
+    photo = models.ImageField(upload_to="ads/", null=True, blank=True, verbose_name="Фотография")
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="ads_created_at_id_idx"),
+            models.Index(fields=["author", "created_at", "id"], name="ads_author_created_at_id_idx"),
+            # created_at в индексе: при обходе в порядке цены created_after проверяется без чтения строк.
+            models.Index(fields=["price", "id", "created_at"], name="ads_price_id_created_at_idx"),
+            models.Index(fields=["author", "price", "id"], name="ads_author_price_id_idx"),
+        ]
 
 
 class Review(models.Model):
     """ Модель отзыва. """
     content = models.TextField(verbose_name="Отзыв")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата изменения")
     author = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="Автор", null=True, blank=True)
     ads = models.ForeignKey(Advertisement, on_delete=models.CASCADE, verbose_name="Объявление", null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["ads", "created_at"], name="review_ads_created_at_idx"),
+        ]
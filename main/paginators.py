@@ -1,4 +1,12 @@
-from rest_framework.pagination import PageNumberPagination
+from base64 import b64decode, b64encode
+from urllib import parse
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, CursorPagination, PageNumberPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from main.search import search_advertisements
 
 
 class AdsPaginator(PageNumberPagination):
@@ -6,3 +14,98 @@ class AdsPaginator(PageNumberPagination):
     page_size = 4
     page_size_query_param = 'page_size'
     max_page_size = 10
+
+
+class AdsCursorPaginator(CursorPagination):
+    """
+    Курсорная пагинация списка объявлений.
+
+    Не выполняет COUNT(*) и OFFSET-сканирование: каждая страница выбирается по индексу
+    (created_at, id), поэтому время ответа не зависит от глубины страницы.
+    """
+    page_size = 4
+    page_size_query_param = 'page_size'
+    max_page_size = 10
+    ordering = ('-created_at', '-id')
+    mode_query_param = 'pagination'
+
+    @classmethod
+    def is_requested(cls, request):
+        """Проверяет, запросил ли клиент курсорный режим (?pagination=cursor или ?cursor=...)."""
+        if request is None:
+            return False
+        params = request.query_params
+        return params.get(cls.mode_query_param) == 'cursor' or cls.cursor_query_param in params
+
+
+class ReviewCursorPaginator(CursorPagination):
+    """ Курсорная пагинация отзывов объявления, от новых к старым по индексу (ads_id, created_at). """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+
+
+class AdsSearchPaginator(BasePagination):
+    """
+    Курсорная пагинация результатов полнотекстового поиска.
+
+    Результаты упорядочены по релевантности, поэтому курсор хранит пару (rank, id)
+    последней выданной записи, и следующая страница выбирается условием по этой паре.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 50
+    cursor_query_param = 'cursor'
+    search_query_param = 'q'
+    invalid_cursor_message = 'Неверный курсор'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        after = self.decode_cursor(request)
+
+        hits = search_advertisements(request.query_params.get(self.search_query_param, ''), self.page_size + 1, after)
+        self.has_next = len(hits) > self.page_size
+        hits = hits[:self.page_size]
+
+        self.next_cursor = None
+        if self.has_next:
+            last_pk, last_rank = hits[-1]
+            self.next_cursor = (last_rank, last_pk)
+
+        # in_bulk() не работает с values(), поэтому строки сопоставляются с результатами поиска вручную.
+        rows = queryset.filter(pk__in=[pk for pk, rank in hits])
+        objects = {row["id"] if isinstance(row, dict) else row.pk: row for row in rows}
+        return [objects[pk] for pk, rank in hits if pk in objects]
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param], strict=True, cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            tokens = parse.parse_qs(b64decode(encoded.encode('ascii')).decode('ascii'))
+            return float(tokens['r'][0]), int(tokens['i'][0])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        rank, pk = self.next_cursor
+        encoded = b64encode(parse.urlencode({'r': repr(rank), 'i': pk}).encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
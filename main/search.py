@@ -0,0 +1,158 @@
+import re
+
+from django.apps import apps
+from django.db import connections, router
+from django.db.models import Q
+
+WORD_RE = re.compile(r"\w+")
+
+POSTGRES_INSTALL = [
+    """
+    ALTER TABLE main_advertisement ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('russian', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('russian', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ads_search_vector_idx ON main_advertisement USING gin (search_vector)",
+]
+POSTGRES_UNINSTALL = [
+    "DROP INDEX IF EXISTS ads_search_vector_idx",
+    "ALTER TABLE main_advertisement DROP COLUMN IF EXISTS search_vector",
+]
+
+# Триггеры удаляются вместе с таблицей, а SQLite пересоздаёт таблицу при многих миграциях,
+# поэтому установка повторяется после каждой миграции (см. main.signals).
+SQLITE_INSTALL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS main_advertisement_fts USING fts5(
+        title, description, content='main_advertisement', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS main_advertisement_fts_insert AFTER INSERT ON main_advertisement BEGIN
+        INSERT INTO main_advertisement_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS main_advertisement_fts_delete AFTER DELETE ON main_advertisement BEGIN
+        INSERT INTO main_advertisement_fts(main_advertisement_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS main_advertisement_fts_update
+    AFTER UPDATE OF title, description ON main_advertisement BEGIN
+        INSERT INTO main_advertisement_fts(main_advertisement_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO main_advertisement_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    "INSERT INTO main_advertisement_fts(main_advertisement_fts) VALUES ('rebuild')",
+]
+SQLITE_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS main_advertisement_fts_update",
+    "DROP TRIGGER IF EXISTS main_advertisement_fts_delete",
+    "DROP TRIGGER IF EXISTS main_advertisement_fts_insert",
+    "DROP TABLE IF EXISTS main_advertisement_fts",
+]
+SQLITE_INSTALLED = "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'main_advertisement_fts_%'"
+
+POSTGRES_SEARCH = """
+    SELECT id, ts_rank(search_vector, query) AS rank
+    FROM main_advertisement, plainto_tsquery('russian', %s) query
+    WHERE search_vector @@ query {after}
+    ORDER BY rank DESC, id DESC
+    LIMIT %s
+"""
+POSTGRES_AFTER = (
+    "AND (ts_rank(search_vector, query) < %s::real OR (ts_rank(search_vector, query) = %s::real AND id < %s))"
+)
+
+SQLITE_SEARCH = """
+    SELECT rowid, -bm25(main_advertisement_fts) AS score
+    FROM main_advertisement_fts
+    WHERE main_advertisement_fts MATCH %s {after}
+    ORDER BY score DESC, rowid DESC
+    LIMIT %s
+"""
+SQLITE_AFTER = (
+    "AND (-bm25(main_advertisement_fts) < %s OR (-bm25(main_advertisement_fts) = %s AND rowid < %s))"
+)
+
+
+def _execute(connection, statements):
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def install_search_index(connection):
+    """Создаёт полнотекстовый индекс объявлений, если он отсутствует или неполон."""
+    if connection.vendor == "postgresql":
+        _execute(connection, POSTGRES_INSTALL)
+    elif connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            cursor.execute(SQLITE_INSTALLED)
+            installed = cursor.fetchone()[0] == 3
+        if not installed:
+            _execute(connection, SQLITE_INSTALL)
+
+
+def uninstall_search_index(connection):
+    if connection.vendor == "postgresql":
+        _execute(connection, POSTGRES_UNINSTALL)
+    elif connection.vendor == "sqlite":
+        _execute(connection, SQLITE_UNINSTALL)
+
+
+def search_terms(query):
+    """Слова поискового запроса без служебного синтаксиса полнотекстового поиска."""
+    return WORD_RE.findall(query.lower())
+
+
+def search_by_substring(terms, limit, after=None):
+    """
+    Поиск без полнотекстового индекса для прочих СУБД: каждое слово в названии или описании (icontains).
+
+    Релевантность не считается: у всех найденных rank 0, порядок - по убыванию id.
+    """
+    condition = Q()
+    for term in terms:
+        condition &= Q(title__icontains=term) | Q(description__icontains=term)
+    if after is not None:
+        condition &= Q(pk__lt=after[1])
+    advertisements = apps.get_model("main", "Advertisement").objects.filter(condition)
+    pks = advertisements.order_by("-pk").values_list("pk", flat=True)
+    return [(pk, 0.0) for pk in pks[:limit]]
+
+
+def search_advertisements(query, limit, after=None):
+    """
+    Поиск объявлений по названию и описанию через полнотекстовый индекс.
+
+    Возвращает список пар (id, rank), упорядоченный по убыванию релевантности, затем по id.
+    after - пара (rank, id) последней выданной записи для курсорной пагинации.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+
+    # Сырой SQL минует маршрутизатор, поэтому база для чтения выбирается явно.
+    connection = connections[router.db_for_read(apps.get_model("main", "Advertisement"))]
+    if connection.vendor == "postgresql":
+        sql, after_sql, match = POSTGRES_SEARCH, POSTGRES_AFTER, " ".join(terms)
+    elif connection.vendor == "sqlite":
+        sql, after_sql, match = SQLITE_SEARCH, SQLITE_AFTER, " ".join(f'"{term}"' for term in terms)
+    else:
+        return search_by_substring(terms, limit, after)
+
+    params = [match]
+    if after is not None:
+        rank, pk = after
+        params += [rank, rank, pk]
+    params.append(limit)
+    with connection.cursor() as cursor:
+        cursor.execute(sql.format(after=after_sql if after is not None else ""), params)
+        return [(pk, rank) for pk, rank in cursor.fetchall()]
@@ -1,19 +1,130 @@
-from rest_framework import serializers
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from django.utils.functional import cached_property
+from rest_framework import ISO_8601, serializers, relations
+from rest_framework.settings import api_settings
+
+from config.images import ImageVariantField
+from config.profiling import profiled
 from main.models import Advertisement, Review
 from main.validators import AdvertisementValidator, ReviewValidator
 
 
 class AdvertisementSerializer(serializers.ModelSerializer):
     """ Сериализатор объявления. """
+    photo = ImageVariantField(required=False, allow_null=True)
+
     class Meta:
         model = Advertisement
         fields = "__all__"
+        read_only_fields = ("review_count", "last_review_at")
         validators = [AdvertisementValidator()]
 
 
 class ReviewSerializer(serializers.ModelSerializer):
     """ Сериализатор отзывов. """
+    author_name = serializers.CharField(source="author.first_name", read_only=True, default=None)
+
     class Meta:
         model = Review
         fields = "__all__"
         validators = [ReviewValidator()]
+
+
+class AdvertisementBulkListSerializer(serializers.ListSerializer):
+    """ Массовое создание объявлений одним запросом INSERT. """
+    def create(self, validated_data):
+        return Advertisement.objects.bulk_create([Advertisement(**attrs) for attrs in validated_data])
+
+
+class AdvertisementBulkSerializer(AdvertisementSerializer):
+    """ Сериализатор объявления для массовых операций. """
+    class Meta(AdvertisementSerializer.Meta):
+        read_only_fields = ("author", "review_count", "last_review_at")
+        list_serializer_class = AdvertisementBulkListSerializer
+
+
+class ValuesSerializer:
+    """
+    Быстрая сериализация списков только для чтения.
+
+    Строки читаются через values() без создания экземпляров моделей и превращаются в словари
+    преобразователями, подготовленными один раз на страницу. Результат совпадает с выводом
+    serializer_class: те же поля в том же порядке и те же значения. Поля, не требующие
+    преобразования (строки, числа, первичные ключи связей), копируются как есть, даты ISO 8601
+    форматируются напрямую, ссылки на изображения (ImageVariantField) строятся по контексту
+    запроса, остальные поля — методом to_representation поля сериализатора.
+    Поддерживаются поля с источником в модели или в связанной модели ("author.first_name").
+    """
+    serializer_class = None
+    # Поля, to_representation которых не меняет значение из базы.
+    passthrough_fields = (serializers.CharField, serializers.IntegerField, serializers.BooleanField)
+
+    @cached_property
+    def fields(self):
+        """ Тройки (имя в ответе, поле для values(), поле сериализатора), собираются при первом вызове. """
+        fields = []
+        for name, field in self.serializer_class().fields.items():
+            if field.write_only:
+                continue
+            if field.source == "*" or isinstance(field, (serializers.SerializerMethodField, serializers.Serializer)):
+                raise ImproperlyConfigured(f"{type(self).__name__}: поле {name} нельзя прочитать через values().")
+            fields.append((name, field.source.replace(".", "__"), field))
+        return fields
+
+    def get_converter(self, field, context):
+        """ Преобразователь значения из базы в значение ответа; None — значение копируется как есть. """
+        if isinstance(field, ImageVariantField):
+            return field.get_converter(context.get("request"))
+        if isinstance(field, relations.PrimaryKeyRelatedField):
+            # values() отдаёт значение внешнего ключа, а не связанный объект.
+            return field.pk_field.to_representation if field.pk_field is not None else None
+        if type(field) in self.passthrough_fields:
+            return None
+        if isinstance(field, serializers.DateTimeField):
+            return self.get_datetime_converter(field)
+        return field.to_representation
+
+    @staticmethod
+    def get_datetime_converter(field):
+        """ DateTimeField.to_representation с часовым поясом, определённым один раз на страницу. """
+        output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+        field_timezone = field.timezone if hasattr(field, "timezone") else field.default_timezone()
+        if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+            return field.to_representation
+
+        def convert(value):
+            if isinstance(value, str) or timezone.is_naive(value):
+                return field.to_representation(value)
+            value = value.astimezone(field_timezone).isoformat()
+            return value[:-6] + "Z" if value.endswith("+00:00") else value
+
+        return convert
+
+    def values(self, queryset):
+        """ Тот же queryset, отдающий словари нужных полей (пагинаторы берут из них поля сортировки). """
+        return queryset.values(*[lookup for _, lookup, _ in self.fields])
+
+    @profiled
+    def to_representation(self, rows, context=None):
+        """ Список словарей ответа; context — контекст сериализатора представления (запрос). """
+        context = context or {}
+        fields = [(name, lookup, self.get_converter(field, context)) for name, lookup, field in self.fields]
+        data = []
+        for row in rows:
+            item = {}
+            for name, lookup, convert in fields:
+                value = row[lookup]
+                item[name] = value if convert is None or value is None else convert(value)
+            data.append(item)
+        return data
+
+
+class AdvertisementValuesSerializer(ValuesSerializer):
+    """ Быстрая сериализация списка объявлений. """
+    serializer_class = AdvertisementSerializer
+
+
+class ReviewValuesSerializer(ValuesSerializer):
+    """ Быстрая сериализация списка отзывов. """
+    serializer_class = ReviewSerializer
@@ -0,0 +1,35 @@
+from django.db import connections
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from main.cache import invalidate_ads
+from main.models import Advertisement, Review
+from main.search import install_search_index
+from main.tasks import schedule_image_variants
+
+
+@receiver([post_save, post_delete], sender=Advertisement)
+def invalidate_advertisement_cache(sender, instance, **kwargs):
+    """ Сброс кэша при изменении объявления. """
+    invalidate_ads(instance.pk)
+
+
+@receiver(post_save, sender=Advertisement)
+def generate_photo_variants(sender, instance, update_fields=None, **kwargs):
+    """ Уменьшенные копии новой фотографии объявления строятся в фоне. """
+    if update_fields is None or "photo" in update_fields:
+        schedule_image_variants(instance.photo.name)
+
+
+@receiver([post_save, post_delete], sender=Review)
+def invalidate_review_advertisement_cache(sender, instance, **kwargs):
+    """ Сброс кэша объявления при изменении его отзывов. """
+    if instance.ads_id is not None:
+        invalidate_ads(instance.ads_id)
+
+
+@receiver(post_migrate)
+def restore_search_index(sender, using, **kwargs):
+    """ Восстановление полнотекстового индекса после миграций, пересоздающих таблицу объявлений. """
+    if sender.name == "main":
+        install_search_index(connections[using])
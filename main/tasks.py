@@ -0,0 +1,37 @@
+import logging
+
+from celery import shared_task
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from kombu.exceptions import OperationalError
+
+from config import images
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def generate_image_variants(name):
+    """ Создание уменьшенных копий загруженного изображения (аватара или фотографии объявления). """
+    try:
+        return images.generate_variants(name)
+    except FileNotFoundError:
+        # Оригинал успели заменить или удалить.
+        return []
+
+
+def schedule_image_variants(name):
+    """ Постановка задачи после фиксации транзакции, если у изображения ещё нет вариантов. """
+    largest = images.variant_name(name, max(settings.IMAGE_VARIANT_WIDTHS), images.DEFAULT_EXTENSION) if name else None
+    if largest is None or default_storage.exists(largest):
+        return
+
+    def enqueue():
+        try:
+            generate_image_variants.delay(name)
+        except OperationalError as error:
+            # Варианты будут созданы при первом обращении к ним.
+            logger.warning("Очередь задач недоступна: %s", error)
+
+    transaction.on_commit(enqueue)
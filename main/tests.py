@@ -1,10 +1,56 @@
+import csv
+import datetime
+import decimal
+import gzip
+import importlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+import warnings
+import zoneinfo
+from unittest import mock, skipUnless
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
 from django.contrib.auth.hashers import make_password
-from rest_framework import status
-from rest_framework.test import APITestCase, APIRequestFactory
-from django.urls import reverse
-
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, router
+from django.test import AsyncClient, SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import renderers, serializers, status
+from rest_framework.test import APIClient, APITestCase, APITransactionTestCase, APIRequestFactory, force_authenticate
+from rest_framework_simplejwt.tokens import RefreshToken
+from django.urls import clear_url_caches, resolve, reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from PIL import Image
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from config import images
+from config import urls as config_urls
+from config.compression import brotli
+from config.metrics import REGISTRY
+from config.postgresql.pool import ConnectionPool, PoolTimeout
+from config.renderers import JSONParser, JSONRenderer
+from config.profiling import DB_QUERIES, REQUESTS, RESPONSE_SIZE, SAMPLED, SERIALIZER_DURATION
 from users.models import User
+from main.cache import ADS_DETAIL, ADS_LIST, get_stats
+from main import urls as main_urls
+from main.blocklist import BlockedWordsMatcher, CompiledBlocklist
 from main.models import Advertisement, Review
+from main.serializers import (AdvertisementSerializer, AdvertisementValuesSerializer, ReviewSerializer,
+                              ReviewValuesSerializer, ValuesSerializer)
+from main.views import AsyncAdvertisementListAPIView, AsyncAdvertisementRetrieveAPIView, AsyncReviewListAPIView
 
 
 class AdvertisementTestCase(APITestCase):
@@ -211,6 +257,20 @@ class AdvertisementTestCase(APITestCase):
         self.assertEqual(request.status_code, status.HTTP_403_FORBIDDEN)
         self.assertEqual(Advertisement.objects.count(), 2)
 
+    def test_anonymous_cannot_change_advertisement_without_author(self):
+        """ Тестирование запрета анонимного редактирования и удаления объявлений без автора. """
+        advertisement = Advertisement.objects.create(title="imported", description="description", price=1)
+
+        update = self.client.patch(
+            reverse("main:ads-update", kwargs={"pk": advertisement.pk}), {"title": "changed"}, format="json"
+        )
+        delete = self.client.delete(reverse("main:ads-delete", kwargs={"pk": advertisement.pk}))
+
+        self.assertEqual(update.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(delete.status_code, status.HTTP_401_UNAUTHORIZED)
+        advertisement.refresh_from_db()
+        self.assertEqual(advertisement.title, "imported")
+
     def test_update_advertisement_with_admin_status(self):
         """ Тестирование доступа к редактированияю чужих объявлений пользователям, имеющим статус Администратора. """
 
@@ -490,3 +550,1415 @@ class ReviewTestCase(APITestCase):
 
         self.assertEqual(request.status_code, status.HTTP_204_NO_CONTENT)
         self.assertEqual(Review.objects.count(), 1)
+
+
+class AdvertisementPaginationTestCase(APITestCase):
+    """ Тестирование режимов пагинации списка объявлений. """
+
+    def setUp(self):
+        """ Настройка тестового окружения. """
+        self.user = User.objects.create(
+            email='testuser@user.ru', password=make_password('testpassword'), is_active=True, first_name='testuser')
+        for number in range(7):
+            Advertisement.objects.create(
+                author=self.user, title=f"title{number}", description="description", price=1000 + number
+            )
+        self.url = reverse("main:ads-list")
+
+    def test_page_number_mode_is_default(self):
+        """ Тестирование сохранения постраничного режима для старых клиентов. """
+        request = self.client.get(self.url, {"page": 2})
+        response = request.json()
+
+        self.assertEqual(request.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["count"], 7)
+        self.assertEqual([ads["title"] for ads in response["results"]], ["title2", "title1", "title0"])
+
+    def test_cursor_mode_walks_whole_feed(self):
+        """ Тестирование обхода ленты в курсорном режиме без пропусков и повторов. """
+        titles = []
+        url = f"{self.url}?pagination=cursor&page_size=3"
+        while url:
+            response = self.client.get(url).json()
+            self.assertNotIn("count", response)
+            titles.extend(ads["title"] for ads in response["results"])
+            url = response["next"]
+
+        self.assertEqual(titles, [f"title{number}" for number in reversed(range(7))])
+
+    def test_cursor_mode_skips_count_query(self):
+        """ Тестирование отсутствия запроса COUNT(*) в курсорном режиме. """
+        with self.assertNumQueries(1):
+            request = self.client.get(self.url, {"pagination": "cursor"})
+
+        self.assertEqual(request.status_code, status.HTTP_200_OK)
+
+
+class BlockedWordsMatcherTestCase(SimpleTestCase):
+    """ Тестирование поиска запрещённых слов. """
+
+    def legacy_find(self, text, words):
+        """ Прежняя проверка вложенным циклом, с которой сравнивается индекс. """
+        for word in text.lower().split():
+            for blocked_word in words:
+                if word.lower() in blocked_word.lower():
+                    return word
+        return None
+
+    def test_same_results_as_nested_loop(self):
+        """ Тестирование совпадения результатов с прежней проверкой. """
+        words = ["Полиция", "Обман", "Наркотики", "Казино", "Криптовалюта", "Крипта"]
+        compiled = CompiledBlocklist(words)
+        texts = [
+            "продам велосипед", "ПОЛИЦИЯ рядом", "лиц", "крипто", "криптовалютаа", "а", "я", "Нарко товар",
+            "обманщик", "валюта", "ино", "казинО",
+        ]
+        for text in texts:
+            found = next((word for word in text.lower().split() if compiled.contains(word)), None)
+            self.assertEqual(found, self.legacy_find(text, words), text)
+
+    def test_reload_on_file_change(self):
+        """ Тестирование подхвата изменений списка без перезапуска. """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "blocked_words.txt")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("Казино\n")
+            matcher = BlockedWordsMatcher(path)
+            matcher.reload_interval = 0
+            self.assertIsNone(matcher.find("продам радар"))
+
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("Казино\nРадар\n")
+            os.utime(path, ns=(time.time_ns(), time.time_ns() + 10**9))
+            self.assertEqual(matcher.find("продам радар"), "радар")
+
+
+    def test_words_are_stripped(self):
+        """ Тестирование слов с пробелами и окончаниями строк CRLF. """
+        compiled = CompiledBlocklist("Казино \r\nРадар\r\n".splitlines())
+
+        self.assertTrue(compiled.contains("казино"))
+        self.assertTrue(compiled.contains("радар"))
+
+    def test_missing_file(self):
+        """ Тестирование проверки прежним списком, пока файл недоступен, и пустым — до первой загрузки. """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "blocked_words.txt")
+            matcher = BlockedWordsMatcher(path)
+            matcher.reload_interval = 0
+            with self.assertLogs("main.blocklist", "WARNING"):
+                self.assertIsNone(matcher.find("казино"))
+
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("Казино\n")
+            self.assertEqual(matcher.find("казино"), "казино")
+            os.remove(path)
+            with self.assertLogs("main.blocklist", "WARNING"):
+                self.assertEqual(matcher.find("казино"), "казино")
+
+
+class AdvertisementSearchTestCase(APITestCase):
+    """ Тестирование полнотекстового поиска объявлений. """
+
+    def setUp(self):
+        """ Настройка тестового окружения. """
+        self.user = User.objects.create(
+            email='testuser@user.ru', password=make_password('testpassword'), is_active=True, first_name='testuser')
+        self.bike = Advertisement.objects.create(
+            author=self.user, title="Велосипед горный", description="Велосипед в хорошем состоянии", price=1000
+        )
+        self.bikes = [
+            Advertisement.objects.create(
+                author=self.user, title=f"Продам вещи {number}", description="Есть велосипед", price=500
+            )
+            for number in range(4)
+        ]
+        self.sofa = Advertisement.objects.create(
+            author=self.user, title="Диван", description="Почти новый", price=3000
+        )
+        self.url = reverse("main:ads-search")
+
+    def test_search_ranks_by_relevance(self):
+        """ Тестирование ранжирования результатов поиска по релевантности. """
+        request = self.client.get(self.url, {"q": "велосипед"})
+        results = request.json()["results"]
+
+        self.assertEqual(request.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(results), 5)
+        self.assertEqual(results[0]["id"], self.bike.pk)
+        self.assertNotIn(self.sofa.pk, [ads["id"] for ads in results])
+
+    def test_search_cursor_pagination(self):
+        """ Тестирование обхода результатов поиска по курсору без пропусков и повторов. """
+        response = self.client.get(self.url, {"q": "велосипед", "page_size": 2}).json()
+        found = [ads["id"] for ads in response["results"]]
+        while response["next"]:
+            response = self.client.get(response["next"]).json()
+            found.extend(ads["id"] for ads in response["results"])
+
+        self.assertEqual(len(found), 5)
+        self.assertEqual(set(found), {self.bike.pk, *(ads.pk for ads in self.bikes)})
+
+    def test_search_index_follows_updates(self):
+        """ Тестирование обновления индекса при изменении и удалении объявления. """
+        self.sofa.title = "Диван и велосипед"
+        self.sofa.save()
+        self.bike.delete()
+
+        ids = [ads["id"] for ads in self.client.get(self.url, {"q": "велосипед"}).json()["results"]]
+
+        self.assertIn(self.sofa.pk, ids)
+        self.assertNotIn(self.bike.pk, ids)
+
+    def test_search_without_fulltext_index(self):
+        """ Тестирование поиска по подстроке на СУБД без полнотекстового индекса. """
+        with mock.patch("main.search.connections") as connections:
+            connections.__getitem__.return_value.vendor = "mysql"
+            response = self.client.get(self.url, {"q": "вещи", "page_size": 3}).json()
+            found = [ads["id"] for ads in response["results"]]
+            response = self.client.get(response["next"]).json()
+            found.extend(ads["id"] for ads in response["results"])
+
+        self.assertIsNone(response["next"])
+        self.assertEqual(found, [ads.pk for ads in reversed(self.bikes)])
+
+    def test_search_requires_query(self):
+        """ Тестирование ответа на пустой поисковый запрос. """
+        request = self.client.get(self.url, {"q": " "})
+
+        self.assertEqual(request.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(
+    CACHE_ENABLED=True, CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class AdvertisementCacheTestCase(APITestCase):
+    """ Тестирование кэширования ответов ленты и карточки объявления. """
+
+    def setUp(self):
+        """ Настройка тестового окружения. """
+        cache.clear()
+        self.user = User.objects.create(
+            email='testuser@user.ru', password=make_password('testpassword'), is_active=True, first_name='testuser')
+        self.user_admin = User.objects.create(
+            email="user3@user.ru", password=make_password("testpassword"), first_name='user3', user_role="Администратор"
+        )
+        self.advertisement = Advertisement.objects.create(
+            author=self.user, title="title", description="description", price=1000
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_list_is_served_from_cache(self):
+        """ Тестирование повторной выдачи ленты без запросов к базе данных. """
+        first = self.client.get(reverse("main:ads-list"))
+        with self.assertNumQueries(0):
+            second = self.client.get(reverse("main:ads-list"))
+
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(get_stats()[ADS_LIST], {"hits": 1, "misses": 1, "hit_ratio": 0.5})
+
+    def test_page_parameters_are_part_of_key(self):
+        """ Тестирование раздельного кэширования разных страниц. """
+        self.client.get(reverse("main:ads-list"), {"page_size": 1})
+        self.client.get(reverse("main:ads-list"), {"page_size": 2})
+
+        self.assertEqual(get_stats()[ADS_LIST]["misses"], 2)
+
+    def test_create_invalidates_list(self):
+        """ Тестирование сброса кэша ленты при создании объявления. """
+        self.client.get(reverse("main:ads-list"))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("main:ads-create"), {"title": "new", "description": "description", "price": 1}, format="json"
+            )
+
+        response = self.client.get(reverse("main:ads-list")).json()
+
+        self.assertEqual(response["count"], 2)
+
+    def test_update_invalidates_detail(self):
+        """ Тестирование сброса кэша карточки при редактировании объявления. """
+        url = reverse("main:ads-detail", kwargs={"pk": self.advertisement.pk})
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                reverse("main:ads-update", kwargs={"pk": self.advertisement.pk}),
+                {"title": "changed", "description": "description", "price": 1000},
+                format="json",
+            )
+
+        self.assertEqual(self.client.get(url).json()["title"], "changed")
+
+    def test_evicted_version_does_not_revive_old_entries(self):
+        """ Тестирование вытеснения ключа поколения: записи прежних поколений не становятся действительными. """
+        self.client.get(reverse("main:ads-list"))
+        with self.captureOnCommitCallbacks(execute=True):
+            Advertisement.objects.create(author=self.user, title="new", description="description", price=1)
+        cache.delete("ads-list:version")
+
+        self.assertEqual(self.client.get(reverse("main:ads-list")).json()["count"], 2)
+
+    def test_review_mutation_invalidates_only_its_advertisement(self):
+        """ Тестирование точечного сброса кэша карточки при добавлении отзыва. """
+        other = Advertisement.objects.create(author=self.user, title="other", description="description", price=1)
+        self.client.get(reverse("main:ads-detail", kwargs={"pk": self.advertisement.pk}))
+        self.client.get(reverse("main:ads-detail", kwargs={"pk": other.pk}))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("main:review-create", kwargs={"pk": self.advertisement.pk}), {"content": "ok"}, format="json"
+            )
+
+        self.client.get(reverse("main:ads-detail", kwargs={"pk": self.advertisement.pk}))
+        self.client.get(reverse("main:ads-detail", kwargs={"pk": other.pk}))
+
+        self.assertEqual(get_stats()[ADS_DETAIL], {"hits": 1, "misses": 3, "hit_ratio": 0.25})
+
+    def test_stats_available_to_admin_only(self):
+        """ Тестирование доступа к счётчикам кэша. """
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.get(reverse("main:cache-stats")).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.client.get(reverse("main:cache-stats")).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.user_admin)
+        request = self.client.get(reverse("main:cache-stats"))
+
+        self.assertEqual(request.status_code, status.HTTP_200_OK)
+        self.assertIn(ADS_LIST, request.json())
+
+
+class AdvertisementBulkTestCase(APITestCase):
+    """ Тестирование массовых операций с объявлениями. """
+
+    def setUp(self):
+        """ Настройка тестового окружения. """
+        self.user = User.objects.create(
+            email='testuser@user.ru', password=make_password('testpassword'), is_active=True, first_name='testuser')
+        self.user2 = User.objects.create(
+            email="user2@user2.ru", password=make_password("testpassword"), first_name='user2'
+        )
+        self.advertisement = Advertisement.objects.create(
+            author=self.user, title="title", description="description", price=1000
+        )
+        self.advertisement2 = Advertisement.objects.create(
+            author=self.user2, title="title2", description="description2", price=2000
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_bulk_create_uses_constant_number_of_queries(self):
+        """ Тестирование массового создания объявлений фиксированным числом запросов. """
+        body = [{"title": f"title{number}", "description": "description", "price": number} for number in range(100)]
+
+        with self.assertNumQueries(3):
+            request = self.client.post(reverse("main:ads-bulk"), body, format="json")
+
+        self.assertEqual(request.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Advertisement.objects.filter(author=self.user).count(), 101)
+        self.assertTrue(all(ads["id"] for ads in request.json()))
+
+    def test_bulk_create_reports_errors_per_item(self):
+        """ Тестирование отчёта об ошибках по каждому объявлению и отката всего пакета. """
+        body = [
+            {"title": "title", "description": "description", "price": 1},
+            {"title": "Полиция", "description": "description", "price": 1},
+        ]
+
+        request = self.client.post(reverse("main:ads-bulk"), body, format="json")
+        response = request.json()
+
+        self.assertEqual(request.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response[0], {})
+        self.assertEqual(response[1]["non_field_errors"], ['В названии присутсвует запрещенное слово: полиция'])
+        self.assertEqual(Advertisement.objects.count(), 2)
+
+    def test_bulk_update(self):
+        """ Тестирование массового редактирования объявлений. """
+        ads = Advertisement.objects.bulk_create(
+            [Advertisement(author=self.user, title=f"t{number}", description="d", price=1) for number in range(20)]
+        )
+        body = [{"id": item.pk, "price": 5} for item in ads]
+
+        with self.assertNumQueries(4):
+            request = self.client.patch(reverse("main:ads-bulk"), body, format="json")
+
+        self.assertEqual(request.status_code, status.HTTP_200_OK)
+        self.assertEqual(Advertisement.objects.filter(price=5).count(), 20)
+
+    def test_bulk_update_checks_author(self):
+        """ Тестирование запрета массового редактирования чужих объявлений. """
+        body = [
+            {"id": self.advertisement.pk, "price": 5},
+            {"id": self.advertisement2.pk, "price": 5},
+            {"id": 999, "price": 5},
+        ]
+
+        request = self.client.patch(reverse("main:ads-bulk"), body, format="json")
+        response = request.json()
+
+        self.assertEqual(request.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response[0], {})
+        self.assertEqual(response[1], {"id": ["Недостаточно прав для изменения объявления."]})
+        self.assertEqual(response[2], {"id": ["Объявление не найдено."]})
+        self.assertFalse(Advertisement.objects.filter(price=5).exists())
+
+    def test_bulk_delete(self):
+        """ Тестирование массового удаления объявлений вместе с отзывами. """
+        other = Advertisement.objects.create(author=self.user, title="other", description="d", price=1)
+        Review.objects.create(author=self.user2, content="content", ads=other)
+
+        request = self.client.post(
+            reverse("main:ads-bulk-delete"), {"ids": [self.advertisement.pk, other.pk]}, format="json"
+        )
+
+        self.assertEqual(request.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(list(Advertisement.objects.values_list("pk", flat=True)), [self.advertisement2.pk])
+        self.assertEqual(Review.objects.count(), 0)
+
+    def test_bulk_delete_checks_author(self):
+        """ Тестирование запрета массового удаления чужих объявлений. """
+        request = self.client.post(
+            reverse("main:ads-bulk-delete"), {"ids": [self.advertisement.pk, self.advertisement2.pk]}, format="json"
+        )
+
+        self.assertEqual(request.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(request.json()["ids"][1], {"id": ["Недостаточно прав для изменения объявления."]})
+        self.assertEqual(Advertisement.objects.count(), 2)
+
+
+class ReviewCountersTestCase(APITestCase):
+    """ Тестирование счётчиков отзывов объявления. """
+
+    def setUp(self):
+        """ Настройка тестового окружения. """
+        self.user = User.objects.create(
+            email="user@user.ru", password=make_password('testpassword'), is_active=True, first_name='testuser'
+        )
+        self.advertisement = Advertisement.objects.create(
+            author=self.user, title="title", description="description", price=1000
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def create_review(self, content):
+        url = reverse("main:review-create", kwargs={"pk": self.advertisement.pk})
+        return self.client.post(url, {"content": content}, format="json").json()
+
+    def test_counters_follow_create_and_delete(self):
+        """ Тестирование обновления счётчика и даты последнего отзыва при создании и удалении отзывов. """
+        first = self.create_review("content1")
+        second = self.create_review("content2")
+        self.advertisement.refresh_from_db()
+        self.assertEqual(self.advertisement.review_count, 2)
+        self.assertEqual(self.advertisement.last_review_at, Review.objects.get(pk=second["id"]).created_at)
+
+        self.client.delete(reverse("main:review-delete", kwargs={"pk": second["id"]}))
+        self.advertisement.refresh_from_db()
+        self.assertEqual(self.advertisement.review_count, 1)
+        self.assertEqual(self.advertisement.last_review_at, Review.objects.get(pk=first["id"]).created_at)
+
+        self.client.delete(reverse("main:review-delete", kwargs={"pk": first["id"]}))
+        self.advertisement.refresh_from_db()
+        self.assertEqual(self.advertisement.review_count, 0)
+        self.assertIsNone(self.advertisement.last_review_at)
+
+    def test_counters_are_exposed_read_only(self):
+        """ Тестирование выдачи счётчиков в ленте и невозможности изменить их через API. """
+        self.create_review("content")
+        self.client.patch(
+            reverse("main:ads-update", kwargs={"pk": self.advertisement.pk}), {"review_count": 100}, format="json"
+        )
+
+        ads = self.client.get(reverse("main:ads-list")).json()["results"][0]
+
+        self.assertEqual(ads["review_count"], 1)
+        self.assertIsNotNone(ads["last_review_at"])
+
+    def test_rebuild_command(self):
+        """ Тестирование пересчёта счётчиков командой управления. """
+        other = Advertisement.objects.create(author=self.user, title="other", description="description", price=1)
+        reviews = [Review.objects.create(author=self.user, content="content", ads=self.advertisement) for _ in range(3)]
+        unchanged = Advertisement.objects.create(author=self.user, title="unchanged", description="d", price=1)
+        Advertisement.objects.exclude(pk=unchanged.pk).update(review_count=42)
+        unchanged.refresh_from_db()
+        updated_at = Advertisement.objects.get(pk=self.advertisement.pk).updated_at
+
+        call_command("rebuild_review_counters", batch_size=1, stdout=io.StringIO())
+
+        self.advertisement.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(self.advertisement.review_count, 3)
+        self.assertEqual(self.advertisement.last_review_at, reviews[-1].created_at)
+        self.assertGreater(self.advertisement.updated_at, updated_at)
+        self.assertEqual(other.review_count, 0)
+        self.assertIsNone(other.last_review_at)
+        self.assertEqual(Advertisement.objects.get(pk=unchanged.pk).updated_at, unchanged.updated_at)
+
+
+class ReviewListPaginationTestCase(APITestCase):
+    """ Тестирование пагинации списка отзывов объявления. """
+
+    def setUp(self):
+        """ Настройка тестового окружения. """
+        self.user = User.objects.create(
+            email="user@user.ru", password=make_password('testpassword'), is_active=True, first_name='testuser'
+        )
+        self.advertisement = Advertisement.objects.create(
+            author=self.user, title="title", description="description", price=1000
+        )
+        authors = [
+            User.objects.create(email=f"author{number}@user.ru", first_name=f"author{number}", password="x")
+            for number in range(5)
+        ]
+        for number in range(30):
+            Review.objects.create(author=authors[number % 5], content=f"content{number}", ads=self.advertisement)
+        self.url = reverse("main:ads-review-list", kwargs={"pk": self.advertisement.pk})
+        self.client.force_authenticate(user=self.user)
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        """ Тестирование фиксированного числа запросов при любом размере страницы. """
+        for page_size in (1, 10, 30):
+            with self.assertNumQueries(1):
+                request = self.client.get(self.url, {"page_size": page_size})
+            self.assertEqual(len(request.json()["results"]), page_size)
+
+    def test_reviews_are_newest_first_with_author(self):
+        """ Тестирование порядка отзывов и данных автора на всех страницах. """
+        response = self.client.get(self.url, {"page_size": 7}).json()
+        contents = [review["content"] for review in response["results"]]
+        while response["next"]:
+            response = self.client.get(response["next"]).json()
+            contents.extend(review["content"] for review in response["results"])
+
+        self.assertEqual(contents, [f"content{number}" for number in reversed(range(30))])
+        self.assertEqual(response["results"][-1]["author_name"], "author0")
+
+
+class AdvertisementFilterTestCase(APITestCase):
+    """ Тестирование фильтрации и сортировки ленты объявлений. """
+
+    def setUp(self):
+        """ Настройка тестового окружения. """
+        self.user = User.objects.create(email="user@user.ru", first_name="user", password="x")
+        self.user2 = User.objects.create(email="user2@user.ru", first_name="user2", password="x")
+        for number, price in enumerate((500, 100, 300, 300, 900)):
+            Advertisement.objects.create(
+                author=self.user if number % 2 else self.user2, title=f"title{number}", description="d", price=price
+            )
+        self.url = reverse("main:ads-list")
+
+    def titles(self, params):
+        return [ads["title"] for ads in self.client.get(self.url, {"page_size": 10, **params}).json()["results"]]
+
+    def test_price_range_and_author(self):
+        """ Тестирование фильтров по диапазону цены и автору. """
+        self.assertEqual(self.titles({"price_min": 200, "price_max": 500}), ["title3", "title2", "title0"])
+        self.assertEqual(self.titles({"author": self.user.pk}), ["title3", "title1"])
+
+    def test_created_after(self):
+        """ Тестирование фильтра по дате создания. """
+        created_at = Advertisement.objects.get(title="title3").created_at
+
+        self.assertEqual(self.titles({"created_after": created_at.isoformat()}), ["title4", "title3"])
+
+    def test_ordering_by_price_is_stable(self):
+        """ Тестирование сортировки по цене с однозначным порядком при равных ценах. """
+        self.assertEqual(self.titles({"ordering": "price"}), ["title1", "title2", "title3", "title0", "title4"])
+        self.assertEqual(self.titles({"ordering": "-price"}), ["title4", "title0", "title3", "title2", "title1"])
+
+    def test_ordering_in_cursor_mode(self):
+        """ Тестирование сортировки по цене в курсорном режиме. """
+        response = self.client.get(self.url, {"pagination": "cursor", "ordering": "price", "page_size": 2}).json()
+        titles = [ads["title"] for ads in response["results"]]
+        while response["next"]:
+            response = self.client.get(response["next"]).json()
+            titles.extend(ads["title"] for ads in response["results"])
+
+        self.assertEqual(titles, ["title1", "title2", "title3", "title0", "title4"])
+
+
+class AdvertisementExportTestCase(APITestCase):
+    """ Тестирование потоковой выгрузки объявлений. """
+
+    def setUp(self):
+        """ Настройка тестового окружения. """
+        self.user = User.objects.create(email="user@user.ru", first_name="user", password="x")
+        self.user_admin = User.objects.create(
+            email="admin@user.ru", first_name="admin", password="x", user_role="Администратор"
+        )
+        self.ads = [
+            Advertisement.objects.create(author=self.user, title=f"title{number}", description="d, \"d\"", price=number)
+            for number in range(5)
+        ]
+        for number in range(3):
+            Review.objects.create(author=self.user, ads=self.ads[1], content=f"content{number}")
+        self.url = reverse("main:ads-export")
+
+    def export(self, params):
+        self.client.force_authenticate(user=self.user_admin)
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_export_requires_admin(self):
+        """ Тестирование доступа к выгрузке только для администратора. """
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_ndjson_with_reviews(self):
+        """ Тестирование выгрузки в NDJSON вместе с отзывами. """
+        rows = [json.loads(line) for line in self.export({"reviews": 1}).splitlines()]
+
+        self.assertEqual([row["title"] for row in rows], [f"title{number}" for number in range(5)])
+        self.assertEqual([review["content"] for review in rows[1]["reviews"]], ["content0", "content1", "content2"])
+        self.assertEqual(rows[0]["reviews"], [])
+
+    def test_csv(self):
+        """ Тестирование выгрузки в CSV с экранированием значений. """
+        rows = list(csv.DictReader(io.StringIO(self.export({"output": "csv"}))))
+
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]["description"], "d, \"d\"")
+        self.assertNotIn("review_content", rows[0])
+
+    def test_csv_with_reviews(self):
+        """ Тестирование выгрузки в CSV по строке на отзыв. """
+        rows = list(csv.DictReader(io.StringIO(self.export({"output": "csv", "reviews": "true"}))))
+
+        self.assertEqual([row["title"] for row in rows], ["title0", "title1", "title1", "title1", "title2", "title3", "title4"])
+        self.assertEqual(rows[0]["review_content"], "")
+
+    def test_reviews_are_loaded_per_chunk(self):
+        """ Тестирование чтения таблицы порциями: объявления и отзывы — по одному запросу на порцию. """
+        self.client.force_authenticate(user=self.user_admin)
+        response = self.client.get(self.url, {"reviews": 1})
+        with self.assertNumQueries(2):
+            b"".join(response.streaming_content)
+
+    async def test_asgi_streams_without_buffering(self):
+        """ Тестирование асинхронного потока под ASGI: выгрузка не собирается в память целиком. """
+        token = await sync_to_async(lambda: str(RefreshToken.for_user(self.user_admin).access_token))()
+        response = await AsyncClient().get(self.url, {"output": "csv"}, headers={"Authorization": f"Bearer {token}"})
+        with warnings.catch_warnings():
+            # Django предупреждает, когда под ASGI буферизует синхронный итератор.
+            warnings.simplefilter("error")
+            content = b"".join([chunk async for chunk in response.streaming_content]).decode()
+
+        self.assertTrue(response.is_async)
+        self.assertEqual([row["title"] for row in csv.DictReader(io.StringIO(content))], [ad.title for ad in self.ads])
+
+    def test_unknown_format(self):
+        """ Тестирование ошибки при неизвестном формате. """
+        self.client.force_authenticate(user=self.user_admin)
+        self.assertEqual(self.client.get(self.url, {"output": "xml"}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_command(self):
+        """ Тестирование команды выгрузки в файл. """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "ads.csv")
+            call_command("export_ads", "--format", "csv", "--output", path, stderr=io.StringIO())
+            with open(path, encoding="utf-8") as file:
+                self.assertEqual(len(list(csv.DictReader(file))), 5)
+
+
+class ImportAdsCommandTestCase(APITestCase):
+    """ Тестирование команды загрузки объявлений из файла. """
+
+    def setUp(self):
+        """ Настройка тестового окружения. """
+        self.user = User.objects.create(email="user@user.ru", first_name="user", password="x")
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content)
+        return path
+
+    def import_ads(self, path, *args):
+        output = io.StringIO()
+        call_command("import_ads", path, *args, stdout=output)
+        return output.getvalue()
+
+    def test_import_csv_with_invalid_rows(self):
+        """ Тестирование загрузки CSV: неверные записи отклоняются и попадают в файл ошибок. """
+        path = self.write("ads.csv", (
+            "title,description,price,author_id\n"
+            f"title1,description,100,{self.user.pk}\n"
+            "Полиция,description,100,\n"
+            "title3,description,-5,\n"
+            "title4,description,100,999\n"
+            "title5,\"description, with comma\",200,\n"
+        ))
+        errors = os.path.join(self.directory.name, "errors.jsonl")
+
+        output = self.import_ads(path, "--batch-size", "2", "--errors", errors)
+
+        self.assertIn("Загружено объявлений: 2, отклонено записей: 3.", output)
+        self.assertEqual(
+            list(Advertisement.objects.order_by("id").values_list("title", "description", "author_id")),
+            [("title1", "description", self.user.pk), ("title5", "description, with comma", None)],
+        )
+        with open(errors, encoding="utf-8") as file:
+            rejected = [json.loads(line) for line in file]
+        self.assertEqual([error["record"] for error in rejected], [2, 3, 4])
+        self.assertEqual(rejected[0]["errors"]["non_field_errors"], ["В названии присутсвует запрещенное слово: полиция"])
+        self.assertIn("price", rejected[1]["errors"])
+        self.assertIn("author_id", rejected[2]["errors"])
+
+    def test_import_jsonl(self):
+        """ Тестирование загрузки JSONL с автором по умолчанию. """
+        path = self.write("ads.jsonl", "\n".join([
+            json.dumps({"title": "title1", "description": "description", "price": 10}),
+            "{broken",
+            json.dumps({"title": "title2", "description": "description", "price": "20"}),
+        ]))
+
+        self.import_ads(path, "--author", str(self.user.pk))
+
+        self.assertEqual(
+            list(Advertisement.objects.order_by("id").values_list("title", "price", "author_id")),
+            [("title1", 10, self.user.pk), ("title2", 20, self.user.pk)],
+        )
+
+    def test_resume_from_checkpoint(self):
+        """ Тестирование продолжения загрузки с контрольной точки. """
+        path = self.write("ads.csv", "title,description,price\n" + "".join(
+            f"title{number},description,{number}\n" for number in range(5)
+        ))
+        self.import_ads(path, "--batch-size", "2")
+        with open(f"{path}.checkpoint", encoding="utf-8") as file:
+            self.assertEqual(json.load(file), {"position": 5, "imported": 5, "rejected": 0})
+
+        with open(f"{path}.checkpoint", "w", encoding="utf-8") as file:
+            json.dump({"position": 3, "imported": 3, "rejected": 0}, file)
+        Advertisement.objects.filter(title__in=["title3", "title4"]).delete()
+        output = self.import_ads(path, "--batch-size", "2", "--resume")
+
+        self.assertIn("Продолжение с записи 4.", output)
+        self.assertEqual(
+            list(Advertisement.objects.order_by("title").values_list("title", flat=True)),
+            [f"title{number}" for number in range(5)],
+        )
+
+
+class ConditionalGetTestCase(APITestCase):
+    """ Тестирование условных запросов с ETag и Last-Modified. """
+
+    def setUp(self):
+        """ Настройка тестового окружения. """
+        self.user = User.objects.create(email="user@user.ru", first_name="user", password="x")
+        self.client.force_authenticate(user=self.user)
+        self.ads = [
+            Advertisement.objects.create(author=self.user, title=f"title{number}", description="d", price=number)
+            for number in range(3)
+        ]
+        self.review = Review.objects.create(author=self.user, ads=self.ads[0], content="content")
+
+    def assertNotModified(self, url, response, params=None):
+        etag = response.headers["ETag"]
+        with self.assertNumQueries(2 if "page" in (params or {}) else 1):
+            request = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(request.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(request.content, b"")
+        self.assertEqual(request.headers["ETag"], etag)
+
+    def test_advertisement_detail(self):
+        """ Тестирование 304 для объявления и нового ETag после изменения. """
+        url = reverse("main:ads-detail", kwargs={"pk": self.ads[0].pk})
+        response = self.client.get(url)
+        self.assertIn("Last-Modified", response.headers)
+        self.assertNotModified(url, response)
+
+        request = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response.headers["Last-Modified"])
+        self.assertEqual(request.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.ads[0].price = 100
+        self.ads[0].save()
+        request = self.client.get(url, HTTP_IF_NONE_MATCH=response.headers["ETag"])
+        self.assertEqual(request.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(request.headers["ETag"], response.headers["ETag"])
+
+    def test_review_changes_advertisement_etag(self):
+        """ Тестирование смены ETag объявления при добавлении отзыва. """
+        url = reverse("main:ads-detail", kwargs={"pk": self.ads[1].pk})
+        etag = self.client.get(url).headers["ETag"]
+        self.client.post(reverse("main:review-create", kwargs={"pk": self.ads[1].pk}), {"content": "content"})
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_review_detail_and_list(self):
+        """ Тестирование 304 для отзыва и списка отзывов. """
+        url = reverse("main:review-detail", kwargs={"pk": self.review.pk})
+        self.assertNotModified(url, self.client.get(url))
+
+        url = reverse("main:ads-review-list", kwargs={"pk": self.ads[0].pk})
+        response = self.client.get(url)
+        self.assertNotModified(url, response)
+
+        Review.objects.create(author=self.user, ads=self.ads[0], content="content2")
+        request = self.client.get(url, HTTP_IF_NONE_MATCH=response.headers["ETag"])
+        self.assertEqual(request.status_code, status.HTTP_200_OK)
+
+    def test_author_rename_changes_review_etag(self):
+        """ Тестирование смены ETag отзыва и списка отзывов после переименования автора. """
+        urls = [
+            reverse("main:review-detail", kwargs={"pk": self.review.pk}),
+            reverse("main:ads-review-list", kwargs={"pk": self.ads[0].pk}),
+        ]
+        etags = [self.client.get(url).headers["ETag"] for url in urls]
+        self.user.first_name = "renamed"
+        self.user.save()
+
+        for url, etag in zip(urls, etags):
+            with self.subTest(url=url):
+                request = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(request.status_code, status.HTTP_200_OK)
+                self.assertIn("renamed", request.content.decode())
+
+    def test_advertisement_list(self):
+        """ Тестирование 304 для ленты и смены ETag после удаления объявления. """
+        url = reverse("main:ads-list")
+        params = {"page": 1, "page_size": 2}
+        response = self.client.get(url, params)
+        self.assertNotModified(url, response, params)
+        self.assertNotEqual(self.client.get(url, {"page": 2, "page_size": 2}).headers["ETag"], response.headers["ETag"])
+
+        self.ads[0].delete()
+        request = self.client.get(url, params, HTTP_IF_NONE_MATCH=response.headers["ETag"])
+        self.assertEqual(request.status_code, status.HTTP_200_OK)
+
+    def test_list_probe_reads_only_validators(self):
+        """ Тестирование проверки страницы без чтения полей объявлений в постраничном и курсорном режимах. """
+        url = reverse("main:ads-list")
+        for params in ({"page_size": 2}, {"pagination": "cursor", "ordering": "price", "page_size": 2}):
+            response = self.client.get(url, params)
+            with CaptureQueriesContext(connection) as captured:
+                request = self.client.get(url, params, HTTP_IF_NONE_MATCH=response.headers["ETag"])
+
+            self.assertEqual(request.status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertFalse(any('"description"' in query["sql"] for query in captured))
+
+    @override_settings(
+        CACHE_ENABLED=True, CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_revalidation_from_cache(self):
+        """ Тестирование 304 по ETag, сохранённому рядом с ответом в кэше, без запросов к БД. """
+        cache.clear()
+        for url, params in (
+            (reverse("main:ads-list"), {"page_size": 2}),
+            (reverse("main:ads-detail", kwargs={"pk": self.ads[1].pk}), {}),
+        ):
+            with self.subTest(url=url):
+                etag = self.client.get(url, params).headers["ETag"]
+                with self.assertNumQueries(0):
+                    request = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(request.status_code, status.HTTP_304_NOT_MODIFIED)
+                self.assertEqual(request.headers["ETag"], etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ads[1].price = 100
+            self.ads[1].save()
+        request = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(request.status_code, status.HTTP_200_OK)
+        self.assertEqual(request.json()["price"], 100)
+
+    def test_list_ignores_if_modified_since(self):
+        """ Тестирование ленты с одним If-Modified-Since: без проверки в БД, обычный ответ. """
+        url = reverse("main:ads-list")
+        last_modified = self.client.get(url).headers["Last-Modified"]
+        with CaptureQueriesContext(connection) as plain:
+            self.client.get(url)
+        with self.assertNumQueries(len(plain)):
+            request = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(request.status_code, status.HTTP_200_OK)
+
+    def test_bulk_update_changes_etag(self):
+        """ Тестирование смены ETag после массового редактирования. """
+        url = reverse("main:ads-detail", kwargs={"pk": self.ads[2].pk})
+        etag = self.client.get(url).headers["ETag"]
+        self.client.patch(reverse("main:ads-bulk"), [{"id": self.ads[2].pk, "price": 10}], format="json")
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+
+class AsyncViewsTestCase(APITestCase):
+    """ Тестирование асинхронных представлений чтения: ответы совпадают с синхронными. """
+
+    def setUp(self):
+        """ Настройка тестового окружения. """
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create(email="user@user.ru", first_name="user", password="x")
+        self.ads = [
+            Advertisement.objects.create(author=self.user, title=f"title{number}", description="d", price=number)
+            for number in range(5)
+        ]
+        for number in range(3):
+            Review.objects.create(author=self.user, ads=self.ads[0], content=f"content{number}")
+
+    def call(self, view_class, url, params=None, headers=None, **kwargs):
+        request = self.factory.get(url, params, **(headers or {}))
+        force_authenticate(request, user=self.user)
+        response = async_to_sync(view_class.as_view())(request, **kwargs)
+        return response.render() if hasattr(response, "render") else response
+
+    def assertSameAsSync(self, view_class, url, params=None, **kwargs):
+        self.client.force_authenticate(user=self.user)
+        expected = self.client.get(url, params)
+        response = self.call(view_class, url, params, **kwargs)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(json.loads(response.content), expected.json())
+        return response
+
+    def test_advertisement_list(self):
+        """ Тестирование асинхронной ленты в постраничном и курсорном режимах. """
+        url = reverse("main:ads-list")
+        self.assertSameAsSync(AsyncAdvertisementListAPIView, url, {"page": 2, "page_size": 2})
+        self.assertSameAsSync(AsyncAdvertisementListAPIView, url, {"pagination": "cursor", "ordering": "price"})
+
+    def test_advertisement_detail(self):
+        """ Тестирование асинхронной карточки объявления и ответа 404. """
+        url = reverse("main:ads-detail", kwargs={"pk": self.ads[1].pk})
+        self.assertSameAsSync(AsyncAdvertisementRetrieveAPIView, url, pk=self.ads[1].pk)
+        self.assertSameAsSync(AsyncAdvertisementRetrieveAPIView, reverse("main:ads-detail", kwargs={"pk": 999}), pk=999)
+
+    def test_review_list(self):
+        """ Тестирование асинхронного списка отзывов. """
+        url = reverse("main:ads-review-list", kwargs={"pk": self.ads[0].pk})
+        self.assertSameAsSync(AsyncReviewListAPIView, url, {"page_size": 2}, pk=self.ads[0].pk)
+
+    async def test_routes_through_urlconf(self):
+        """ Тестирование маршрутов чтения под ASGI (ASYNC_VIEWS=True, см. config.asgi). """
+        # Маршруты собираются при импорте, поэтому модули URL перезагружаются с новой настройкой.
+        with override_settings(ASYNC_VIEWS=True):
+            importlib.reload(main_urls)
+            importlib.reload(config_urls)
+        self.addCleanup(clear_url_caches)
+        self.addCleanup(importlib.reload, config_urls)
+        self.addCleanup(importlib.reload, main_urls)
+        clear_url_caches()
+        token = await sync_to_async(lambda: str(RefreshToken.for_user(self.user).access_token))()
+        self.client.force_authenticate(user=self.user)
+        routes = [
+            (reverse("main:ads-list"), {"page_size": 2}, AsyncAdvertisementListAPIView),
+            (reverse("main:ads-detail", kwargs={"pk": self.ads[1].pk}), {}, AsyncAdvertisementRetrieveAPIView),
+            (reverse("main:ads-review-list", kwargs={"pk": self.ads[0].pk}), {}, AsyncReviewListAPIView),
+        ]
+        for url, params, view_class in routes:
+            with self.subTest(url=url):
+                self.assertIs(resolve(url).func.view_class, view_class)
+                response = await AsyncClient().get(url, params, headers={"Authorization": f"Bearer {token}"})
+                expected = await sync_to_async(self.client.get)(url, params)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(response.json(), expected.json())
+
+    def test_not_modified(self):
+        """ Тестирование ответа 304 асинхронной карточки объявления. """
+        url = reverse("main:ads-detail", kwargs={"pk": self.ads[2].pk})
+        etag = self.call(AsyncAdvertisementRetrieveAPIView, url, pk=self.ads[2].pk).headers["ETag"]
+        headers = {"HTTP_IF_NONE_MATCH": etag}
+        response = self.call(AsyncAdvertisementRetrieveAPIView, url, headers=headers, pk=self.ads[2].pk)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+class FakeConnection:
+    """ Соединение с БД для тестов пула. """
+
+    def __init__(self):
+        self.closed = False
+        self.healthy = True
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTestCase(SimpleTestCase):
+    """ Тестирование пула соединений с БД. """
+
+    def setUp(self):
+        self.pool = ConnectionPool(max_size=2, timeout=0.05, check=lambda conn: conn.healthy,
+                                   reset=lambda conn: not conn.closed, check_after=0)
+
+    def test_reuse_and_size_limit(self):
+        """ Тестирование повторного использования соединений и ограничения размера пула. """
+        first = self.pool.get(FakeConnection)
+        second = self.pool.get(FakeConnection)
+        with self.assertRaises(PoolTimeout):
+            self.pool.get(FakeConnection)
+
+        self.pool.put(first)
+        self.assertIs(self.pool.get(FakeConnection), first)
+        self.pool.put(first)
+        self.pool.put(second)
+
+        stats = self.pool.stats()
+        self.assertEqual((stats["size"], stats["idle"], stats["in_use"]), (2, 2, 0))
+        self.assertEqual((stats["opened"], stats["reused"], stats["timeouts"]), (2, 1, 1))
+
+    def test_waiting_for_returned_connection(self):
+        """ Тестирование выдачи соединения, освободившегося во время ожидания. """
+        self.pool.timeout = 5
+        connections = [self.pool.get(FakeConnection), self.pool.get(FakeConnection)]
+        threading.Timer(0.05, self.pool.put, [connections[0]]).start()
+
+        self.assertIs(self.pool.get(FakeConnection), connections[0])
+
+    def test_health_check_and_reset(self):
+        """ Тестирование замены неисправных соединений. """
+        broken = self.pool.get(FakeConnection)
+        self.pool.put(broken)
+        broken.healthy = False
+        replacement = self.pool.get(FakeConnection)
+        self.assertIsNot(replacement, broken)
+        self.assertTrue(broken.closed)
+
+        replacement.close()
+        self.pool.put(replacement)
+        stats = self.pool.stats()
+        self.assertEqual((stats["size"], stats["failed_checks"], stats["closed"]), (0, 1, 2))
+
+    def test_idle_and_lifetime_recycling(self):
+        """ Тестирование закрытия простаивающих и старых соединений. """
+        idle = self.pool.get(FakeConnection)
+        self.pool.put(idle)
+        self.pool.max_idle = 0
+        self.assertEqual(self.pool.stats()["size"], 0)
+        self.assertTrue(idle.closed)
+
+        self.pool.max_idle, self.pool.max_lifetime = 300, 0
+        old = self.pool.get(FakeConnection)
+        self.pool.put(old)
+        self.assertTrue(old.closed)
+        self.assertEqual(self.pool.stats()["closed"], 2)
+
+    def test_fill_and_fork(self):
+        """ Тестирование предварительного открытия соединений и сброса пула в дочернем процессе. """
+        self.pool.fill(5, FakeConnection)
+        self.assertEqual(self.pool.stats()["idle"], 2)
+        inherited = self.pool.get(FakeConnection)
+
+        self.pool._after_fork()
+        self.pool.put(inherited)
+
+        self.assertFalse(inherited.closed)
+        self.assertEqual(self.pool.stats()["size"], 0)
+
+
+class DatabasePoolStatsTestCase(APITestCase):
+    """ Тестирование статистики пулов соединений. """
+
+    def test_stats_available_to_admin_only(self):
+        """ Тестирование доступа к статистике пулов соединений. """
+        admin = User.objects.create(email="admin@test.com", user_role="Администратор")
+        url = reverse("main:db-pool-stats")
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.client.force_authenticate(user=admin)
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {"pid": os.getpid(), "pools": []})
+
+
+class ProfilingMiddlewareTestCase(APITestCase):
+    """ Тестирование профилирования запросов и метрик. """
+
+    def setUp(self):
+        """ Настройка тестового окружения. """
+        self.user = User.objects.create(email="user@user.ru", first_name="user", password="x")
+        Advertisement.objects.create(author=self.user, title="title", description="d", price=1)
+        self.client.force_authenticate(user=self.user)
+        for metric in REGISTRY:
+            metric.clear()
+
+    def test_server_timing(self):
+        """ Тестирование заголовка Server-Timing и учёта запроса в метриках. """
+        response = self.client.get(reverse("main:ads-list"), {"page": 1})
+
+        timing = dict(part.strip().split(";", 1) for part in response.headers["Server-Timing"].split(","))
+        self.assertEqual(set(timing), {"db", "serializer", "total"})
+        self.assertIn('desc="2 queries"', timing["db"])
+        self.assertEqual(REQUESTS.get(("main:ads-list", "GET", "200")), 1)
+        self.assertEqual(DB_QUERIES.get(("main:ads-list",)), (2, 1))
+        self.assertGreater(SERIALIZER_DURATION.get(("main:ads-list",))[0], 0)
+        self.assertEqual(RESPONSE_SIZE.get(("main:ads-list",)), (len(response.content), 1))
+
+    @override_settings(PROFILING_SAMPLE_RATE=0)
+    def test_sampling(self):
+        """ Тестирование запросов без подробного профиля. """
+        response = self.client.get(reverse("main:ads-list"))
+
+        self.assertNotIn("Server-Timing", response.headers)
+        self.assertEqual(REQUESTS.get(("main:ads-list", "GET", "200")), 1)
+        self.assertEqual(SAMPLED.get(("main:ads-list",)), 0)
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_metrics_endpoint(self):
+        """ Тестирование выдачи метрик в формате Prometheus. """
+        self.client.get(reverse("main:ads-detail", kwargs={"pk": 999}))
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, status.HTTP_403_FORBIDDEN)
+
+        response = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer secret")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        text = response.content.decode()
+        self.assertIn('http_requests_total{view="main:ads-detail",method="GET",status="404"} 1', text)
+        self.assertIn('http_request_duration_seconds_bucket{view="main:ads-detail",le="+Inf"} 1', text)
+
+    @override_settings(METRICS_TOKEN=None)
+    def test_metrics_closed_without_token(self):
+        """ Тестирование закрытых метрик, если токен не задан. """
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer ")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+@override_settings(
+    DATABASE_REPLICAS=["replica"],
+    CACHE_ENABLED=False,
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+)
+class ReplicaRoutingTestCase(APITransactionTestCase):
+    """ Тестирование чтения с реплики (второй базы SQLite) и закрепления за основной базой после записи. """
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        """ Настройка тестового окружения: пользователь есть в обеих базах, объявления различаются. """
+        cache.clear()
+        for database in ("default", "replica"):
+            user = User.objects.using(database).create(pk=1, email="user@user.ru", first_name="user", password="x")
+        self.primary_ad = Advertisement.objects.create(author_id=1, title="primary", description="d", price=1)
+        self.replica_ad = Advertisement.objects.using("replica").create(
+            author_id=1, title="replica bicycle", description="d", price=2
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}")
+
+    def titles(self, client=None):
+        response = (client or self.client).get(reverse("main:ads-list"))
+        return [ad["title"] for ad in response.json()["results"]]
+
+    def test_reads_go_to_replica(self):
+        """ Тестирование чтения ленты, карточки и поиска с реплики. """
+        self.assertEqual(self.titles(), ["replica bicycle"])
+        detail = self.client.get(reverse("main:ads-detail", kwargs={"pk": self.replica_ad.pk}))
+        self.assertEqual(detail.json()["title"], "replica bicycle")
+        search = self.client.get(reverse("main:ads-search"), {"q": "bicycle"})
+        self.assertEqual([ad["title"] for ad in search.json()["results"]], ["replica bicycle"])
+
+    def test_read_your_writes(self):
+        """ Тестирование закрепления клиента за основной базой после записи. """
+        response = self.client.post(
+            reverse("main:ads-create"), {"title": "new", "description": "d", "price": 3}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(Advertisement.objects.using("replica").filter(title="new").exists())
+
+        self.assertEqual(self.titles(), ["new", "primary"])
+        self.assertEqual(self.titles(APIClient()), ["replica bicycle"])
+
+        cache.clear()
+        self.assertEqual(self.titles(), ["replica bicycle"])
+
+    @override_settings(CACHE_ENABLED=True)
+    def test_cache_is_not_filled_from_lagging_replica(self):
+        """ Тестирование заполнения кэша ответов из основной базы сразу после записи. """
+        self.titles(APIClient())
+        self.client.post(reverse("main:ads-create"), {"title": "new", "description": "d", "price": 3}, format="json")
+
+        # Другой клиент не закреплён за основной базой, но промах после записи читается из неё.
+        self.assertEqual(self.titles(APIClient()), ["new", "primary"])
+        self.assertEqual(self.titles(), ["new", "primary"])
+
+        cache.delete("ads-list:version:recent")
+        cache.delete("ads-list:version")
+        self.assertEqual(self.titles(APIClient()), ["replica bicycle"])
+
+    def test_writes_and_transactions_use_primary(self):
+        """ Тестирование маршрутизации записей и чтений вне запросов. """
+        self.assertEqual(router.db_for_write(Advertisement, instance=self.replica_ad), "default")
+        self.assertEqual(router.db_for_read(Advertisement), "default")
+
+
+class ValuesSerializerTestCase(APITestCase):
+    """ Тестирование быстрой сериализации списков через values(). """
+
+    def setUp(self):
+        """ Настройка тестового окружения. """
+        self.user = User.objects.create(email="user@user.ru", first_name="user", password="x", is_active=True)
+        self.ads = [
+            Advertisement.objects.create(author=self.user, title="с автором", description="велосипед", price=10),
+            Advertisement.objects.create(title="без автора", description="велосипед", price=20),
+        ]
+        self.ads[0].last_review_at = self.ads[0].created_at
+        self.ads[0].save()
+        self.reviews = [
+            Review.objects.create(ads=self.ads[0], author=self.user, content="отзыв"),
+            Review.objects.create(ads=self.ads[0], content="аноним"),
+        ]
+
+    def test_same_output_as_serializer(self):
+        """ Тестирование совпадения вывода с ModelSerializer, включая пустые связи и даты. """
+        cases = (
+            (AdvertisementValuesSerializer(), Advertisement.objects.order_by("id")),
+            (ReviewValuesSerializer(), Review.objects.select_related("author").order_by("id")),
+        )
+        for values_serializer, queryset in cases:
+            for zone in ("UTC", "Europe/Moscow"):
+                with timezone.override(zone):
+                    expected = values_serializer.serializer_class(queryset, many=True).data
+                    data = values_serializer.to_representation(values_serializer.values(queryset))
+                self.assertEqual(json.dumps(data), json.dumps(expected))
+
+    def test_list_endpoints(self):
+        """ Тестирование ответов списков объявлений, поиска и отзывов. """
+        self.client.force_authenticate(self.user)
+        ads = AdvertisementSerializer(reversed(self.ads), many=True).data
+        self.assertEqual(self.client.get(reverse("main:ads-list")).json()["results"], ads)
+        response = self.client.get(reverse("main:ads-list"), {"pagination": "cursor", "page_size": 1})
+        self.assertEqual(response.json()["results"], ads[:1])
+        self.assertEqual(self.client.get(response.json()["next"]).json()["results"], ads[1:])
+
+        search = self.client.get(reverse("main:ads-search"), {"q": "велосипед"})
+        self.assertEqual(sorted(search.json()["results"], key=lambda ad: ad["id"]), ads[::-1])
+
+        reviews = self.client.get(reverse("main:ads-review-list", kwargs={"pk": self.ads[0].pk}))
+        self.assertEqual(reviews.json()["results"], ReviewSerializer(reversed(self.reviews), many=True).data)
+
+    def test_unsupported_field(self):
+        """ Тестирование отказа для полей, которые нельзя прочитать через values(). """
+        class MethodSerializer(AdvertisementSerializer):
+            summary = serializers.SerializerMethodField()
+
+        class MethodValuesSerializer(ValuesSerializer):
+            serializer_class = MethodSerializer
+
+        with self.assertRaises(ImproperlyConfigured):
+            MethodValuesSerializer().fields
+
+
+class JSONRendererTestCase(SimpleTestCase):
+    """ Тестирование рендерера и парсера JSON на orjson. """
+
+    def test_same_output_as_drf(self):
+        """ Тестирование побайтового совпадения с JSONRenderer DRF. """
+        moscow = zoneinfo.ZoneInfo("Europe/Moscow")
+        data = ReturnDict({
+            "id": 1,
+            "title": "Велосипед \u2028\u2029 \"кавычки\" \\ \n",
+            "created_at": datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+            "updated_at": datetime.datetime(2024, 5, 1, 12, 30, tzinfo=moscow),
+            "naive": datetime.datetime(2024, 5, 1, 12, 30),
+            "date": datetime.date(2024, 5, 1),
+            "time": datetime.time(7, 5, 3, 10),
+            "price": decimal.Decimal("10.50"),
+            "duration": datetime.timedelta(minutes=3),
+            "lazy": gettext_lazy("Неверный курсор"),
+            "error": ErrorDetail("Ошибка", code="invalid"),
+            "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+            "big": 2 ** 70,
+            "nested": [{"a": None, "b": True, 3: 1.5}, []],
+        }, serializer=None)
+        for payload in (data, [data, data], {}, [], "строка", None):
+            self.assertEqual(JSONRenderer().render(payload), renderers.JSONRenderer().render(payload))
+
+    def test_float_differences(self):
+        """ Тестирование описанных отличий от DRF для чисел с плавающей точкой. """
+        self.assertEqual(JSONRenderer().render([1e16, 1.5e-7, 0.1]), b"[1e16,1.5e-7,0.1]")
+        self.assertEqual(renderers.JSONRenderer().render([1e16, 1.5e-7, 0.1]), b"[1e+16,1.5e-07,0.1]")
+        self.assertEqual(JSONRenderer().render([float("nan"), float("inf")]), b"[null,null]")
+
+    def test_indent_uses_stdlib(self):
+        """ Тестирование отступов через стандартный json. """
+        data = {"a": [1, 2]}
+        media_type = "application/json; indent=4"
+        self.assertEqual(
+            JSONRenderer().render(data, media_type), renderers.JSONRenderer().render(data, media_type)
+        )
+
+    def test_parser(self):
+        """ Тестирование разбора тела запроса и ошибок разбора. """
+        parser = JSONParser()
+        body = '{"title": "Велосипед", "price": 10, "tags": [null, true]}'.encode()
+        self.assertEqual(parser.parse(io.BytesIO(body)), {"title": "Велосипед", "price": 10, "tags": [None, True]})
+        for body in (b"{", b'{"price": NaN}', b"\xff"):
+            with self.assertRaises(ParseError):
+                parser.parse(io.BytesIO(body))
+
+
+class CompressionTestCase(APITestCase):
+    """ Тестирование сжатия ответов и сжатых копий статики. """
+
+    def setUp(self):
+        """ Настройка тестового окружения. """
+        self.admin = User.objects.create(
+            email="admin@admin.ru", first_name="admin", password="x", is_active=True, user_role="Администратор"
+        )
+        for number in range(30):
+            Advertisement.objects.create(author=self.admin, title=f"Объявление {number}", description="d", price=number)
+        self.url = reverse("main:ads-list")
+        self.expected = self.client.get(self.url, {"page_size": 10}).content
+
+    def get(self, accept_encoding, url=None, params=None):
+        return self.client.get(url or self.url, params or {"page_size": 10}, HTTP_ACCEPT_ENCODING=accept_encoding)
+
+    def test_gzip(self):
+        """ Тестирование gzip для клиентов без Brotli и учёта q=0. """
+        for accept_encoding in ("gzip, deflate", "gzip, br;q=0"):
+            response = self.get(accept_encoding)
+            self.assertEqual(response["Content-Encoding"], "gzip")
+            self.assertIn("Accept-Encoding", response["Vary"])
+            self.assertEqual(response["Content-Length"], str(len(response.content)))
+            self.assertEqual(gzip.decompress(response.content), self.expected)
+
+    @skipUnless(brotli, "brotli не установлен")
+    def test_brotli(self):
+        """ Тестирование Brotli, если клиент его принимает. """
+        response = self.get("gzip, deflate, br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(brotli.decompress(response.content), self.expected)
+
+    def test_not_compressed(self):
+        """ Тестирование ответов без сжатия: клиент не принимает сжатие или ответ короче порога. """
+        response = self.get("")
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response.content, self.expected)
+        with override_settings(COMPRESSION_MIN_SIZE=len(self.expected) + 1):
+            self.assertFalse(self.get("gzip, br").has_header("Content-Encoding"))
+
+    def test_streaming(self):
+        """ Тестирование сжатия потоковой выгрузки. """
+        self.client.force_authenticate(user=self.admin)
+        url = reverse("main:ads-export")
+        expected = b"".join(self.get("", url, {}).streaming_content)
+        response = self.get("gzip", url, {})
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(b"".join(response.streaming_content)), expected)
+
+    def test_collectstatic(self):
+        """ Тестирование сжатых копий статики с хешированными именами после collectstatic. """
+        with tempfile.TemporaryDirectory() as source, tempfile.TemporaryDirectory() as root:
+            files = {"app.js": b"console.log('static');\n" * 200, "tiny.css": b"a{}", "image.png": b"\x89PNG" * 500}
+            for name, content in files.items():
+                with open(os.path.join(source, name), "wb") as file:
+                    file.write(content)
+            with override_settings(
+                STATIC_ROOT=root, STATICFILES_DIRS=[source],
+                STATICFILES_FINDERS=["django.contrib.staticfiles.finders.FileSystemFinder"],
+            ):
+                call_command("collectstatic", interactive=False, verbosity=0)
+                hashed = staticfiles_storage.stored_name("app.js")
+            written = set(os.listdir(root))
+            with open(os.path.join(root, hashed + ".gz"), "rb") as file:
+                self.assertEqual(gzip.decompress(file.read()), files["app.js"])
+
+        self.assertNotEqual(hashed, "app.js")
+        encodings = (".gz", ".br") if brotli else (".gz",)
+        for name in ("app.js", hashed):
+            self.assertTrue({name + extension for extension in encodings} <= written)
+        self.assertFalse({"tiny.css.gz", "image.png.gz"} & written)
+
+
+def make_image(size=(2000, 1000), image_format="PNG", mode="RGBA"):
+    """ Байты тестового изображения. """
+    output = io.BytesIO()
+    Image.new(mode, size, (200, 100, 50, 255) if mode == "RGBA" else (200, 100, 50)).save(output, image_format)
+    return output.getvalue()
+
+
+@override_settings(
+    CACHE_ENABLED=True, CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class ImageVariantsTestCase(APITestCase):
+    """ Тестирование уменьшенных копий фотографий объявлений и аватаров. """
+
+    def setUp(self):
+        """ Настройка тестового окружения: файлы пишутся во временный MEDIA_ROOT. """
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        cache.clear()
+        self.user = User.objects.create(email="user@user.ru", first_name="user", password="x", is_active=True)
+        self.photo = default_storage.save("ads/photo.png", io.BytesIO(make_image()))
+        with mock.patch("main.tasks.generate_image_variants.delay"):
+            self.advertisement = Advertisement.objects.create(
+                author=self.user, title="title", description="description", price=1, photo=self.photo
+            )
+
+    def test_generate_variants(self):
+        """ Тестирование создания всех вариантов без увеличения маленьких изображений. """
+        created = images.generate_variants(self.photo)
+
+        self.assertEqual(len(created), len(settings.IMAGE_VARIANT_WIDTHS) * len(images.FORMATS))
+        for width in settings.IMAGE_VARIANT_WIDTHS:
+            for extension, (image_format, _) in images.FORMATS.items():
+                with default_storage.open(images.variant_name(self.photo, width, extension)) as file, \
+                        Image.open(file) as variant:
+                    self.assertEqual((variant.format, variant.size), (image_format, (width, width // 2)))
+        self.assertEqual(images.generate_variants(self.photo), [])
+
+        small = default_storage.save("ads/small.jpg", io.BytesIO(make_image((200, 100), "JPEG", "RGB")))
+        images.generate_variants(small)
+        with default_storage.open(images.variant_name(small, 1280, "jpg")) as file, Image.open(file) as variant:
+            self.assertEqual(variant.size, (200, 100))
+
+    def test_lazy_variant(self):
+        """ Тестирование создания недостающего варианта при первом обращении. """
+        name = images.variant_name(self.photo, 640, "jpg")
+        self.assertFalse(default_storage.exists(name))
+
+        response = self.client.get(settings.MEDIA_URL + name)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+        self.assertIn("immutable", response["Cache-Control"])
+        with Image.open(io.BytesIO(b"".join(response.streaming_content))) as variant:
+            self.assertEqual(variant.size, (640, 320))
+        self.assertTrue(default_storage.exists(name))
+
+        for url in (
+            images.variant_name(self.photo, 500, "jpg"),
+            images.variant_name("ads/missing.png", 640, "jpg"),
+            images.variant_name(name, 640, "jpg"),
+        ):
+            self.assertEqual(self.client.get(settings.MEDIA_URL + url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_api_returns_fitting_variant(self):
+        """ Тестирование ссылки на наименьший подходящий вариант в ленте и карточке. """
+        self.client.force_authenticate(self.user)
+        cases = (
+            ({}, 320, "webp"),
+            ({"image_width": 400}, 640, "webp"),
+            ({"image_width": 5000, "image_format": "jpg"}, 1280, "jpg"),
+            ({"image_width": "x", "image_format": "gif"}, 320, "webp"),
+        )
+        for params, width, extension in cases:
+            expected = "http://testserver" + settings.MEDIA_URL + images.variant_name(self.photo, width, extension)
+            ads = self.client.get(reverse("main:ads-list"), params).json()["results"]
+            self.assertEqual(ads[0]["photo"], expected)
+            detail = self.client.get(reverse("main:ads-detail", kwargs={"pk": self.advertisement.pk}), params)
+            self.assertEqual(detail.json()["photo"], expected)
+
+    def test_upload_schedules_variants(self):
+        """ Тестирование постановки задачи после сохранения фотографии без ожидания её выполнения. """
+        self.client.force_authenticate(self.user)
+        upload = SimpleUploadedFile("new.png", make_image(), content_type="image/png")
+
+        with mock.patch("main.tasks.generate_image_variants.delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(
+                    reverse("main:ads-create"),
+                    {"title": "new", "description": "description", "price": 1, "photo": upload},
+                    format="multipart",
+                )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        name = Advertisement.objects.get(pk=response.json()["id"]).photo.name
+        delay.assert_called_once_with(name)
+        self.assertFalse(default_storage.exists(images.variant_name(name, 320, "webp")))
+        self.assertEqual(
+            response.json()["photo"], "http://testserver" + settings.MEDIA_URL + images.variant_name(name, 320, "webp")
+        )
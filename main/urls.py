@@ -1,21 +1,38 @@
+from django.conf import settings
 from django.urls import path
 
 from main.apps import MainConfig
 from main.views import (AdvertisementCreateAPIView, AdvertisementListAPIView, AdvertisementRetrieveAPIView,
                         AdvertisementUpdateAPIView, ReviewUpdateAPIView, ReviewCreateAPIView,
-                        ReviewListAPIView, ReviewDestroyAPIView, AdvertisementDestroyAPIView, ReviewRetrieveAPIView)
+                        ReviewListAPIView, ReviewDestroyAPIView, AdvertisementDestroyAPIView, ReviewRetrieveAPIView,
+                        AdvertisementSearchAPIView, CacheStatsAPIView, AdvertisementBulkAPIView,
+                        AdvertisementBulkDestroyAPIView, AdvertisementExportAPIView, AsyncAdvertisementListAPIView,
+                        AsyncAdvertisementRetrieveAPIView, AsyncReviewListAPIView, DatabasePoolStatsAPIView)
 
 app_name = MainConfig.name
 
+# Под ASGI-сервером публичные маршруты чтения обслуживаются асинхронными представлениями.
+ads_list_view = (AsyncAdvertisementListAPIView if settings.ASYNC_VIEWS else AdvertisementListAPIView).as_view()
+ads_detail_view = (
+    AsyncAdvertisementRetrieveAPIView if settings.ASYNC_VIEWS else AdvertisementRetrieveAPIView
+).as_view()
+review_list_view = (AsyncReviewListAPIView if settings.ASYNC_VIEWS else ReviewListAPIView).as_view()
+
 urlpatterns = [
     path("ads/new/", AdvertisementCreateAPIView.as_view(), name="ads-create"),
-    path("ads/<int:pk>/reviews/", ReviewListAPIView.as_view(), name="ads-review-list"),
-    path("ads/", AdvertisementListAPIView.as_view(), name="ads-list"),
-    path("ads/<int:pk>/", AdvertisementRetrieveAPIView.as_view(), name="ads-detail"),
+    path("ads/<int:pk>/reviews/", review_list_view, name="ads-review-list"),
+    path("ads/", ads_list_view, name="ads-list"),
+    path("ads/search/", AdvertisementSearchAPIView.as_view(), name="ads-search"),
+    path("ads/bulk/", AdvertisementBulkAPIView.as_view(), name="ads-bulk"),
+    path("ads/bulk/delete/", AdvertisementBulkDestroyAPIView.as_view(), name="ads-bulk-delete"),
+    path("ads/export/", AdvertisementExportAPIView.as_view(), name="ads-export"),
+    path("ads/<int:pk>/", ads_detail_view, name="ads-detail"),
     path("ads/<int:pk>/update/", AdvertisementUpdateAPIView.as_view(), name="ads-update"),
     path("ads/<int:pk>/delete/", AdvertisementDestroyAPIView.as_view(), name="ads-delete"),
     path("review/<int:pk>/", ReviewRetrieveAPIView.as_view(), name="review-detail"),
     path("ads/<int:pk>/review/create/", ReviewCreateAPIView.as_view(), name="review-create"),
     path("review/<int:pk>/update/", ReviewUpdateAPIView.as_view(), name="review-update"),
     path("review/<int:pk>/delete/", ReviewDestroyAPIView.as_view(), name="review-delete"),
+    path("cache/stats/", CacheStatsAPIView.as_view(), name="cache-stats"),
+    path("db/pool/stats/", DatabasePoolStatsAPIView.as_view(), name="db-pool-stats"),
 ]
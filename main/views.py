@@ -1,44 +1,176 @@
+import os
+
 from rest_framework.generics import ListAPIView, RetrieveAPIView, CreateAPIView, RetrieveUpdateAPIView, DestroyAPIView
+from adrf.generics import GenericAPIView as AsyncGenericAPIView
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from config.postgresql.base import pool_stats
+from main.cache import ADS_DETAIL, ADS_LIST, CachedResponseMixin, batch_invalidation, get_stats, invalidate_ads
+from main.conditional import ConditionalListMixin, ConditionalRetrieveMixin
+from main.export import CONTENT_TYPES, FORMATS, NDJSON, aexport_ads, export_ads
+from main.filters import AdsOrderingFilter, AdvertisementFilter
 from main.models import Advertisement, Review
-from main.paginators import AdsPaginator
-from main.serializers import AdvertisementSerializer, ReviewSerializer
+from main.paginators import AdsCursorPaginator, AdsPaginator, AdsSearchPaginator, ReviewCursorPaginator
+from main.serializers import (AdvertisementBulkSerializer, AdvertisementSerializer, AdvertisementValuesSerializer,
+                              ReviewSerializer, ReviewValuesSerializer)
 
 from users.permissions import IsAdmin, IsAuthor
 
 
-class AdvertisementListAPIView(ListAPIView):
+class ValuesListMixin:
+    """
+    Выдача списка через values_serializer (см. ValuesSerializer), если он задан.
+
+    Фильтрация и пагинация работают как обычно, но страница читается словарями через values()
+    и сериализуется без экземпляров моделей и полей DRF; JSON ответа не меняется.
+    """
+    values_serializer = None
+
+    def get_list_queryset(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.values_serializer is not None:
+            queryset = self.values_serializer.values(queryset)
+        return queryset
+
+    def serialize_list(self, rows):
+        if self.values_serializer is not None:
+            return self.values_serializer.to_representation(rows, self.get_serializer_context())
+        return self.get_serializer(rows, many=True).data
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.get_list_queryset()
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(self.serialize_list(queryset))
+        return self.get_paginated_response(self.serialize_list(page))
+
+
+class AdvertisementListAPIView(CachedResponseMixin, ConditionalListMixin, ValuesListMixin, ListAPIView):
     """ Список объявлений. """
+    queryset = Advertisement.objects.order_by("-created_at", "-id")
+    serializer_class = AdvertisementSerializer
+    values_serializer = AdvertisementValuesSerializer()
+    permission_classes = (AllowAny,)
+    filter_backends = (DjangoFilterBackend, AdsOrderingFilter)
+    filterset_class = AdvertisementFilter
+    ordering_fields = ("created_at", "price")
+    ordering = ("-created_at", "-id")
+    cache_name = ADS_LIST
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(request, self.cached_response, super().list, *args, **kwargs)
+
+    @property
+    def pagination_class(self):
+        """ Курсорный режим по запросу клиента, постраничный - для старых клиентов. """
+        if AdsCursorPaginator.is_requested(getattr(self, "request", None)):
+            return AdsCursorPaginator
+        return AdsPaginator
+
+
+class AdvertisementSearchAPIView(ValuesListMixin, ListAPIView):
+    """ Полнотекстовый поиск объявлений по названию и описанию. """
     queryset = Advertisement.objects.all()
-    pagination_class = AdsPaginator
+    pagination_class = AdsSearchPaginator
     serializer_class = AdvertisementSerializer
+    values_serializer = AdvertisementValuesSerializer()
     permission_classes = (AllowAny,)
 
+    def list(self, request, *args, **kwargs):
+        if not request.query_params.get(AdsSearchPaginator.search_query_param, "").strip():
+            raise ValidationError({"q": "Укажите поисковый запрос."})
+        return super().list(request, *args, **kwargs)
 
-class ReviewListAPIView(ListAPIView):
+
+class ReviewListAPIView(ConditionalListMixin, ValuesListMixin, ListAPIView):
     """ Список отзывов. """
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
+    values_serializer = ReviewValuesSerializer()
+    pagination_class = ReviewCursorPaginator
     permission_classes = (IsAuthenticated,)
+    conditional_fields = {"author__first_name": "author_name"}
 
     def get_queryset(self):
-        queryset = Review.objects.filter(ads=self.kwargs['pk'])
+        queryset = Review.objects.filter(ads=self.kwargs['pk']).select_related("author")
         return queryset
 
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(request, super().list, *args, **kwargs)
+
 
-class ReviewRetrieveAPIView(RetrieveAPIView):
+class ReviewRetrieveAPIView(ConditionalRetrieveMixin, RetrieveAPIView):
     """ Получение отдельного отзыва. """
-    queryset = Review.objects.all()
+    queryset = Review.objects.select_related("author")
     permission_classes = (IsAuthenticated,)
     serializer_class = ReviewSerializer
+    conditional_fields = {"author__first_name": "author_name"}
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(request, super().retrieve, *args, **kwargs)
 
 
-class AdvertisementRetrieveAPIView(RetrieveAPIView):
+class AdvertisementRetrieveAPIView(CachedResponseMixin, ConditionalRetrieveMixin, RetrieveAPIView):
     """ Получение отдельного объявления. """
     queryset = Advertisement.objects.all()
     permission_classes = (IsAuthenticated,)
     serializer_class = AdvertisementSerializer
+    cache_name = ADS_DETAIL
+
+    def get_cache_pk(self):
+        return self.kwargs["pk"]
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(request, self.cached_response, super().retrieve, *args, **kwargs)
+
+
+class AsyncListMixin:
+    """
+    Асинхронная выдача страницы списка.
+
+    Страница читается одним переходом в поток ORM, сериализация уже загруженных
+    объектов выполняется в цикле событий без обращений к БД.
+    """
+
+    async def alist(self, request, *args, **kwargs):
+        page = await self.apaginate_queryset(self.get_list_queryset())
+        return self.get_paginated_response(self.serialize_list(page))
+
+
+class AsyncAdvertisementListAPIView(AsyncListMixin, AsyncGenericAPIView, AdvertisementListAPIView):
+    """ Список объявлений для ASGI-сервера. """
+
+    async def get(self, request, *args, **kwargs):
+        return await self.aconditional_response(request, self.acached_response, self.alist, *args, **kwargs)
+
+
+class AsyncAdvertisementRetrieveAPIView(AsyncGenericAPIView, AdvertisementRetrieveAPIView):
+    """ Получение отдельного объявления для ASGI-сервера. """
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return Response(self.get_serializer(await self.aget_object()).data)
+
+    async def get(self, request, *args, **kwargs):
+        return await self.aconditional_response(request, self.acached_response, self.aretrieve, *args, **kwargs)
+
+
+class AsyncReviewListAPIView(AsyncListMixin, AsyncGenericAPIView, ReviewListAPIView):
+    """ Список отзывов для ASGI-сервера. """
+
+    async def get(self, request, *args, **kwargs):
+        return await self.aconditional_response(request, self.alist, *args, **kwargs)
 
 
 class ReviewCreateAPIView(CreateAPIView):
@@ -47,8 +179,14 @@ class ReviewCreateAPIView(CreateAPIView):
     permission_classes = (IsAuthenticated,)
 
     def perform_create(self, serializer):
-        ads = Advertisement.objects.filter(pk=self.kwargs['pk'])
-        serializer.save(author=self.request.user, ads=ads.get(pk=self.kwargs['pk']))
+        ads = get_object_or_404(Advertisement, pk=self.kwargs['pk'])
+        with transaction.atomic():
+            review = serializer.save(author=self.request.user, ads=ads)
+            Advertisement.objects.filter(pk=ads.pk).update(
+                review_count=F("review_count") + 1,
+                last_review_at=Greatest(Coalesce("last_review_at", Value(review.created_at)), Value(review.created_at)),
+                updated_at=review.created_at,
+            )
 
 
 class AdvertisementCreateAPIView(CreateAPIView):
@@ -63,28 +201,169 @@ class AdvertisementCreateAPIView(CreateAPIView):
 class ReviewUpdateAPIView(RetrieveUpdateAPIView):
     """ Редактирование отзыва. """
     serializer_class = ReviewSerializer
-    permission_classes = [IsAuthor | IsAdmin]
-    queryset = Review.objects.all()
-
-    def perform_update(self, serializer):
-        review = Review.objects.get(pk=self.kwargs['pk'])
-        serializer.save(review=review)
+    permission_classes = [IsAuthenticated, IsAuthor | IsAdmin]
+    queryset = Review.objects.select_related("author")
 
 
 class AdvertisementUpdateAPIView(RetrieveUpdateAPIView):
     """ Редактирование объявления. """
     serializer_class = AdvertisementSerializer
-    permission_classes = [IsAuthor | IsAdmin]
+    permission_classes = [IsAuthenticated, IsAuthor | IsAdmin]
     queryset = Advertisement.objects.all()
 
 
 class ReviewDestroyAPIView(DestroyAPIView):
     """ Удаление отзыва. """
     queryset = Review.objects.all()
-    permission_classes = [IsAuthor | IsAdmin]
+    permission_classes = [IsAuthenticated, IsAuthor | IsAdmin]
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            if instance.ads_id is not None:
+                latest = Review.objects.filter(ads=OuterRef("pk")).order_by("-created_at").values("created_at")[:1]
+                Advertisement.objects.filter(pk=instance.ads_id).update(
+                    review_count=Greatest(F("review_count") - 1, Value(0)),
+                    last_review_at=Subquery(latest),
+                    updated_at=timezone.now(),
+                )
 
 
 class AdvertisementDestroyAPIView(DestroyAPIView):
     """ Удаление объявления. """
     queryset = Advertisement.objects.all()
-    permission_classes = [IsAuthor | IsAdmin]
+    permission_classes = [IsAuthenticated, IsAuthor | IsAdmin]
+
+
+class AdvertisementBulkMixin:
+    """ Общая логика массовых операций: ограничение размера пакета и проверка прав на каждый объект. """
+    permission_classes = (IsAuthenticated,)
+    object_permission_classes = [IsAuthor | IsAdmin]
+    bulk_max_items = 1000
+
+    def check_bulk_size(self, items):
+        if not isinstance(items, list) or not items:
+            raise ValidationError({"non_field_errors": ["Ожидается непустой список."]})
+        if len(items) > self.bulk_max_items:
+            raise ValidationError(
+                {"non_field_errors": [f"Не более {self.bulk_max_items} объявлений за один запрос."]}
+            )
+
+    def get_bulk_objects(self, ids):
+        """ Загружает объявления одним запросом и возвращает их вместе с ошибками по каждому id. """
+        objects = Advertisement.objects.in_bulk([pk for pk in ids if isinstance(pk, int)])
+        permissions = [permission() for permission in self.object_permission_classes]
+        errors = []
+        for pk in ids:
+            obj = objects.get(pk) if isinstance(pk, int) else None
+            if obj is None:
+                errors.append({"id": ["Объявление не найдено."]})
+            elif not all(
+                permission.has_permission(self.request, self)
+                and permission.has_object_permission(self.request, self, obj)
+                for permission in permissions
+            ):
+                errors.append({"id": ["Недостаточно прав для изменения объявления."]})
+            else:
+                errors.append({})
+        return objects, errors
+
+
+class AdvertisementBulkAPIView(AdvertisementBulkMixin, APIView):
+    """ Массовое создание (POST) и редактирование (PATCH) объявлений. """
+
+    def post(self, request):
+        self.check_bulk_size(request.data)
+        serializer = AdvertisementBulkSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            ads = serializer.save(author=request.user)
+            invalidate_ads()
+        return Response(AdvertisementBulkSerializer(ads, many=True).data, status=status.HTTP_201_CREATED)
+
+    def patch(self, request):
+        self.check_bulk_size(request.data)
+        ids = [item.get("id") if isinstance(item, dict) else None for item in request.data]
+        objects, errors = self.get_bulk_objects(ids)
+
+        serializers = []
+        for index, item in enumerate(request.data):
+            if errors[index]:
+                continue
+            serializer = AdvertisementBulkSerializer(objects[ids[index]], data=item, partial=True)
+            if serializer.is_valid():
+                serializers.append(serializer)
+            else:
+                errors[index] = serializer.errors
+        if any(errors):
+            raise ValidationError(errors)
+
+        fields = set()
+        for serializer in serializers:
+            for field, value in serializer.validated_data.items():
+                setattr(serializer.instance, field, value)
+                fields.add(field)
+        ads = [serializer.instance for serializer in serializers]
+        with transaction.atomic():
+            if fields:
+                # bulk_update не вызывает pre_save, поэтому auto_now нужно проставить вручную.
+                updated_at = timezone.now()
+                for ad in ads:
+                    ad.updated_at = updated_at
+                Advertisement.objects.bulk_update(ads, sorted(fields | {"updated_at"}))
+            invalidate_ads(*(ad.pk for ad in ads))
+        return Response(AdvertisementBulkSerializer(ads, many=True).data)
+
+
+class AdvertisementBulkDestroyAPIView(AdvertisementBulkMixin, APIView):
+    """ Массовое удаление объявлений по списку id. """
+
+    def post(self, request):
+        ids = request.data.get("ids") if isinstance(request.data, dict) else None
+        self.check_bulk_size(ids)
+        objects, errors = self.get_bulk_objects(ids)
+        if any(errors):
+            raise ValidationError({"ids": errors})
+
+        with transaction.atomic(), batch_invalidation():
+            Advertisement.objects.filter(pk__in=objects.keys()).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class CacheStatsAPIView(APIView):
+    """ Счётчики попаданий и промахов кэша ответов. """
+    permission_classes = (IsAuthenticated, IsAdmin)
+
+    def get(self, request):
+        return Response(get_stats())
+
+
+class DatabasePoolStatsAPIView(APIView):
+    """ Состояние пулов соединений с БД процесса, обработавшего запрос. """
+    permission_classes = (IsAuthenticated, IsAdmin)
+
+    def get(self, request):
+        return Response({"pid": os.getpid(), "pools": pool_stats()})
+
+
+class AdvertisementExportAPIView(APIView):
+    """
+    Потоковая выгрузка всех объявлений для аналитики.
+
+    Параметры: output=ndjson|csv (по умолчанию ndjson), reviews=1 — вместе с отзывами.
+    """
+    permission_classes = (IsAuthenticated, IsAdmin)
+    chunk_size = 2000
+
+    def get(self, request):
+        output_format = request.query_params.get("output", NDJSON)
+        if output_format not in FORMATS:
+            raise ValidationError({"output": [f"Допустимые форматы: {', '.join(FORMATS)}."]})
+        include_reviews = request.query_params.get("reviews") in ("1", "true")
+        # Под ASGI нужен асинхронный итератор, иначе Django соберёт всю выгрузку в память перед отправкой.
+        export = aexport_ads if isinstance(request._request, ASGIRequest) else export_ads
+        response = StreamingHttpResponse(
+            export(output_format, include_reviews, self.chunk_size), content_type=CONTENT_TYPES[output_format]
+        )
+        response["Content-Disposition"] = f'attachment; filename="ads.{output_format}"'
+        return response
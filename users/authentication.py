@@ -0,0 +1,86 @@
+import logging
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from redis.exceptions import RedisError
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+logger = logging.getLogger(__name__)
+
+
+def user_cache_key(user_id):
+    return f"users:auth:{user_id}"
+
+
+# Поля, которые не попадают в общий кэш: при обращении к ним экземпляр догрузит их из базы данных.
+SECRET_FIELDS = ("password", "token")
+
+
+def dump_user(user):
+    """ Значения полей пользователя для кэша без хеша пароля и токена. """
+    fields = {
+        field.attname: field.get_prep_value(getattr(user, field.attname))
+        for field in user._meta.concrete_fields if field.attname not in SECRET_FIELDS
+    }
+    # Для проверки отзыва токена достаточно той же свёртки хеша, что лежит в самом токене.
+    revoke = get_md5_hash_password(user.password) if api_settings.CHECK_REVOKE_TOKEN else None
+    return fields, revoke
+
+
+def load_user(fields):
+    """ Экземпляр пользователя из значений кэша; поля SECRET_FIELDS остаются отложенными. """
+    return get_user_model().from_db("default", list(fields), list(fields.values()))
+
+
+def invalidate_user(user_id):
+    """ Удаление пользователя из кэша аутентификации. """
+    try:
+        cache.delete(user_cache_key(user_id))
+    except (RedisError, OSError) as error:
+        logger.warning("Кэш недоступен: %s", error)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация с кэшированием пользователя.
+
+    Поля пользователя из токена (кроме хеша пароля и токена) хранятся в кэше AUTH_USER_CACHE_TIMEOUT
+    секунд и удаляются из него при сохранении или удалении (см. users.signals), поэтому проверки прав
+    в обычном случае не обращаются к базе данных.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        key = user_cache_key(user_id)
+        try:
+            cached = cache.get(key)
+        except (RedisError, OSError) as error:
+            logger.warning("Кэш недоступен: %s", error)
+            return super().get_user(validated_token)
+
+        if cached is None:
+            user = super().get_user(validated_token)
+            try:
+                cache.set(key, dump_user(user), settings.AUTH_USER_CACHE_TIMEOUT)
+            except (RedisError, OSError) as error:
+                logger.warning("Кэш недоступен: %s", error)
+            return user
+
+        fields, revoke = cached
+        user = load_user(fields)
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and (
+            validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != revoke
+        ):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
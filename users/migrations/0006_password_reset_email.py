@@ -0,0 +1,63 @@
+# Generated by Django 4.2 on 2026-10-18 12:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_rest_passwordreset", "0005_resetpasswordtoken_created_at_index"),
+        ("users", "0005_alter_user_last_name"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PasswordResetEmail",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Дата создания"
+                    ),
+                ),
+                (
+                    "claimed_by",
+                    models.CharField(
+                        blank=True,
+                        max_length=255,
+                        null=True,
+                        verbose_name="Задача отправки",
+                    ),
+                ),
+                (
+                    "claimed_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Дата захвата задачей"
+                    ),
+                ),
+                (
+                    "token",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="email",
+                        to="django_rest_passwordreset.resetpasswordtoken",
+                        verbose_name="Токен",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Письмо для сброса пароля",
+                "verbose_name_plural": "Письма для сброса пароля",
+            },
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from config.settings import USER_ROLES
+from users.passwords import acheck_password, amake_password, check_password, make_password
 
 
 class User(AbstractUser):
@@ -37,3 +38,43 @@ class User(AbstractUser):
     class Meta:
         verbose_name = "Пользователь"
         verbose_name_plural = "Пользователи"
+
+    def set_password(self, raw_password):
+        """Хеширование пароля в пуле users.passwords."""
+        self.password = make_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        """Проверка пароля в пуле users.passwords; устаревший хеш пересчитывается и сохраняется."""
+
+        def setter(raw_password):
+            self.set_password(raw_password)
+            self._password = None
+            self.save(update_fields=["password"])
+
+        return check_password(raw_password, self.password, setter)
+
+    async def acheck_password(self, raw_password):
+        """Асинхронная проверка пароля (под ASGI): поток запроса не ждёт пула."""
+
+        async def setter(raw_password):
+            self.password = await amake_password(raw_password)
+            self._password = None
+            await self.asave(update_fields=["password"])
+
+        return await acheck_password(raw_password, self.password, setter)
+
+
+class PasswordResetEmail(models.Model):
+    """Письмо для сброса пароля, ожидающее отправки пакетом (users.tasks.send_password_reset_emails)."""
+    token = models.OneToOneField(
+        "django_rest_passwordreset.ResetPasswordToken", on_delete=models.CASCADE, related_name="email",
+        verbose_name="Токен"
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+    claimed_by = models.CharField(max_length=255, null=True, blank=True, verbose_name="Задача отправки")
+    claimed_at = models.DateTimeField(null=True, blank=True, verbose_name="Дата захвата задачей")
+
+    class Meta:
+        verbose_name = "Письмо для сброса пароля"
+        verbose_name_plural = "Письма для сброса пароля"
@@ -0,0 +1,83 @@
+"""
+Хеширование паролей в ограниченном пуле потоков.
+
+PBKDF2 занимает процессор на сотни миллисекунд; hashlib отпускает GIL на время расчёта,
+поэтому пул из PASSWORD_HASHING_WORKERS потоков считает хеши параллельно, а всплеск регистраций
+и входов ждёт в очереди пула, не отнимая процессор у остальных запросов. Пул у каждого рабочего
+процесса свой, поэтому по умолчанию его размер — число ядер, делённое на WEB_WORKERS (не меньше 1):
+одновременно считается не больше max(CPU, WEB_WORKERS) хешей на машину.
+PASSWORD_HASHING_WORKERS = 0 — хешировать в потоке запроса.
+
+Синхронные make_password и check_password ждут результата пула, занимая поток запроса.
+Асинхронные amake_password и acheck_password (представления под ASGI) ждут через await
+и не занимают ни поток, ни цикл событий.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import hashers
+
+_executor = None
+_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(settings.PASSWORD_HASHING_WORKERS, thread_name_prefix="password-hashing")
+    return _executor
+
+
+def _run(func, *args):
+    if not settings.PASSWORD_HASHING_WORKERS:
+        return func(*args)
+    return _get_executor().submit(func, *args).result()
+
+
+async def _arun(func, *args):
+    if not settings.PASSWORD_HASHING_WORKERS:
+        return await sync_to_async(func, thread_sensitive=False)(*args)
+    return await asyncio.wrap_future(_get_executor().submit(func, *args))
+
+
+def make_password(password):
+    return _run(hashers.make_password, password)
+
+
+async def amake_password(password):
+    return await _arun(hashers.make_password, password)
+
+
+def check_password(password, encoded, setter=None):
+    """ Как django.contrib.auth.hashers.check_password; setter вызывается в потоке запроса. """
+    must_update = []
+    is_correct = _run(hashers.check_password, password, encoded, must_update.append if setter else None)
+    if must_update:
+        setter(password)
+    return is_correct
+
+
+async def acheck_password(password, encoded, setter=None):
+    """ Асинхронный check_password; setter - корутина. """
+    must_update = []
+    is_correct = await _arun(hashers.check_password, password, encoded, must_update.append if setter else None)
+    if must_update:
+        await setter(password)
+    return is_correct
+
+
+def _reset_after_fork():
+    # Потоки пула не переживают fork, дочерний процесс создаёт свой пул.
+    global _executor, _lock
+    _executor = None
+    _lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
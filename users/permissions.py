@@ -4,7 +4,8 @@ from rest_framework import permissions
 class IsAuthor(permissions.BasePermission):
     """Проверка пользователя на статус владельца объекта."""
     def has_object_permission(self, request, view, obj):
-        return obj.author == request.user
+        # У объявлений без автора (импортированных) author_id равен None, как и pk анонима.
+        return request.user.is_authenticated and obj.author_id == request.user.pk
 
 
 class IsAdmin(permissions.BasePermission):
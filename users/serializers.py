@@ -1,12 +1,63 @@
-from rest_framework import serializers
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import update_last_login
+from rest_framework import exceptions, serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+from config.images import ImageVariantField
 from users.models import User
+from users.passwords import amake_password, make_password
 
 
 class UserSerializer(serializers.ModelSerializer):
     """Сериализатор пользователя."""
+    avatar = ImageVariantField(required=False, allow_null=True)
+
     class Meta:
         model = User
         fields = "__all__"
+        extra_kwargs = {"password": {"write_only": True}}
+
+    password_hashed = False
+
+    async def ahash_password(self):
+        """Хеширование пароля через await до save() (под ASGI); create() его уже не хеширует."""
+        self.validated_data["password"] = await amake_password(self.validated_data["password"])
+        self.password_hashed = True
+
+    def create(self, validated_data):
+        # Пароль хешируется до вставки: одна запись в БД, открытый пароль в неё не попадает.
+        if not self.password_hashed:
+            validated_data["password"] = make_password(validated_data["password"])
+        return super().create(validated_data)
+
+
+class LoginSerializer(TokenObtainPairSerializer):
+    """Получение пары JWT-токенов; avalidate() проверяет пароль через await (под ASGI)."""
+
+    async def aauthenticate(self, email, password):
+        """Как ModelBackend.authenticate, но с асинхронной проверкой пароля."""
+        try:
+            user = await User._default_manager.aget(**{User.USERNAME_FIELD: email})
+        except User.DoesNotExist:
+            # Хеш считается и для несуществующего пользователя, чтобы время ответа не выдавало email.
+            await amake_password(password)
+            return None
+        if await user.acheck_password(password) and user.is_active:
+            return user
+        return None
+
+    async def avalidate(self, attrs):
+        self.user = await self.aauthenticate(attrs[self.username_field], attrs["password"])
+        if not api_settings.USER_AUTHENTICATION_RULE(self.user):
+            raise exceptions.AuthenticationFailed(self.error_messages["no_active_account"], "no_active_account")
+        return await sync_to_async(self.get_tokens)()
+
+    def get_tokens(self):
+        refresh = self.get_token(self.user)
+        if api_settings.UPDATE_LAST_LOGIN:
+            update_last_login(None, self.user)
+        return {"refresh": str(refresh), "access": str(refresh.access_token)}
 
 
 class ResetPasswordSerializer(serializers.Serializer):
@@ -0,0 +1,32 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django_rest_passwordreset.signals import reset_password_token_created
+
+from main.tasks import schedule_image_variants
+from users.authentication import invalidate_user
+from users.models import PasswordResetEmail, User
+from users.tasks import schedule_password_reset_emails
+
+
+@receiver(reset_password_token_created)
+def queue_password_reset_email(sender, instance, reset_password_token, **kwargs):
+    """ Письмо для сброса пароля ставится в очередь в БД и отправляется пакетом задачей Celery. """
+    # Повторный запрос до отправки возвращает тот же токен: письмо с ним уже ждёт в очереди.
+    PasswordResetEmail.objects.bulk_create([PasswordResetEmail(token=reset_password_token)], ignore_conflicts=True)
+    transaction.on_commit(schedule_password_reset_emails)
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """ Сброс кэша аутентификации при изменении, деактивации или удалении пользователя. """
+    # Повторный сброс после фиксации не даёт параллельному запросу закэшировать старую версию строки.
+    invalidate_user(instance.pk)
+    transaction.on_commit(lambda: invalidate_user(instance.pk))
+
+
+@receiver(post_save, sender=User)
+def generate_avatar_variants(sender, instance, update_fields=None, **kwargs):
+    """ Уменьшенные копии нового аватара строятся в фоне. """
+    if update_fields is None or "avatar" in update_fields:
+        schedule_image_variants(instance.avatar.name)
@@ -0,0 +1,134 @@
+import logging
+from datetime import timedelta
+from smtplib import SMTPException
+
+from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Q
+from django.utils import timezone
+from kombu.exceptions import OperationalError
+from redis.exceptions import RedisError
+
+from users.models import PasswordResetEmail
+
+logger = logging.getLogger(__name__)
+
+# Отметка о том, что задача отправки уже запланирована: письма, созданные до её запуска, уйдут одним пакетом.
+SCHEDULED_KEY = "password-reset:scheduled"
+
+
+def schedule_password_reset_emails():
+    """
+    Планирует отправку накопившихся писем через PASSWORD_RESET_BATCH_DELAY секунд.
+
+    Пока задача не запущена, новые письма к ней присоединяются и новая задача не ставится.
+    Без кэша задача ставится на каждое письмо: лишние задачи найдут пустую очередь.
+    """
+    delay = settings.PASSWORD_RESET_BATCH_DELAY
+    try:
+        if not cache.add(SCHEDULED_KEY, 1, delay + 60):
+            return
+    except (RedisError, OSError) as error:
+        logger.warning("Кэш недоступен: %s", error)
+    try:
+        send_password_reset_emails.apply_async(countdown=delay)
+    except OperationalError as error:
+        # Письма остаются в очереди в БД и уйдут со следующей задачей (или с sweep_password_reset_emails);
+        # отметка снимается, чтобы следующий запрос мог её поставить.
+        logger.warning("Очередь задач недоступна: %s", error)
+        try:
+            cache.delete(SCHEDULED_KEY)
+        except (RedisError, OSError) as error:
+            logger.warning("Кэш недоступен: %s", error)
+
+
+def stale_emails():
+    """
+    Письма, которые уже должна была отправить запланированная задача.
+
+    Незахваченные — созданные раньше, чем живёт отметка SCHEDULED_KEY; захваченные — те, что
+    задача держит дольше CELERY_TASK_TIME_LIMIT (воркер упал или попытки закончились).
+    """
+    now = timezone.now()
+    return PasswordResetEmail.objects.filter(
+        Q(claimed_by=None, created_at__lt=now - timedelta(seconds=settings.PASSWORD_RESET_BATCH_DELAY + 60))
+        | Q(claimed_at__lt=now - timedelta(seconds=settings.CELERY_TASK_TIME_LIMIT))
+    )
+
+
+def claim_emails(task_id):
+    """
+    Захватывает для задачи task_id пакет неотправленных писем (PASSWORD_RESET_BATCH_SIZE).
+
+    Повторная попытка той же задачи продолжает свой пакет; письма упавшего воркера
+    освобождаются через CELERY_TASK_TIME_LIMIT.
+    """
+    now = timezone.now()
+    available = (
+        Q(claimed_by=None) | Q(claimed_by=task_id)
+        | Q(claimed_at__lt=now - timedelta(seconds=settings.CELERY_TASK_TIME_LIMIT))
+    )
+    pks = list(
+        PasswordResetEmail.objects.filter(available).order_by("pk").values_list("pk", flat=True)[
+            :settings.PASSWORD_RESET_BATCH_SIZE
+        ]
+    )
+    # Условие повторяется в UPDATE: письмо, которое параллельная задача захватила раньше, не изменится.
+    PasswordResetEmail.objects.filter(available, pk__in=pks).update(claimed_by=task_id, claimed_at=now)
+    return list(
+        PasswordResetEmail.objects.filter(pk__in=pks, claimed_by=task_id).select_related("token__user").order_by("pk")
+    )
+
+
+def build_message(email):
+    token = email.token
+    return EmailMessage(
+        subject="Восттановление пароля",
+        body=f"users/password-reset/{token.user_id}/{token.key}",
+        from_email=settings.EMAIL_HOST_USER,
+        to=[token.user.email],
+    )
+
+
+@shared_task(
+    bind=True,
+    autoretry_for=(SMTPException, OSError),
+    retry_backoff=True,
+    retry_backoff_max=600,
+    retry_jitter=True,
+    max_retries=8,
+)
+def send_password_reset_emails(self):
+    """
+    Отправка накопившихся писем для сброса пароля пакетами через одно SMTP-соединение на запуск.
+
+    Отправленное письмо сразу удаляется из очереди, поэтому повторная попытка после ошибки
+    не отправит его второй раз. Возвращает число отправленных писем.
+    """
+    try:
+        # Письма, созданные после этой точки, запланируют следующую задачу.
+        cache.delete(SCHEDULED_KEY)
+    except (RedisError, OSError) as error:
+        logger.warning("Кэш недоступен: %s", error)
+    sent = 0
+    with get_connection() as connection:
+        while emails := claim_emails(self.request.id):
+            for email in emails:
+                connection.send_messages([build_message(email)])
+                email.delete()
+                sent += 1
+    return sent
+
+
+@shared_task
+def sweep_password_reset_emails():
+    """
+    Периодическая проверка очереди писем (CELERY_BEAT_SCHEDULE).
+
+    Планирует отправку, если в очереди есть письма, которые должны были уйти, но остались:
+    задачу не удалось поставить, воркер упал или попытки отправки закончились.
+    """
+    if stale_emails().exists():
+        schedule_password_reset_emails()
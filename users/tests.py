@@ -1,3 +1,356 @@
-from django.test import TestCase
+import importlib
+import io
+import tempfile
+import threading
+from datetime import timedelta
+from smtplib import SMTPServerDisconnected
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import AsyncClient, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import clear_url_caches, reverse
+from django.utils import timezone
+from django_rest_passwordreset.models import ResetPasswordToken
+from kombu.exceptions import OperationalError
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from config import urls as config_urls
+from config.images import variant_name
+from users import urls as users_urls
+from users import tasks
+from users.authentication import user_cache_key
+from users.models import PasswordResetEmail, User
+
+
+@override_settings(
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+)
+class ResetPasswordEmailTestCase(APITestCase):
+    """ Тестирование пакетной отправки писем для сброса пароля через Celery. """
+
+    def setUp(self):
+        """ Настройка тестового окружения. """
+        cache.clear()
+        self.user = User.objects.create(email="user@user.ru", first_name="user", is_active=True)
+        self.user.set_password("testpassword")
+        self.user.save()
+
+    def queue_emails(self, count):
+        """ Письма в очереди для count новых пользователей. """
+        for number in range(count):
+            user = User.objects.create(email=f"user{number}@user.ru", first_name=f"user{number}")
+            PasswordResetEmail.objects.create(token=ResetPasswordToken.objects.create(user=user))
+        return [f"user{number}@user.ru" for number in range(count)]
+
+    def test_requests_are_batched(self):
+        """ Тестирование постановки одной задачи на несколько запросов без отправки в запросе. """
+        with mock.patch("users.tasks.send_password_reset_emails.apply_async") as apply_async:
+            for _ in range(2):
+                with self.captureOnCommitCallbacks(execute=True):
+                    request = self.client.post(
+                        reverse("users:password-reset"), {"email": self.user.email}, format="json"
+                    )
+                self.assertEqual(request.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(PasswordResetEmail.objects.filter(token__user=self.user).count(), 1)
+        apply_async.assert_called_once_with(countdown=settings.PASSWORD_RESET_BATCH_DELAY)
+
+    def test_failed_enqueue_releases_schedule(self):
+        """ Тестирование повторной постановки задачи, если брокер был недоступен. """
+        with mock.patch("users.tasks.send_password_reset_emails.apply_async") as apply_async:
+            apply_async.side_effect = [OperationalError(), None]
+            tasks.schedule_password_reset_emails()
+            self.assertIsNone(cache.get(tasks.SCHEDULED_KEY))
+            tasks.schedule_password_reset_emails()
+
+        self.assertEqual(apply_async.call_count, 2)
+        self.assertIsNotNone(cache.get(tasks.SCHEDULED_KEY))
+
+    def test_sweep_schedules_stale_emails(self):
+        """ Тестирование периодической проверки: отправка планируется только для оставшихся писем. """
+        self.queue_emails(2)
+        with mock.patch("users.tasks.send_password_reset_emails.apply_async") as apply_async:
+            tasks.sweep_password_reset_emails()
+        apply_async.assert_not_called()
+
+        old = timezone.now() - timedelta(seconds=settings.CELERY_TASK_TIME_LIMIT + 1)
+        first, second = PasswordResetEmail.objects.order_by("pk")
+        PasswordResetEmail.objects.filter(pk=first.pk).update(claimed_by="lost-task", claimed_at=old)
+        PasswordResetEmail.objects.filter(pk=second.pk).update(created_at=old)
+        with mock.patch("users.tasks.send_password_reset_emails.apply_async") as apply_async:
+            tasks.sweep_password_reset_emails()
+        apply_async.assert_called_once_with(countdown=settings.PASSWORD_RESET_BATCH_DELAY)
+
+        self.assertEqual(tasks.send_password_reset_emails.apply().result, 2)
+        self.assertEqual(len(mail.outbox), 2)
+
+    @override_settings(PASSWORD_RESET_BATCH_SIZE=2)
+    def test_task_sends_batches_over_one_connection(self):
+        """ Тестирование отправки всех накопившихся писем пакетами через одно соединение. """
+        recipients = self.queue_emails(3)
+
+        with mock.patch("users.tasks.get_connection", wraps=tasks.get_connection) as get_connection:
+            result = tasks.send_password_reset_emails.apply()
+
+        self.assertEqual(result.result, 3)
+        self.assertEqual(get_connection.call_count, 1)
+        self.assertEqual([message.to for message in mail.outbox], [[email] for email in recipients])
+        token = ResetPasswordToken.objects.get(user__email=recipients[0])
+        self.assertEqual(mail.outbox[0].body, f"users/password-reset/{token.user_id}/{token.key}")
+        self.assertFalse(PasswordResetEmail.objects.exists())
+
+    def test_retry_does_not_resend(self):
+        """ Тестирование повторной попытки после ошибки: уже отправленные письма не отправляются снова. """
+        recipients = self.queue_emails(3)
+
+        with mock.patch("users.tasks.get_connection") as get_connection:
+            connection = get_connection.return_value.__enter__.return_value
+            connection.send_messages.side_effect = [1, SMTPServerDisconnected(), 1, 1]
+            result = tasks.send_password_reset_emails.apply()
+
+        self.assertEqual(result.state, "SUCCESS")
+        self.assertEqual(get_connection.call_count, 2)
+        attempts = [call.args[0][0].to[0] for call in connection.send_messages.call_args_list]
+        self.assertEqual(attempts, [recipients[0], recipients[1], recipients[1], recipients[2]])
+        self.assertFalse(PasswordResetEmail.objects.exists())
+
+    def test_task_retries_on_smtp_error(self):
+        """ Тестирование повторных попыток с новым соединением при ошибке SMTP. """
+        self.queue_emails(1)
+
+        with mock.patch("users.tasks.get_connection") as get_connection:
+            connection = get_connection.return_value.__enter__.return_value
+            connection.send_messages.side_effect = SMTPServerDisconnected()
+            result = tasks.send_password_reset_emails.apply()
+
+        self.assertEqual(result.state, "FAILURE")
+        self.assertEqual(get_connection.call_count, tasks.send_password_reset_emails.max_retries + 1)
+        self.assertEqual(PasswordResetEmail.objects.count(), 1)
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class CachedJWTAuthenticationTestCase(APITestCase):
+    """ Тестирование кэширования пользователя при JWT-аутентификации. """
+
+    def setUp(self):
+        """ Настройка тестового окружения. """
+        cache.clear()
+        self.admin = User.objects.create(
+            email="admin@user.ru", first_name="admin", is_active=True, user_role="Администратор"
+        )
+        token = RefreshToken.for_user(self.admin).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.url = reverse("main:cache-stats")
+
+    def test_user_is_resolved_from_cache(self):
+        """ Тестирование проверки прав без запросов к базе данных после первого обращения. """
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+    def test_password_hash_is_not_cached(self):
+        """ Тестирование кэширования пользователя без хеша пароля и токена. """
+        self.admin.set_password("testpassword")
+        self.admin.token = "secret"
+        self.admin.save()
+        self.client.get(self.url)
+
+        cached = repr(cache.get(user_cache_key(self.admin.pk)))
+        self.assertNotIn(self.admin.password, cached)
+        self.assertNotIn("secret", cached)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+    def test_cache_is_invalidated_on_save(self):
+        """ Тестирование сброса кэша при смене роли и деактивации пользователя. """
+        self.client.get(self.url)
+
+        self.admin.user_role = "Пользователь"
+        self.admin.save()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.admin.is_active = False
+        self.admin.save()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        "DEFAULT_THROTTLE_RATES": {"login": "3/min", "login-email": "2/min", "register": "1/hour"},
+    },
+)
+class ThrottlingTestCase(APITestCase):
+    """ Тестирование ограничения частоты входа и регистрации. """
+
+    def setUp(self):
+        """ Настройка тестового окружения. """
+        cache.clear()
+        self.url = reverse("users:token_obtain_pair")
+
+    def login(self, email, address="10.0.0.1"):
+        return self.client.post(self.url, {"email": email, "password": "wrong"}, format="json", REMOTE_ADDR=address)
+
+    def test_email_budget(self):
+        """ Тестирование ответа 429 без обращений к БД после исчерпания бюджета на email. """
+        for _ in range(2):
+            self.assertEqual(self.login("user@user.ru").status_code, status.HTTP_401_UNAUTHORIZED)
+
+        with self.assertNumQueries(0):
+            response = self.login("User@user.ru ", address="10.0.0.2")
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "30")
+        self.assertEqual(self.login("other@user.ru").status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_ip_budget(self):
+        """ Тестирование бюджета на IP-адрес для разных email. """
+        for number in range(3):
+            self.assertEqual(self.login(f"user{number}@user.ru").status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.assertEqual(self.login("user9@user.ru").status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(self.login("user9@user.ru", address="10.0.0.2").status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_tokens_are_refilled(self):
+        """ Тестирование пополнения корзины со временем. """
+        with mock.patch("users.throttling.time.time", return_value=1000):
+            self.login("user@user.ru")
+            self.login("user@user.ru")
+            self.assertEqual(self.login("user@user.ru").status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        with mock.patch("users.throttling.time.time", return_value=1030):
+            self.assertEqual(self.login("user@user.ru").status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_register(self):
+        """ Тестирование ограничения регистрации до хеширования пароля. """
+        body = {"email": "new@user.ru", "password": "testpassword", "first_name": "new"}
+        self.assertEqual(self.client.post(reverse("users:register"), body).status_code, status.HTTP_201_CREATED)
+
+        with mock.patch("users.models.User.set_password") as set_password:
+            response = self.client.post(reverse("users:register"), {**body, "email": "new2@user.ru"})
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        set_password.assert_not_called()
+
+
+@override_settings(
+    PASSWORD_HASHING_WORKERS=2, CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class RegistrationTestCase(APITestCase):
+    """ Тестирование регистрации и хеширования паролей в пуле потоков. """
+
+    def setUp(self):
+        """ Настройка тестового окружения. """
+        # Корзины ограничения частоты регистраций не переходят из теста в тест.
+        cache.clear()
+        self.body = {"email": "new@user.ru", "password": "testpassword", "first_name": "new"}
+
+    def test_single_insert_with_hashed_password(self):
+        """ Тестирование регистрации одной вставкой с уже захешированным паролем. """
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.post(reverse("users:register"), self.body, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("password", response.json())
+        writes = [query["sql"] for query in captured if not query["sql"].startswith("SELECT")]
+        self.assertEqual(len(writes), 1)
+        self.assertTrue(writes[0].startswith("INSERT"))
+        self.assertNotIn("testpassword", writes[0])
+        user = User.objects.get(email="new@user.ru")
+        self.assertTrue(user.is_active)
+        self.assertTrue(user.check_password("testpassword"))
+
+    def test_hashing_runs_in_pool(self):
+        """ Тестирование хеширования при регистрации и входе в потоках пула. """
+        threads = []
+
+        def record(func):
+            def wrapper(*args, **kwargs):
+                threads.append(threading.current_thread().name)
+                return func(*args, **kwargs)
+            return wrapper
+
+        with mock.patch("users.passwords.hashers.make_password", record(hashers.make_password)), \
+                mock.patch("users.passwords.hashers.check_password", record(hashers.check_password)):
+            self.client.post(reverse("users:register"), self.body, format="json")
+            response = self.client.post(reverse("users:token_obtain_pair"), self.body, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(threads), 2)
+        self.assertTrue(all(name.startswith("password-hashing") for name in threads))
+
+    async def test_asgi_awaits_hashing(self):
+        """ Тестирование регистрации и входа под ASGI (ASYNC_VIEWS=True): поток запроса не ждёт пула. """
+        # Маршруты собираются при импорте, поэтому модули URL перезагружаются с новой настройкой.
+        with override_settings(ASYNC_VIEWS=True):
+            importlib.reload(users_urls)
+            importlib.reload(config_urls)
+        self.addCleanup(clear_url_caches)
+        self.addCleanup(importlib.reload, config_urls)
+        self.addCleanup(importlib.reload, users_urls)
+        clear_url_caches()
+        client = AsyncClient()
+        login = reverse("users:token_obtain_pair")
+
+        with mock.patch("users.passwords._run", side_effect=AssertionError("поток запроса ждёт пул")):
+            response = await client.post(reverse("users:register"), self.body, content_type="application/json")
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            self.assertNotIn("password", response.json())
+
+            response = await client.post(login, self.body, content_type="application/json")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(set(response.json()), {"refresh", "access"})
+
+            for body in ({**self.body, "password": "wrong"}, {**self.body, "email": "unknown@user.ru"}):
+                response = await client.post(login, body, content_type="application/json")
+                self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+            response = await client.post(login, {"email": self.body["email"]}, content_type="application/json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(PASSWORD_HASHERS=[
+        "django.contrib.auth.hashers.PBKDF2PasswordHasher", "django.contrib.auth.hashers.MD5PasswordHasher",
+    ])
+    def test_outdated_hash_is_upgraded_on_login(self):
+        """ Тестирование пересчёта устаревшего хеша при входе. """
+        user = User.objects.create(
+            email="old@user.ru", first_name="old", password=hashers.make_password("testpassword", hasher="md5")
+        )
+
+        response = self.client.post(
+            reverse("users:token_obtain_pair"), {"email": user.email, "password": "testpassword"}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$"))
+
+    def test_avatar_variants_scheduled(self):
+        """ Тестирование фоновой постановки уменьшенных копий аватара и ссылки на вариант в ответе. """
+        avatar = io.BytesIO()
+        Image.new("RGB", (800, 800)).save(avatar, "JPEG")
+        self.body["avatar"] = SimpleUploadedFile("avatar.jpg", avatar.getvalue(), content_type="image/jpeg")
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root), \
+                mock.patch("main.tasks.generate_image_variants.delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(reverse("users:register"), self.body, format="multipart")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        name = User.objects.get(email="new@user.ru").avatar.name
+        delay.assert_called_once_with(name)
+        self.assertEqual(
+            response.json()["avatar"],
+            "http://testserver" + settings.MEDIA_URL + variant_name(name, settings.IMAGE_DEFAULT_WIDTH, "webp"),
+        )
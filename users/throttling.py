@@ -0,0 +1,123 @@
+import hashlib
+import logging
+import math
+import time
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.redis import RedisCache
+from redis.exceptions import RedisError
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+DURATIONS = {"s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+
+# Корзина жетонов в Redis: KEYS[1] — ключ корзины, ARGV — ёмкость и скорость пополнения
+# (жетонов в секунду). Возвращает, сколько секунд ждать до следующего жетона (0 — запрос разрешён).
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(wait)
+"""
+
+_script = None
+
+
+def parse_rate(rate):
+    """ "N/период" -> (ёмкость корзины, жетонов в секунду). """
+    number, period = rate.split("/")
+    capacity = int(number)
+    return capacity, capacity / DURATIONS[period[0]]
+
+
+def _take_redis(key, capacity, rate):
+    global _script
+    key = cache.make_and_validate_key(key)
+    client = cache._cache.get_client(key, write=True)
+    if _script is None:
+        _script = client.register_script(TOKEN_BUCKET_SCRIPT)
+    return float(_script(keys=[key], args=[capacity, rate], client=client))
+
+
+def _take_local(key, capacity, rate):
+    # Для локальных кэшей (тесты, разработка): без атомарности, в отличие от скрипта Redis.
+    now = time.time()
+    tokens, updated = cache.get(key, (capacity, now))
+    tokens = min(capacity, tokens + max(0, now - updated) * rate)
+    wait = 0 if tokens >= 1 else (1 - tokens) / rate
+    if not wait:
+        tokens -= 1
+    cache.set(key, (tokens, now), math.ceil(capacity / rate) + 1)
+    return wait
+
+
+def take_token(key, capacity, rate):
+    """ Забирает жетон из корзины key; возвращает время ожидания в секундах, 0 — если жетон был. """
+    take = _take_redis if isinstance(caches[DEFAULT_CACHE_ALIAS], RedisCache) else _take_local
+    try:
+        return take(key, capacity, rate)
+    except (RedisError, OSError) as error:
+        logger.warning("Кэш недоступен: %s", error)
+        return 0
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Ограничение частоты запросов корзиной жетонов, общей для всех процессов (хранится в кэше).
+
+    Бюджет берётся из DEFAULT_THROTTLE_RATES по ключу throttle_scope представления с суффиксом
+    класса: "N/период" — до N запросов подряд, затем по N за период.
+    Проверка выполняется до обработчика, то есть до хеширования паролей и обращений к БД.
+    """
+    suffix = ""
+
+    def __init__(self):
+        self.wait_seconds = 0
+
+    def get_ident_key(self, request):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        scope = getattr(view, "throttle_scope", None)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(f"{scope}{self.suffix}") if scope else None
+        ident = self.get_ident_key(request) if rate else None
+        if ident is None:
+            return True
+        self.wait_seconds = take_token(f"throttle:{scope}{self.suffix}:{ident}", *parse_rate(rate))
+        return not self.wait_seconds
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class IPThrottle(TokenBucketThrottle):
+    """ Бюджет на IP-адрес клиента. """
+
+    def get_ident_key(self, request):
+        return self.get_ident(request)
+
+
+class EmailThrottle(TokenBucketThrottle):
+    """ Бюджет на email из тела запроса (ключ throttle_scope с суффиксом "-email"). """
+    suffix = "-email"
+
+    def get_ident_key(self, request):
+        email = request.data.get("email") if hasattr(request.data, "get") else None
+        if not isinstance(email, str) or not email.strip():
+            return None
+        return hashlib.md5(email.strip().lower().encode()).hexdigest()
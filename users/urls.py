@@ -1,24 +1,27 @@
+from django.conf import settings
 from django.urls import path
 from rest_framework.permissions import AllowAny
-from rest_framework_simplejwt.views import (TokenObtainPairView,
-                                            TokenRefreshView)
+from rest_framework_simplejwt.views import TokenRefreshView
 from users.apps import UsersConfig
-from users.views import RegistrationAPIView, ResetPasswordAPIView, UpdatePasswordAPIView
+from users.views import (AsyncLoginAPIView, AsyncRegistrationAPIView, LoginAPIView, RegistrationAPIView,
+                         ResetPasswordAPIView, UpdatePasswordAPIView)
 
 app_name = UsersConfig.name
 
+# Под ASGI-сервером вход и регистрация ждут хеширования пароля через await (users.passwords).
+login_view = (AsyncLoginAPIView if settings.ASYNC_VIEWS else LoginAPIView).as_view()
+registration_view = (AsyncRegistrationAPIView if settings.ASYNC_VIEWS else RegistrationAPIView).as_view(
+    permission_classes=(AllowAny,)
+)
+
 urlpatterns = [
-    path("login/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
+    path("login/", login_view, name="token_obtain_pair"),
     path(
         "token/refresh/",
         TokenRefreshView.as_view(permission_classes=(AllowAny,)),
         name="token_refresh",
     ),
-    path(
-        "register/",
-        RegistrationAPIView.as_view(permission_classes=(AllowAny,)),
-        name="register",
-    ),
+    path("register/", registration_view, name="register"),
     path('password-reset/', ResetPasswordAPIView.as_view(), name='password-reset'),
     path('password-reset/confirm/', UpdatePasswordAPIView.as_view(), name='password-reset-confirm'),
 ]
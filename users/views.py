@@ -2,11 +2,14 @@ import string
 import random
 from datetime import timedelta
 
+from adrf.generics import GenericAPIView as AsyncGenericAPIView
+from asgiref.sync import sync_to_async
 from django.utils import timezone
 from django_rest_passwordreset.models import ResetPasswordToken
 from django_rest_passwordreset.views import ResetPasswordConfirm, ResetPasswordValidateToken, ResetPasswordRequestToken
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken, SlidingToken, UntypedToken
+from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework.response import Response
 from rest_framework.decorators import api_view
 from rest_framework.generics import CreateAPIView, UpdateAPIView
@@ -14,13 +17,18 @@ from rest_framework.permissions import AllowAny
 
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse
-from django.core.mail import send_mail
 
 from config import settings
 from users.models import User
-from users.serializers import UserSerializer, ResetPasswordSerializer, ResetPasswordConfirmSerializer
+from users.serializers import LoginSerializer, UserSerializer, ResetPasswordSerializer, ResetPasswordConfirmSerializer
+from users.throttling import EmailThrottle, IPThrottle
 
-from config.settings import EMAIL_HOST_USER
+
+class LoginAPIView(TokenObtainPairView):
+    """Получение пары JWT-токенов по email и паролю."""
+    serializer_class = LoginSerializer
+    throttle_classes = (IPThrottle, EmailThrottle)
+    throttle_scope = "login"
 
 
 class RegistrationAPIView(CreateAPIView):
@@ -28,42 +36,50 @@ class RegistrationAPIView(CreateAPIView):
     permission_classes = (AllowAny,)
     serializer_class = UserSerializer
     queryset = User.objects.all()
+    throttle_classes = (IPThrottle, EmailThrottle)
+    throttle_scope = "register"
 
     def perform_create(self, serializer):
-        user = serializer.save(is_active=True)
-        user.set_password(serializer.validated_data.get("password"))
-        user.save()
+        serializer.save(is_active=True)
 
 
-class ResetPasswordAPIView(ResetPasswordRequestToken):
-    """Запрос сброса пароля."""
-    def post(self, request, *args, **kwargs):
-        response = super().post(request, *args, **kwargs)
+class AsyncLoginAPIView(AsyncGenericAPIView, LoginAPIView):
+    """Вход под ASGI: пароль проверяется в пуле users.passwords через await."""
 
-        if response.status_code == status.HTTP_200_OK:
-            email = request.data['email']
-            try:
-                token = ResetPasswordToken.objects.filter(user__email=email).latest('created_at')
-                self.send_reset_email(email, token.key)
-            except ResetPasswordToken.DoesNotExist:
-                pass
+    async def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        attrs = serializer.to_internal_value(request.data)
+        return Response(await serializer.avalidate(attrs), status=status.HTTP_200_OK)
 
-        return response
 
-    def send_reset_email(self, email, token):
-        user = User.objects.get(email=email)
-        send_mail(
-            subject="Восттановление пароля",
-            message=f"users/password-reset/{user.pk}/{token}",
-            from_email=EMAIL_HOST_USER,
-            recipient_list=[email],
-        )
+class AsyncRegistrationAPIView(AsyncGenericAPIView, RegistrationAPIView):
+    """Регистрация под ASGI: пароль хешируется в пуле users.passwords через await."""
+
+    async def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        await serializer.ahash_password()
+        await sync_to_async(self.perform_create)(serializer)
+        data = await sync_to_async(lambda: serializer.data)()
+        return Response(data, status=status.HTTP_201_CREATED, headers=self.get_success_headers(data))
+
+
+class ResetPasswordAPIView(ResetPasswordRequestToken):
+    """Запрос сброса пароля. Письмо отправляется задачей Celery (см. users.signals)."""
+    throttle_classes = (IPThrottle, EmailThrottle)
+    throttle_scope = "password-reset"
+
+    def get_throttles(self):
+        # Вместо ограничения из django_rest_passwordreset — общие корзины жетонов.
+        return [throttle() for throttle in self.throttle_classes]
 
 
 class UpdatePasswordAPIView(ResetPasswordConfirm):
     """Подтверждени сброса пароля"""
     serializer_class = ResetPasswordConfirmSerializer
     permission_classes = (AllowAny,)
+    throttle_classes = (IPThrottle,)
+    throttle_scope = "password-reset-confirm"
 
     def post(self, request, *args, **kwargs):
         serializer = self.serializer_class(data=request.data)